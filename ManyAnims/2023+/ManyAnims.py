@@ -1,8 +1,29 @@
-import maya.cmds as cmds
+import time
+_import_started = time.perf_counter()
 import os
 import sys
-import maya.utils
+try:
+    import maya.cmds as cmds
+    import maya.utils
+except ImportError:
+    # Plain Python: only the Maya-free tools (the format converter) work
+    cmds = None
+import bisect
+import fnmatch
 import json
+import importlib
+import io
+import itertools
+import queue
+import re
+import shutil
+import struct
+import threading
+import traceback
+# sqlite3, subprocess, zipfile, hashlib, tempfile, shlex and concurrent.futures
+# are imported by the library, worker, archive, bundle and thread pool code that
+# needs them, so loading the menu doesn't pay for them. threading stays: queue
+# imports it anyway, and the archive lock is created at import.
 
 # Global variables
 anim_path = None
@@ -20,9 +41,21 @@ use_se_mode = False
 game_prefix = ""
 export_selected_only = False
 use_name_remap = False
+prescan_enabled = True
 
 # --- Save Settings ---
-SETTINGS_FILE = os.path.join(os.getenv("APPDATA"),"ManyAnims","manyanims_settings.json")
+def get_settings_dir():
+    """MANYANIMS_SETTINGS_DIR if set, else %APPDATA%/ManyAnims, else ~/.manyanims."""
+    override = os.getenv("MANYANIMS_SETTINGS_DIR")
+    if override:
+        return override
+    appdata = os.getenv("APPDATA")
+    if appdata:
+        return os.path.join(appdata, "ManyAnims")
+    return os.path.join(os.path.expanduser("~"), ".manyanims")
+
+
+SETTINGS_FILE = os.path.join(get_settings_dir(), "manyanims_settings.json")
 
 
 
@@ -38,9 +71,50 @@ settings = {
     "import_location": "",
     "export_location": "",
     "game_prefix": "",
-    "use_name_remap": False
+    "use_name_remap": False,
+    "prescan_enabled": True,
+    "prescan_threads": 0,  # 0 = pick from CPU count
+    "prefetch_count": 2,  # 0 = read each file when it is imported
+    "prefetch_memory_mb": 512,
+    "atomic_output": True,  # stage exports and rename them into place on a writer thread
+    "output_queue_size": 8,
+    "output_fsync": False,  # fsync every written file once the batch ends
+    "verify_outputs": True,
+    "verify_threads": 4,
+    "native_notetracks": False,  # read notes from the clip instead of ReadNotetracks + cleanup passes (own rules, see Notetracks)
+    "fail_fast": False,  # stop the batch at the first failed file
+    "max_failures": 0,  # abort once this many files have failed (0 = never)
+    "watch_interval": 2.0,  # seconds between import folder polls in watch mode
+    "watch_settle_seconds": 3.0,  # a file must be unchanged this long before it is exported
+    "export_targets": [],  # formats/prefixes written per imported clip; empty = menu options
+    "remap_profiles": {},
+    "export_namespaces": [],  # rig namespaces exported per clip, or "auto"; empty = default namespace
+    "namespace_suffixes": {},
+    "tool_paths": {},  # where CoDMayaTools / SEToolsPlugin were last found
+    "housekeeping_every": 50,  # flush undo / delete leftover nodes every N files (0 = never)
+    "housekeeping_memory_mb": 0,  # ...or whenever the process is above this (0 = no limit)
+    "bulk_import": False,  # key clips with OpenMaya MFnAnimCurve instead of castplugin / SETools
+    "output_bundle": "",  # pack exports into <name>.xanim_pack + index in the export folder ("" = loose files)
+    "metrics_textfile": "",  # Prometheus textfile-collector .prom file, rewritten during batches
+    "metrics_port": 0,  # serve Prometheus metrics on this HTTP port (0 = off)
+    "metrics_host": "127.0.0.1",
+    "metrics_interval": 15.0,  # seconds between textfile updates
+    "library_path": "",  # SQLite animation library index; "" = in the settings folder
+    "library_query": "",
+    "method_overrides": {},  # "auto" method: {"name glob": "treyarch" / "iw/sh"}, first match wins
+    "auto_method_fallback": "iw/sh",  # "auto" method when neither the clip nor the rig decides
+    "isolate_workers": 0,  # headless batches: export in this many mayapy worker processes (0 = in this one)
+    "file_timeout": 300.0,  # seconds a worker may spend on one file before it is killed
+    "worker_start_timeout": 600.0,  # seconds a worker may take to open the rig scene
+    "worker_max_files": 0,  # replace each worker after this many files (0 = never)
+    "mayapy_path": "",  # mayapy for the workers ("" = the one running the batch)
+    "cooperative_batch": True,  # menu batches run between UI events, with Pause/Resume and Cancel
+    "cooperative_slice_ms": 100  # how long each slice exports for before Maya gets control back
 }
 
+# Header info from the last prescan, keyed by file path
+anim_header_cache = {}
+
 
 def ensure_setting_dir():
     """ENSURE THE MANYANIMS FOLDER EXISTS"""
@@ -75,9 +149,10 @@ def load_settings():
     import_location = settings.get("import_location", "")
     export_location = settings.get("export_location", "")
     game_prefix = settings.get("game_prefix", "")
-    global use_name_remap
+    global use_name_remap, prescan_enabled
 
     use_name_remap = settings.get("use_name_remap", False)
+    prescan_enabled = settings.get("prescan_enabled", True)
 
     # --- If the menu already exists, update checkboxes visually ---
     if cmds.menuItem("useCastMenuItem", exists=True):
@@ -90,6 +165,10 @@ def load_settings():
         cmds.menuItem("bo3ExportMenuItem", edit=True, checkBox=export_bo3)
     if cmds.menuItem("nameRemapMenuItem", exists=True):
         cmds.menuItem("nameRemapMenuItem", edit=True, checkBox=use_name_remap)
+    if cmds.menuItem("prescanMenuItem", exists=True):
+        cmds.menuItem("prescanMenuItem", edit=True, checkBox=prescan_enabled)
+    if cmds.menuItem("failFastMenuItem", exists=True):
+        cmds.menuItem("failFastMenuItem", edit=True, checkBox=settings.get("fail_fast", False))
 
 
 def save_settings():
@@ -103,65 +182,72 @@ def save_settings():
         print("[ManyAnims] Failed to save settings:", e)
 
 
-# Plugin loading functions
-def add_setools_plugin_to_path():
-    maya_plugin_paths = os.getenv('MAYA_PLUG_IN_PATH')
-    
-    if not maya_plugin_paths:
-        print("Maya plugin path environment variable not set.")
-        return False
-
-    paths = maya_plugin_paths.split(';')
-
-    for path in paths:
-        plugin_path = os.path.join(path, 'SEToolsPlugin.py')
-        if os.path.isfile(plugin_path):
-            sys.path.append(path)
-            print("SEToolsPlugin.py found. Added to sys.path: %s" % path)
-            return True
-
-    print("SEToolsPlugin.py not found in the Maya plugin paths.")
-    return False
-
-def add_maya_scripts_to_sys_path():
-    maya_script_paths = os.getenv('MAYA_SCRIPT_PATH')
+# --- Tool discovery ---
+# CoDMayaTools and SEToolsPlugin are imported on first use from the menu rather
+# than when userSetup imports ManyAnims, so sessions that never export don't pay
+# for them. The folder each one was found in is cached in settings ("tool_paths")
+# so later sessions skip the MAYA_SCRIPT_PATH / MAYA_PLUG_IN_PATH scan.
+
+CoDMayaTools = None
+SEToolsPlugin = None
+original_save_reminder = None
+
+
+def find_tool_dir(file_name, env_var):
+    """Folder holding file_name: the cached one if it still has it, else the first match on env_var."""
+    cached = settings.get("tool_paths", {}).get(file_name)
+    if cached and os.path.isfile(os.path.join(cached, file_name)):
+        return cached
+    for path in (os.getenv(env_var) or "").split(os.pathsep):
+        if path and os.path.isfile(os.path.join(path, file_name)):
+            settings.setdefault("tool_paths", {})[file_name] = path
+            save_settings()
+            return path
+    return None
+
+
+def import_tool(module_name, env_var):
+    """Import a tool module, putting only its own folder on sys.path. Returns None if it can't be imported."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    started = time.perf_counter()
+    tool_dir = find_tool_dir(module_name + ".py", env_var)
+    if tool_dir and tool_dir not in sys.path:
+        sys.path.append(tool_dir)
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        print(f"[ManyAnims] Could not import {module_name}: {e}")
+        return None
+    print(f"[ManyAnims] Imported {module_name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return module
 
-    if maya_script_paths:
-        paths = maya_script_paths.split(os.pathsep)
-        for path in paths:
-            if path not in sys.path:
-                print("Adding %s to sys.path" % path)
-                sys.path.append(path)
-        return True
-    else:
-        print("MAYA_SCRIPT_PATH environment variable not found.")
-        return False
 
-# Initialize plugins
-plugin_found = add_setools_plugin_to_path()
-if plugin_found:
-    try:
-        import SEToolsPlugin
-        from SEToolsPlugin import __save_semodel__
-    except:
-        print("Failed to import SEToolsPlugin")
+def load_codmaya_tools():
+    """CoDMayaTools, imported on first use; None if it isn't installed."""
+    global CoDMayaTools, original_save_reminder
+    if CoDMayaTools is None:
+        CoDMayaTools = import_tool("CoDMayaTools", "MAYA_SCRIPT_PATH")
+        if CoDMayaTools is not None:
+            original_save_reminder = CoDMayaTools.SaveReminder
+    return CoDMayaTools
 
-if add_maya_scripts_to_sys_path():
-    try:
-        import CoDMayaTools
-        from CoDMayaTools import OBJECT_NAMES, CreateXModelWindow, GeneralWindow_ExportSelected
-        print("Successfully imported CoDMayaTools")
-    except ImportError as e:
-        print("Error importing CoDMayaTools: %s" % str(e))
-else:
-    print("Could not add Maya scripts to sys.path")
 
+def load_setools_plugin():
+    """SEToolsPlugin, imported on first use; None if it isn't installed."""
+    global SEToolsPlugin
+    if SEToolsPlugin is None:
+        SEToolsPlugin = import_tool("SEToolsPlugin", "MAYA_PLUG_IN_PATH")
+    return SEToolsPlugin
 
 
 def select_anim_files_dialog(*args):
     global anim_path, selected_anim_files
+    if batch_is_running():
+        return
 
-    file_filter = "*.cast" if use_cast else "*.seanim"
+    extension = ".cast" if use_cast else ".seanim"
+    file_filter = f"*{extension} *.zip"
     caption = "Select CAST Files to Export" if use_cast else "Select SEAnim Files to Export"
 
     # Start from saved import location if exists, otherwise project root
@@ -172,9 +258,11 @@ def select_anim_files_dialog(*args):
     selected = cmds.fileDialog2(fileMode=4, dialogStyle=2, caption=caption,
                                 fileFilter=file_filter, startingDirectory=start_dir)
 
+    # Archives are expanded to the clips inside them
+    selected = expand_anim_inputs(selected or [], extension)
     if selected:
         selected_anim_files = selected
-        anim_path = os.path.dirname(selected[0])
+        anim_path = os.path.dirname(split_archive_path(selected[0])[0])
 
         print(f"[ManyAnims] Animation path set to: {anim_path}")
         print(f"[ManyAnims] Selected {len(selected_anim_files)} file(s)")
@@ -192,6 +280,8 @@ def select_anim_files_dialog(*args):
 
 
 def set_import_location(*args):
+    if batch_is_running():
+        return
     selected = cmds.fileDialog2(fileMode=3, dialogStyle=2, caption="Select Default Import Folder")
     if selected:
         settings["import_location"] = selected[0]
@@ -200,6 +290,8 @@ def set_import_location(*args):
                            message=f"Default import folder set to:\n{selected[0]}", button=["OK"])
 
 def set_export_location(*args):
+    if batch_is_running():
+        return
     selected = cmds.fileDialog2(fileMode=3, dialogStyle=2, caption="Select Default Export Folder")
     if selected:
         settings["export_location"] = selected[0]
@@ -209,6 +301,8 @@ def set_export_location(*args):
 
 
 def select_normal_joints(*args):
+    if batch_is_running():
+        return
     selected_joints = cmds.ls(selection=True)
     if selected_joints:
         global normal_joints
@@ -218,6 +312,8 @@ def select_normal_joints(*args):
         cmds.confirmDialog(title="Error", message="Please select joints for Normal animation.", button=["OK"])
 
 def select_ads_joints(*args):
+    if batch_is_running():
+        return
     selected_joints = cmds.ls(selection=True)
     if selected_joints:
         global ads_joints
@@ -226,9 +322,17 @@ def select_ads_joints(*args):
     else:
         cmds.confirmDialog(title="Error", message="Please select joints for ADS animation.", button=["OK"])
 
+def undo_checkbox_click(checkbox):
+    """{checkbox: state before the click}, for batch_is_running to restore."""
+    return {checkbox: not cmds.menuItem(checkbox, query=True, checkBox=True)}
+
+
 def on_treyarch_checked(*args):
+    if batch_is_running(undo_checkbox_click(treyarch_checkbox)):
+        return
     if cmds.menuItem(treyarch_checkbox, query=True, checkBox=True):
         cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
+        cmds.menuItem(auto_checkbox, edit=True, checkBox=False)
         if anim_path and export_path:
             if use_cast:
                 load_cast_from_path(anim_path)
@@ -238,8 +342,25 @@ def on_treyarch_checked(*args):
             cmds.confirmDialog(title="Error", message="Please select both Anim Path and Export Path first.", button=["OK"])
 
 def on_iw_sh_checked(*args):
+    if batch_is_running(undo_checkbox_click(iw_sh_checkbox)):
+        return
     if cmds.menuItem(iw_sh_checkbox, query=True, checkBox=True):
         cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
+        cmds.menuItem(auto_checkbox, edit=True, checkBox=False)
+        if anim_path and export_path:
+            if use_cast:
+                load_cast_from_path(anim_path)
+            else:
+                load_seanim_from_path(anim_path)
+        else:
+            cmds.confirmDialog(title="Error", message="Please select both Anim Path and Export Path first.", button=["OK"])
+
+def on_auto_checked(*args):
+    if batch_is_running(undo_checkbox_click(auto_checkbox)):
+        return
+    if cmds.menuItem(auto_checkbox, query=True, checkBox=True):
+        cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
+        cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
         if anim_path and export_path:
             if use_cast:
                 load_cast_from_path(anim_path)
@@ -250,6 +371,8 @@ def on_iw_sh_checked(*args):
 
 def toggle_cod4_export(*args):
     global export_cod4, export_bo3
+    if batch_is_running({"cod4ExportMenuItem": export_cod4, "bo3ExportMenuItem": export_bo3}):
+        return
     export_cod4 = True
     export_bo3 = False
     cmds.menuItem("cod4ExportMenuItem", edit=True, checkBox=export_cod4)
@@ -265,15 +388,14 @@ def toggle_cod4_export(*args):
 
 
     # Rest of existing logic...
-    CoDMayaTools.SetCurrentGame("CoD4")
-    auto_rename_state = CoDMayaTools.QueryToggableOption("AutomaticRename")
-    if auto_rename_state:
-        CoDMayaTools.SetToggableOption("AutomaticRename")
+    apply_export_game(False)
     cmds.evalDeferred("CoDMayaTools.CreateMenu()")
 
 
 def toggle_export_selected_only(*args):
     global export_selected_only
+    if batch_is_running({"exportSelectedMenuItem": export_selected_only}):
+        return
 
     export_selected_only = not export_selected_only
     cmds.menuItem("exportSelectedMenuItem", edit=True, checkBox=export_selected_only)
@@ -314,6 +436,8 @@ def toggle_export_selected_only(*args):
 
 def toggle_bo3_export(*args):
     global export_bo3, export_cod4
+    if batch_is_running({"bo3ExportMenuItem": export_bo3, "cod4ExportMenuItem": export_cod4}):
+        return
     export_bo3 = True
     export_cod4 = False
     cmds.menuItem("bo3ExportMenuItem", edit=True, checkBox=export_bo3)
@@ -326,17 +450,30 @@ def toggle_bo3_export(*args):
     save_settings()
 
     # Rest of existing logic...
-    CoDMayaTools.SetCurrentGame("CoD12")
+    apply_export_game(True)
+    cmds.evalDeferred("CoDMayaTools.CreateMenu()")
+
+
+def apply_export_game(bo3):
+    """Switch CoDMayaTools between CoD4 (.xanim_export) and BO3 (.xanim_bin) export."""
+    global export_cod4, export_bo3
+    export_bo3 = bo3
+    export_cod4 = not bo3
+
+    if not load_codmaya_tools():
+        print("[ManyAnims] CoDMayaTools not found — export game not switched.")
+        return
+    CoDMayaTools.SetCurrentGame("CoD12" if bo3 else "CoD4")
+    # BO3 wants AutomaticRename on, CoD4 wants it off
     auto_rename_state = CoDMayaTools.QueryToggableOption("AutomaticRename")
-    if not auto_rename_state:
+    if bool(auto_rename_state) != bo3:
         CoDMayaTools.SetToggableOption("AutomaticRename")
-    cmds.evalDeferred("CoDMayaTools.CreateMenu()")
 
 def force_update_codmaya_menu_checkbox(item_name, desired_state):
     if cmds.menuItem(item_name, exists=True):
         cmds.menuItem(item_name, edit=True, checkBox=desired_state)
 
-def create_progress_bar(numfiles):
+def create_progress_bar(numfiles, controls=False):
     # Remove existing window if open
     if cmds.window("ManyAsserts_progress", exists=True):
         cmds.deleteUI("ManyAsserts_progress")
@@ -348,24 +485,42 @@ def create_progress_bar(numfiles):
         sizeable=False,
         minimizeButton=False,
         maximizeButton=False,
-        widthHeight=(320, 45)
+        widthHeight=(320, 75 if controls else 45)
     )
 
     # Use a formLayout to eliminate any internal padding
     form = cmds.formLayout()
     progress = cmds.progressBar("ManyAsserts_progress", maxValue=numfiles, height=20, width=300)
 
-    # Attach progress bar to all sides (flush fit)
-    cmds.formLayout(form, edit=True,
-        attachForm=[(progress, 'top', 5), (progress, 'left', 10), (progress, 'right', 10), (progress, 'bottom', 5)]
-    )
+    if controls:
+        # Pause/Resume and Cancel for cooperative batches, side by side under the bar
+        pause = cmds.button("ManyAnims_pause", label="Pause", command=pause_active_batch)
+        cancel = cmds.button("ManyAnims_cancel", label="Cancel", command=cancel_active_batch)
+        cmds.formLayout(form, edit=True,
+            attachForm=[(progress, 'top', 5), (progress, 'left', 10), (progress, 'right', 10),
+                        (pause, 'left', 10), (pause, 'bottom', 5), (cancel, 'right', 10), (cancel, 'bottom', 5)],
+            attachControl=[(pause, 'top', 5, progress), (cancel, 'top', 5, progress)],
+            attachPosition=[(pause, 'right', 2, 50), (cancel, 'left', 2, 50)]
+        )
+    else:
+        # Attach progress bar to all sides (flush fit)
+        cmds.formLayout(form, edit=True,
+            attachForm=[(progress, 'top', 5), (progress, 'left', 10), (progress, 'right', 10), (progress, 'bottom', 5)]
+        )
 
     cmds.showWindow(window)
     return progress
 
 
-def update_progress_bar(progress_control, current_value):
+def update_progress_bar(progress_control, current_value, status=None):
+    if headless_mode:
+        print(f"[ManyAnims] {status or current_value}")
+        return
+    if not cmds.control(progress_control, exists=True):
+        return  # window closed mid-batch
     cmds.progressBar(progress_control, edit=True, progress=current_value)
+    if status and cmds.window("ManyAsserts_progress", exists=True):
+        cmds.window("ManyAsserts_progress", edit=True, title=status)
     cmds.refresh()
 
 def close_progress_bar():
@@ -374,6 +529,8 @@ def close_progress_bar():
 
 def set_anim_path(*args):
     global anim_path
+    if batch_is_running():
+        return
     selected = cmds.fileDialog2(fileMode=3, dialogStyle=2, caption="Select Animation Folder")
     if selected:
         anim_path = selected[0]
@@ -382,6 +539,8 @@ def set_anim_path(*args):
 
 def set_export_path(*args):
     global export_path
+    if batch_is_running():
+        return
     start_dir = settings.get("export_location", "")
     if not start_dir or not os.path.exists(start_dir):
         start_dir = cmds.workspace(q=True, rd=True)
@@ -402,6 +561,7 @@ def enable_ui_elements_if_paths_selected():
         toggle_ui_elements(True)
 
 def toggle_ui_elements(enable):
+    cmds.menuItem(auto_checkbox, edit=True, enable=enable)
     cmds.menuItem(treyarch_checkbox, edit=True, enable=enable)
     cmds.menuItem(iw_sh_checkbox, edit=True, enable=enable)
     cmds.menuItem(export_selected_menu_item, edit=True, enable=enable)
@@ -437,118 +597,283 @@ def trigger_export_if_all_selected():
                                button=["OK"])
 
 
-def remap_anim_names(name):
+# Default "Anim Auto Rename" rules, applied in order; extra profiles can be added
+# in settings as "remap_profiles": {"name": [["from", "to"], ...]}.
+DEFAULT_REMAP_RULES = [
+    ("fast", "quick"),
+    ("reload_intro", "reload_in"),
+    ("first_pullout", "raise_first"),
+    ("first_time_pullout", "raise_first"),
+    ("first_raise", "raise_first"),
+    ("pullout_first ", "raise_first"),
+    ("lastshot", "fire_last"),
+    ("last_shot", "fire_last"),
+    ("lastfire", "fire_last"),
+    ("ads_rechamber", "rechamber_ads"),
+    ("ads_base_up", "ads_up"),
+    ("ads_base_down", "ads_down"),
+    ("viewmodel", "vm"),
+    ("va_", "vm_"),
+    ("ads_fire", "fire_ads"),
+    ("putaway", "drop"),
+    ("pullout", "raise"),
+]
+
+
+def remap_anim_names(name, rules=None):
     """Rename anim filenames."""
-    name = name.replace("fast", "quick")
-    name = name.replace("reload_intro", "reload_in")
-    name = name.replace("first_pullout", "raise_first")
-    name = name.replace("first_time_pullout", "raise_first")
-    name = name.replace("first_raise", "raise_first")
-    name = name.replace("pullout_first ", "raise_first")
-    name = name.replace("lastshot", "fire_last")
-    name = name.replace("last_shot", "fire_last")
-    name = name.replace("lastfire", "fire_last")
-    name = name.replace("ads_rechamber", "rechamber_ads")
-    name = name.replace("ads_base_up", "ads_up")
-    name = name.replace("ads_base_down", "ads_down")
-    name = name.replace("viewmodel", "vm")
-    name = name.replace("va_", "vm_")
-    name = name.replace("ads_fire", "fire_ads")
-    name = name.replace("putaway", "drop")
-    name = name.replace("pullout", "raise")
+    for old, new in (DEFAULT_REMAP_RULES if rules is None else rules):
+        name = name.replace(old, new)
     return name
 
 
-def load_seanim_from_path(anim_path):
+def export_seanim_file(anim_file_path, report, method, cached_manual_selection=None):
+    """Import one SEAnim and export it; raises on failure."""
+    print("Loading animation file: %s" % anim_file_path)
+    local_anim_path = take_prefetched(anim_file_path)
+    if not import_clip_bulk(local_anim_path, anim_file_path):
+        SEToolsPlugin.__load_seanim__(local_anim_path, scene_time=False, blend_anim=False)
+    release_prefetched(local_anim_path)
+
+    report.phase = "export"
+    export_xanim_file(
+        anim_file_path,
+        export_path,
+        method_type=resolve_clip_method(anim_file_path, method),
+        selection=cached_manual_selection
+    )
+
+
+def load_seanim_from_path(anim_path, method_type=None, files=None):
     # Collect only .seanim files, even if selected_anim_files has mixed entries
-    files_to_process = [
-        f for f in (selected_anim_files or [
-            os.path.join(anim_path, f) for f in os.listdir(anim_path)
-        ])
-        if f.lower().endswith(".seanim")
-    ]
+    files_to_process = expand_anim_inputs(files or selected_anim_files or folder_inputs(anim_path), ".seanim")
 
     if not files_to_process:
         cmds.confirmDialog(title="No Animations", message="No .seanim files to process.", button=["OK"])
         return
 
-    progress_control = create_progress_bar(len(files_to_process))
+    if not load_setools_plugin():
+        cmds.warning(" SEToolsPlugin not found. Cannot import SEAnim files.")
+        return None
 
-    for idx, anim_file_path in enumerate(files_to_process, 1):
-        anim_file = os.path.basename(anim_file_path)
+    method = method_type or current_export_method()
 
-        # 🔒 Extra safety: skip if extension isn’t .seanim
-        if not anim_file_path.lower().endswith(".seanim"):
-            print(f"[ManyAnims] ⚠️ Skipping non-SEAnim file: {anim_file_path}")
-            continue
+    # --- Cache the manual selection; each SEAnim export changes it
+    cached_manual_selection = cmds.ls(selection=True) or []
 
-        print("Loading animation file: %s" % anim_file_path)
-        SEToolsPlugin.__load_seanim__(anim_file_path, scene_time=False, blend_anim=False)
+    def finish_seanim_batch(report):
+        print("Processed %d SEAnim animation(s)." % len(report.exported))
 
-        if export_selected_only:
-            method = "manual"
-        elif cmds.menuItem(treyarch_checkbox, query=True, checkBox=True):
-            method = "treyarch"
+        # Reset scene after all SEAnims are processed
+        if hasattr(SEToolsPlugin, '__scene_resetanim__'):
+            print("[ManyAnims] Resetting scene after export...")
+            SEToolsPlugin.__scene_resetanim__()
         else:
-            method = "iw/sh"
+            print("[ManyAnims] Warning: __scene_resetanim__ not found in SEToolsPlugin")
 
-        export_xanim_file(
-            anim_file_path,
-            export_path,
-            method_type=method
-        )
+        # --- Reset export mode checkboxes ---
+        if not headless_mode:
+            cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
+            cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
+            cmds.menuItem(auto_checkbox, edit=True, checkBox=False)
+            print("[ManyAnims] Reset Treyarch/IW-SH checkboxes after export.")
+        reset_export_selected_mode()
 
+    return run_export_batch(files_to_process, method,
+                            lambda path, report: export_seanim_file(path, report, method, cached_manual_selection),
+                            "SEAnim export", "se", on_finished=finish_seanim_batch)
 
-        update_progress_bar(progress_control, idx)
 
-    close_progress_bar()
-    print("Processed %d SEAnim animation(s)." % len(files_to_process))
+def modified_save_reminder(allow_unsaved=True):
+    return True
 
-    # Reset scene after all SEAnims are processed
-    if hasattr(SEToolsPlugin, '__scene_resetanim__'):
-        print("[ManyAnims] Resetting scene after export...")
-        SEToolsPlugin.__scene_resetanim__()
-    else:
-        print("[ManyAnims] Warning: __scene_resetanim__ not found in SEToolsPlugin")
+# --- Notetracks ---
+# With "native_notetracks" on, notes are read straight from the source clip and
+# filtered in memory, then written to the XAnim exporter in one go. This skips
+# the ReadNotetracks / RemoveUnusableNotes / RemoveAudioOneShot round-trip, which
+# refreshes the XAnim window (and wipes its fields) several times per clip.
+# It is off by default: the rules below are ManyAnims' own and are not known to
+# match what RemoveUnusableNotes / RemoveAudioOneShot keep.
+
+# Override in settings with "notetrack_drop_patterns" / "notetrack_strip_patterns".
+DEFAULT_NOTETRACK_DROP_PATTERNS = [
+    r"^\s*$",  # blank
+    r"[:,]",    # separators of the exporter's "name:frame," storage
+]
+DEFAULT_NOTETRACK_STRIP_PATTERNS = [
+    r"(?i:^audio_?one_?shot[#:_]?)",
+]
+
+# Notetrack storage of the ManyAsset CoDMayaTools fork that ManyAnims 1.2.0+
+# requires: ReadNotetracks writes each slot's notes to
+# "<OBJECT_NAMES['xanim'][2]>.notetracks[<slot>]" as "name:frame,name:frame,",
+# and RefreshXAnimWindow lists their names in "<window>_NoteList".
+# Any other layout falls back to ReadNotetracks.
+NOTETRACK_STORAGE = re.compile(r"^(?:[^:,]+:\d+,)*$")
+
+_notetrack_rules = None
+
+
+def get_notetrack_rules():
+    """Compiled (drop, strip) rule set, built once per settings change."""
+    global _notetrack_rules
+    drop = settings.get("notetrack_drop_patterns", DEFAULT_NOTETRACK_DROP_PATTERNS)
+    strip = settings.get("notetrack_strip_patterns", DEFAULT_NOTETRACK_STRIP_PATTERNS)
+    key = (tuple(drop), tuple(strip))
+    if not _notetrack_rules or _notetrack_rules[0] != key:
+        drop_re = re.compile("|".join(f"(?:{p})" for p in drop)) if drop else None
+        strip_re = re.compile("|".join(f"(?:{p})" for p in strip)) if strip else None
+        _notetrack_rules = (key, drop_re, strip_re)
+    return _notetrack_rules[1], _notetrack_rules[2]
+
+
+def filter_notetracks(notes, frame_count=0):
+    """Apply the drop/strip rules to [(name, frame)], removing duplicates and out-of-range keys."""
+    drop_re, strip_re = get_notetrack_rules()
+    filtered = []
+    seen = set()
+    for name, frame in notes:
+        if strip_re:
+            name = strip_re.sub("", name, count=1)
+        if drop_re and drop_re.search(name):
+            continue
+        if frame < 0 or (frame_count and frame >= frame_count):
+            continue
+        if (name, frame) not in seen:
+            seen.add((name, frame))
+            filtered.append((name, frame))
+    return sorted(filtered, key=lambda n: n[1])
+
+
+def get_source_notetracks(source_path):
+    """Filtered notetracks of a clip, or None when its header can't be read."""
+    info = anim_header_cache.get(source_path)
+    if info is None or "notes" not in info:
+        info = read_anim_header(source_path)
+        anim_header_cache[source_path] = info
+    if info["error"]:
+        return None
+    return filter_notetracks(info["notes"], info["frame_count"])
+
+
+def apply_notetracks_to_exporter(notes):
+    """Write notes straight into the XAnim exporter's notetrack slot.
+
+    Returns False, without changing anything, if the exporter doesn't store
+    notes as NOTETRACK_STORAGE describes.
+    """
+    names = getattr(CoDMayaTools, "OBJECT_NAMES", {}).get("xanim") or []
+    if len(names) < 3:
+        return False
+    window_name, info_node = names[0], names[2]
+    slot_menu = window_name + "_SlotDropDown"
+    note_list = window_name + "_NoteList"
+    if not (cmds.objExists(info_node) and cmds.attributeQuery("notetracks", node=info_node, exists=True)
+            and cmds.optionMenu(slot_menu, exists=True) and cmds.textScrollList(note_list, exists=True)):
+        return False
 
-    # --- Reset export mode checkboxes ---
-    cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
-    cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
-    print("[ManyAnims] Reset Treyarch/IW-SH checkboxes after export.")
-    reset_export_selected_mode()
+    slot = cmds.optionMenu(slot_menu, query=True, select=True)
+    attribute = f"{info_node}.notetracks[{slot}]"
+    if not NOTETRACK_STORAGE.match(cmds.getAttr(attribute) or ""):
+        return False
+    cmds.setAttr(attribute, "".join(f"{name}:{frame}," for name, frame in notes), type="string")
 
+    cmds.textScrollList(note_list, edit=True, removeAll=True)
+    if notes:
+        cmds.textScrollList(note_list, edit=True, append=[name for name, _ in notes])
+    return True
 
-original_save_reminder = CoDMayaTools.SaveReminder
 
-def modified_save_reminder(allow_unsaved=True):
-    return True
+def setup_xanim_export_fields(staged_file_path, source_path, read_scene_notes=True, fps=30):
+    """Fill in the XAnim exporter for one clip: output path, frames, FPS, quality and notetracks."""
+    CoDMayaTools.SaveReminder = modified_save_reminder
+    CoDMayaTools.RefreshXAnimWindow()
 
-def export_xanim_file(input_file_path, output_directory, method_type="treyarch"):
-    ext = ".xanim_export" if export_cod4 else ".xanim_bin" if export_bo3 else ".xanim_export"
-    # --- CLEAN FILENAME (remap anim names) ---
-    base = os.path.basename(input_file_path).replace(".seanim", "")
-    if use_name_remap:
-        base = remap_anim_names(base) # Rename anim filename
-    base = apply_game_prefix(base)
-
-    # Re-append extension
-    output_file_path = os.path.join(output_directory, base + ext)
-
-    print(f"[ManyAnims] Remapped output filename → {output_file_path}")
-    print("Exporting to path: %s" % output_file_path)
-
-    filename_lower = os.path.basename(input_file_path).lower() # added on 18/02/26 - added support for ads anims that have base in the name is before was skipped.
-    is_ads = (
-        "ads_up" in filename_lower
-        or "ads_down" in filename_lower
-        or "ads_base_up" in filename_lower
-        or "ads_base_down" in filename_lower
-    )
+    textFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_SaveToField"
+    fpsFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_FPSField"
+    qualityField = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_qualityField"
+
+    cmds.textField(textFieldName, edit=True, text=staged_file_path)
+    CoDMayaTools.SetFrames('xanim')
+    cmds.intField(fpsFieldName, edit=True, value=fps)
+    cmds.intField(qualityField, edit=True, value=0)
+
+    notes = get_source_notetracks(source_path) if settings.get("native_notetracks", False) else None
+    if notes is not None:
+        if apply_notetracks_to_exporter(notes):
+            print(f"[ManyAnims] Applied {len(notes)} notetrack(s) from {os.path.basename(source_path)}.")
+            return
+        print("[ManyAnims] XAnim exporter notetrack storage not recognised — using ReadNotetracks.")
+
+    if not read_scene_notes:
+        print("[ManyAnims] No notetracks in scene — skipping notetrack read/clean.")
+        return
+
+    try:
+        CoDMayaTools.ReadNotetracks('xanim')
+        print("[ManyAnims] Read scene notetracks.")
+    except Exception as e:
+        print(f"[ManyAnims] Failed to read notetracks: {e}")
+
+    # --- Clean notetracks (RemoveAudioOneShot calls RefreshXAnimWindow internally,
+    #     which wipes the SaveToField — so we re-apply all export fields afterwards) ---
+    try:
+        CoDMayaTools.RemoveUnusableNotes('xanim')
+        print("[ManyAnims] Removed unusable notetracks.")
+    except Exception as e:
+        print(f"[ManyAnims] Failed to remove unusable notetracks: {e}")
+    try:
+        CoDMayaTools.RemoveAudioOneShot('xanim')
+        print("[ManyAnims] Stripped AudioOneShot prefixes from notetracks.")
+    except Exception as e:
+        print(f"[ManyAnims] Failed to strip AudioOneShot notetracks: {e}")
+
+    # Re-apply export fields that RefreshXAnimWindow may have wiped
+    cmds.textField(textFieldName, edit=True, text=staged_file_path)
+    cmds.intField(fpsFieldName, edit=True, value=fps)
+    cmds.intField(qualityField, edit=True, value=0)
+
+
+def select_rig_joints(file_path, method_type, namespace=None):
+    """Select the Treyarch or IW/SH export joints in a rig namespace (default namespace if None)."""
+    namespace = default_namespace if namespace is None else namespace
+    is_ads = is_ads_anim(file_path) # added on 18/02/26 - added support for ads anims that have base in the name is before was skipped.
+
+    if method_type == "treyarch":
+
+        if is_ads:
+            cmds.select(f"{namespace}:tag_view",
+                        f"{namespace}:tag_torso")
+        else:
+            cmds.select(f"{namespace}:tag_torso",
+                        f"{namespace}:tag_cambone",
+                        hierarchy=True)
+
+    elif method_type == "iw/sh":
+
+        if is_ads:
+            if cmds.objExists(f"{namespace}:tag_ads"):
+                cmds.select(f"{namespace}:tag_view",
+                            f"{namespace}:tag_ads")
+            else:
+                raise ExportError("select", f"ADS joints ('{namespace}:tag_ads') not found!")
+        else:
+            if cmds.objExists(f"{namespace}:tag_ads") and cmds.objExists(f"{namespace}:tag_cambone"):
+                cmds.select(f"{namespace}:tag_ads",
+                            f"{namespace}:tag_cambone",
+                            hierarchy=True)
+            else:
+                raise ExportError("select", f"Required joints not found in namespace '{namespace}'!")
+
+
+def export_xanim_file(input_file_path, output_directory, method_type="treyarch", selection=None):
+    is_ads = is_ads_anim(input_file_path)
 
     # --- Joint selection logic ---
     if method_type == "manual":
 
-        current_selection = cmds.ls(selection=True)
+        # The batch passes the selection it started with
+        current_selection = cmds.ls(selection=True) if selection is None else selection
 
         # -----------------------------
         # Export Selected Only Mode
@@ -556,12 +881,7 @@ def export_xanim_file(input_file_path, output_directory, method_type="treyarch")
         if export_selected_only:
 
             if not current_selection:
-                cmds.confirmDialog(
-                    title="Error",
-                    message="Export Selected Only mode is enabled but no joints are selected!",
-                    button=["OK"]
-                )
-                return
+                raise ExportError("select", "Export Selected Only mode is enabled but no joints are selected!")
 
             print(f"[ManyAnims] Export Selected Only → Using current selection: {current_selection}")
             cmds.select(clear=True)
@@ -589,82 +909,53 @@ def export_xanim_file(input_file_path, output_directory, method_type="treyarch")
                     cmds.select(normal_joints)
 
                 else:
-                    cmds.confirmDialog(
-                        title="Error",
-                        message="No joints selected and no stored joints available!",
-                        button=["OK"]
-                    )
-                    return
-
-    elif method_type == "treyarch":
-
-        if is_ads:
-            cmds.select(f"{default_namespace}:tag_view",
-                        f"{default_namespace}:tag_torso")
-        else:
-            cmds.select(f"{default_namespace}:tag_torso",
-                        f"{default_namespace}:tag_cambone",
-                        hierarchy=True)
-
-    elif method_type == "iw/sh":
-
-        if is_ads:
-            if cmds.objExists(f"{default_namespace}:tag_ads"):
-                cmds.select(f"{default_namespace}:tag_view",
-                            f"{default_namespace}:tag_ads")
-            else:
-                cmds.confirmDialog(
-                    title="Error",
-                    message=f"ADS joints ('{default_namespace}:tag_ads') not found!",
-                    button=["OK"]
-                )
-                return
-        else:
-            if cmds.objExists(f"{default_namespace}:tag_ads") and cmds.objExists(f"{default_namespace}:tag_cambone"):
-                cmds.select(f"{default_namespace}:tag_ads",
-                            f"{default_namespace}:tag_cambone",
-                            hierarchy=True)
-            else:
-                cmds.confirmDialog(
-                    title="Error",
-                    message=f"Required joints not found in namespace '{default_namespace}'!",
-                    button=["OK"]
-                )
-                return
-
-
-    # --- Setup CoDMayaTools for export ---
-    CoDMayaTools.SaveReminder = modified_save_reminder
-    CoDMayaTools.RefreshXAnimWindow()
-    
-    textFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_SaveToField"
-    cmds.textField(textFieldName, edit=True, text=output_file_path)
-    CoDMayaTools.SetFrames('xanim')
-    
-    fpsFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_FPSField"
-    cmds.intField(fpsFieldName, edit=True, value=30)
-    qualityField = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_qualityField"
-    cmds.intField(qualityField, edit=True, value=0)
-    CoDMayaTools.ReadNotetracks('xanim')
+                    raise ExportError("select", "No joints selected and no stored joints available!")
 
-    # --- Clean notetracks (RemoveAudioOneShot calls RefreshXAnimWindow internally,
-    #     which wipes the SaveToField — so we re-apply all export fields afterwards) ---
-    try:
-        CoDMayaTools.RemoveUnusableNotes('xanim')
-        print("[ManyAnims] Removed unusable notetracks.")
-    except Exception as e:
-        print(f"[ManyAnims] Failed to remove unusable notetracks: {e}")
-    try:
-        CoDMayaTools.RemoveAudioOneShot('xanim')
-        print("[ManyAnims] Stripped AudioOneShot prefixes from notetracks.")
-    except Exception as e:
-        print(f"[ManyAnims] Failed to strip AudioOneShot notetracks: {e}")
+        export_clip_targets(input_file_path, output_directory)
+    else:
+        export_clip_rigs(input_file_path, output_directory, method_type)
 
-    # Re-apply export fields that RefreshXAnimWindow may have wiped
-    cmds.textField(textFieldName, edit=True, text=output_file_path)
-    cmds.intField(fpsFieldName, edit=True, value=30)
-    cmds.intField(qualityField, edit=True, value=0)
 
+def export_clip_rigs(source_path, output_directory, method_type, read_scene_notes=True):
+    """Export the imported clip from every rig namespace in the scene, then raise if any rig failed."""
+    namespaces = get_export_namespaces()
+    failed = []
+    for namespace in namespaces:
+        try:
+            select_rig_joints(source_path, method_type, namespace)
+        except ExportError as e:
+            if len(namespaces) == 1:
+                raise
+            print(f"[ManyAnims] Skipping rig '{namespace}': {e}")
+            failed.append(namespace)
+            continue
+        export_clip_targets(source_path, output_directory, read_scene_notes,
+                            rig_suffix=get_rig_suffix(namespace, namespaces))
+    if failed:
+        raise ExportError("select", f"Required joints not found for rig(s): {', '.join(failed)}")
+
+
+def export_clip_targets(source_path, output_directory, read_scene_notes=True, rig_suffix=""):
+    """Export the imported clip once per export target, keeping the current selection."""
+    outputs = []
+    for target in order_targets_for_game(get_export_targets()):
+        if target["bo3"] != export_bo3:
+            apply_export_game(target["bo3"])
+        output_file_path = build_output_path(source_path, output_directory, target, rig_suffix)
+        print(f"[ManyAnims] Remapped output filename → {output_file_path}")
+        print("Exporting to path: %s" % output_file_path)
+        staged_file_path = stage_output(output_file_path)
+
+        # --- Setup CoDMayaTools for export ---
+        setup_xanim_export_fields(staged_file_path, source_path, read_scene_notes, fps=target["fps"])
+        run_xanim_export(staged_file_path, output_file_path, source_path)
+        journal_output(output_file_path)
+        outputs.append(output_file_path)
+    return outputs
+
+
+def run_xanim_export(staged_file_path, output_file_path, source_path):
+    """Run the XAnim export set up by setup_xanim_export_fields and queue the output."""
     # --- Suppress CoDMayaTools progress window ---
     _original_window = cmds.window  # save original reference
     _original_show_window = cmds.showWindow  # also intercept showWindow (safety)
@@ -691,7 +982,10 @@ def export_xanim_file(input_file_path, output_directory, method_type="treyarch")
     try:
         cmds.window = _silent_window
         cmds.showWindow = lambda *args, **kwargs: None  # block forced popup
+        expected_parts = len(cmds.ls(selection=True, type="joint") or [])
         CoDMayaTools.GeneralWindow_ExportSelected('xanim', exportingMultiple=False)
+        commit_output(staged_file_path, output_file_path,
+                      verification_job(output_file_path, source_path, expected_parts), source_path)
     finally:
         cmds.window = _original_window
         cmds.showWindow = _original_show_window
@@ -775,6 +1069,8 @@ def show_about_dialog(*args):
 
 def open_namespace_dialog(*args):
     global default_namespace
+    if batch_is_running():
+        return
     result = cmds.promptDialog(
         title="Set Namespace",
         message="Enter Default Namespace:",
@@ -790,6 +1086,26 @@ def open_namespace_dialog(*args):
 
 
 
+def set_export_namespaces(*args):
+    if batch_is_running():
+        return
+    current = settings.get("export_namespaces") or []
+    result = cmds.promptDialog(
+        title="Set Rig Namespaces",
+        message="Export each clip from these rig namespaces (comma separated),\n\"auto\" for every rig in the scene, or empty for the default namespace:",
+        button=["OK", "Cancel"],
+        defaultButton="OK",
+        cancelButton="Cancel",
+        dismissString="Cancel",
+        text=current if isinstance(current, str) else ", ".join(current)
+    )
+    if result == "OK":
+        text = cmds.promptDialog(query=True, text=True).strip()
+        settings["export_namespaces"] = "auto" if text.lower() == "auto" else [n.strip() for n in text.split(",") if n.strip()]
+        save_settings()
+        print(f"[ManyAnims] Rig namespaces set to: {settings['export_namespaces']} → {get_export_namespaces()}")
+
+
 
 # CAST SUPPORT ADD HERE ELFENLIEDTOPFAN5 19/09/2025 TAKEN FROM DERIVED FROM ALICE LOAD METHORD ON 01/09/25
 
@@ -804,6 +1120,8 @@ def reset():
 # --- Toggle CAST export ---
 def toggle_use_cast(*args):
     global use_cast, use_se_mode
+    if batch_is_running({"useCastMenuItem": use_cast, "useSEModeMenuItem": use_se_mode}):
+        return
     use_cast = not use_cast
     use_se_mode = not use_cast  # Opposite
     cmds.menuItem("useCastMenuItem", edit=True, checkBox=use_cast)
@@ -817,6 +1135,8 @@ def toggle_use_cast(*args):
 
 def toggle_se_mode(*args):
     global use_se_mode, use_cast
+    if batch_is_running({"useSEModeMenuItem": use_se_mode, "useCastMenuItem": use_cast}):
+        return
     use_se_mode = not use_se_mode
     use_cast = not use_se_mode  # Opposite
     cmds.menuItem("useSEModeMenuItem", edit=True, checkBox=use_se_mode)
@@ -831,6 +1151,8 @@ def toggle_se_mode(*args):
 
 def toggle_name_remap(*args):
     global use_name_remap
+    if batch_is_running({"nameRemapMenuItem": use_name_remap}):
+        return
 
     use_name_remap = not use_name_remap
     cmds.menuItem("nameRemapMenuItem", edit=True, checkBox=use_name_remap)
@@ -844,6 +1166,8 @@ def toggle_name_remap(*args):
 
 def set_game_prefix(*args):
     global game_prefix
+    if batch_is_running():
+        return
     result = cmds.promptDialog(
         title="Set Game Prefix",
         message="Enter Game Prefix (e.g t6, iw3):",
@@ -866,22 +1190,131 @@ def set_game_prefix(*args):
         cmds.confirmDialog(title="Game Prefix Cleared", message="Game Prefix removed.")
 
 
-def apply_game_prefix(name):
+def apply_game_prefix(name, prefix=None):
     """Insert game prefix after the first vm_ or va_ anywhere in the name."""
-    if not game_prefix:
+    prefix = game_prefix if prefix is None else prefix
+    if not prefix:
         return name
 
     # Replace the FIRST vm_ only
     if "vm_" in name:
-        return name.replace("vm_", f"vm_{game_prefix}_", 1)
+        return name.replace("vm_", f"vm_{prefix}_", 1)
 
     # Replace the FIRST va_ only
     if "va_" in name:
-        return name.replace("va_", f"va_{game_prefix}_", 1)
+        return name.replace("va_", f"va_{prefix}_", 1)
 
     return name
 
 
+# --- Export targets ---
+# Each imported clip is exported once per target, so .xanim_export and
+# .xanim_bin for several prefixes come out of a single import. Set in settings
+# as "export_targets"; when empty the current menu options make one target.
+#
+# "export_targets": [
+#     {"format": "xanim_export", "prefix": "iw3", "remap": true},
+#     {"format": "xanim_bin", "prefix": "t7", "remap": "bo3_names", "fps": 30, "suffix": "_bo3"}
+# ]
+#
+# "remap" is true (default rules), false, or the name of a "remap_profiles" entry.
+
+EXPORT_TARGET_FORMATS = {"xanim_export": False, "xanim_bin": True}
+
+
+def get_export_targets():
+    """Normalised export targets: dicts with bo3, ext, prefix, rules, fps and suffix."""
+    configured = settings.get("export_targets") or [{
+        "format": "xanim_bin" if export_bo3 else "xanim_export",
+        "prefix": game_prefix,
+        "remap": use_name_remap,
+    }]
+    profiles = settings.get("remap_profiles", {})
+    targets = []
+    for entry in configured:
+        fmt = entry.get("format", "xanim_export").lstrip(".").lower()
+        if fmt not in EXPORT_TARGET_FORMATS:
+            raise ValueError(f"Unknown export target format: {fmt}")
+        remap = entry.get("remap", False)
+        if isinstance(remap, str):
+            if remap not in profiles:
+                raise ValueError(f"Unknown remap profile: {remap}")
+            rules = [tuple(rule) for rule in profiles[remap]]
+        else:
+            rules = DEFAULT_REMAP_RULES if remap else []
+        targets.append({
+            "bo3": EXPORT_TARGET_FORMATS[fmt],
+            "ext": "." + fmt,
+            "prefix": entry.get("prefix", game_prefix) or "",
+            "rules": rules,
+            "fps": int(entry.get("fps", 30)),
+            "suffix": entry.get("suffix", ""),
+        })
+    return targets
+
+
+def order_targets_for_game(targets):
+    """Targets for the current CoDMayaTools game first, so a clip switches game at most once."""
+    return sorted(targets, key=lambda t: t["bo3"] != export_bo3)
+
+
+def build_output_path(source_path, output_directory, target, rig_suffix=""):
+    """Output file for one clip and target: remap rules, game prefix, suffixes and extension."""
+    base = os.path.splitext(os.path.basename(source_path))[0]
+    base = remap_anim_names(base, target["rules"])
+    base = apply_game_prefix(base, target["prefix"])
+    return os.path.join(output_directory, base + rig_suffix + target["suffix"] + target["ext"])
+
+
+def check_export_targets(targets):
+    """Raise ValueError if two targets would write the same file."""
+    seen = {}
+    for number, target in enumerate(targets, 1):
+        key = (target["ext"], target["prefix"], tuple(target["rules"]), target["suffix"])
+        if key in seen:
+            raise ValueError(f"Export targets {seen[key]} and {number} write the same files.")
+        seen[key] = number
+
+
+# --- Rig namespaces ---
+# A scene can hold several rigs (viewmodel + worldmodel, weapon variants). With
+# "export_namespaces" set, every imported clip is exported once per rig with
+# that rig's joints: a list of namespaces, or "auto" for every namespace with a
+# tag_torso or tag_ads joint. Outputs get "_<namespace>" appended, or the
+# suffix from "namespace_suffixes": {"namespace": "_suffix"}.
+
+RIG_ROOT_JOINTS = ("tag_torso", "tag_ads")
+
+
+def find_rig_namespaces():
+    """Namespaces of every rig in the scene, found by their tag_torso / tag_ads joints."""
+    joints = cmds.ls([f"*:{j}" for j in RIG_ROOT_JOINTS], type="joint", recursive=True) or []
+    return sorted({j.split("|")[-1].rsplit(":", 1)[0] for j in joints if ":" in j})
+
+
+def get_export_namespaces():
+    """Rig namespaces to export from; the default namespace unless "export_namespaces" is set."""
+    configured = settings.get("export_namespaces") or []
+    if configured == "auto":
+        configured = find_rig_namespaces()
+        if not configured:
+            print("[ManyAnims] No rigs found in the scene, using the default namespace.")
+    elif isinstance(configured, str):
+        configured = [n.strip() for n in configured.split(",")]
+    namespaces = [n for n in configured if n]
+    return namespaces or [default_namespace]
+
+
+def get_rig_suffix(namespace, namespaces):
+    """Output name suffix for one rig; none when only one rig is exported."""
+    suffixes = settings.get("namespace_suffixes", {})
+    if namespace in suffixes:
+        return suffixes[namespace]
+    if len(namespaces) == 1:
+        return ""
+    return "_" + namespace.replace(":", "_")
+
+
 
 def hide_codmaya_progress_window():
     """Hide CoDMayaTools internal progress window if it appears."""
@@ -895,261 +1328,4234 @@ def hide_codmaya_progress_window():
     
 
 
-# --- Load CAST files ---
-def load_cast_from_path(anim_path):
-    try:
-        import castplugin
-    except ImportError:
-        cmds.warning(" castplugin not found. Cannot import CAST files.")
-        return
+# --- Header prescan ---
+# Reads only the header and bone table of each clip so broken or incompatible
+# files are found before the batch starts instead of hours into it.
+
+CAST_MAGIC = 0x74736163
+CAST_NODE_ROOT = 0x746F6F72
+CAST_NODE_ANIMATION = 0x6D696E61
+CAST_NODE_CURVE = 0x76727563
+CAST_NODE_NOTETRACK = 0x6669746E
+
+# Cast property id -> (struct format, element size); integer buffers are unsigned
+CAST_PROPERTY_TYPES = {
+    0x62: ("B", 1),     # b  byte
+    0x68: ("H", 2),     # h  short
+    0x69: ("I", 4),     # i  int
+    0x6C: ("Q", 8),     # l  int64
+    0x66: ("f", 4),     # f  float
+    0x64: ("d", 8),     # d  double
+    0x7632: ("2f", 8),  # 2v vector2
+    0x7633: ("3f", 12), # 3v vector3
+    0x7634: ("4f", 16), # 4v vector4
+}
+CAST_PROPERTY_STRING = 0x73
+
+SEANIM_MAGIC = b"SEAnim"
+SEANIM_PRESENCE_LOC = 1 << 0
+SEANIM_PRESENCE_ROT = 1 << 1
+SEANIM_PRESENCE_SCALE = 1 << 2
+SEANIM_PRECISION_HIGH = 1 << 0
+
+# Joints each export method selects, keyed by (method, is_ads)
+REQUIRED_JOINTS = {
+    ("treyarch", True): ("tag_view", "tag_torso"),
+    ("treyarch", False): ("tag_torso", "tag_cambone"),
+    ("iw/sh", True): ("tag_view", "tag_ads"),
+    ("iw/sh", False): ("tag_ads", "tag_cambone"),
+}
 
-    # Collect all .cast files (or use selected)
-    files_to_process = selected_anim_files or [
-        os.path.join(anim_path, f) for f in os.listdir(anim_path) if f.lower().endswith(".cast")
-    ]
-    if not files_to_process:
-        cmds.confirmDialog(title="No Animations", message="No .cast files to process.", button=["OK"])
+
+def _read_struct(f, fmt):
+    size = struct.calcsize(fmt)
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("file is truncated")
+    return struct.unpack(fmt, data)
+
+
+def _read_cstring(f):
+    chars = bytearray()
+    while True:
+        c = f.read(1)
+        if not c:
+            raise ValueError("file is truncated")
+        if c == b"\x00":
+            return chars.decode("utf-8", "replace")
+        chars += c
+
+
+def _read_cast_property(f, end, full=False):
+    """Read one Cast property. Unless `full`, buffers are skipped, keeping only their length and last value."""
+    prop_id, name_size, count = _read_struct(f, "<HHI")
+    name = f.read(name_size).decode("utf-8", "replace")
+
+    if prop_id == CAST_PROPERTY_STRING:
+        return name, count, _read_cstring(f)
+
+    if prop_id not in CAST_PROPERTY_TYPES:
+        raise ValueError(f"unknown Cast property type 0x{prop_id:X}")
+
+    fmt, element_size = CAST_PROPERTY_TYPES[prop_id]
+    data_end = f.tell() + element_size * count
+    if data_end > end:
+        raise ValueError("file is truncated")
+
+    if full:
+        width = element_size // struct.calcsize(fmt[-1])
+        values = _read_struct(f, f"<{count * width}{fmt[-1]}")
+        if width > 1:
+            values = [values[i:i + width] for i in range(0, len(values), width)]
+        return name, count, list(values)
+
+    last = None
+    if count:
+        f.seek(data_end - element_size)
+        last = _read_struct(f, "<" + fmt)
+        last = last[0] if len(last) == 1 else last
+    f.seek(data_end)
+    return name, count, last
+
+
+def _scan_cast_node(f, end, info):
+    start = f.tell()
+    node_id, node_size, _hash, prop_count, child_count = _read_struct(f, "<IIQII")
+    node_end = start + node_size
+    if node_size < 24 or node_end > end:
+        raise ValueError("file is truncated")
+
+    if node_id not in (CAST_NODE_ROOT, CAST_NODE_ANIMATION, CAST_NODE_CURVE, CAST_NODE_NOTETRACK):
+        f.seek(node_end)
         return
 
-    progress_control = create_progress_bar(len(files_to_process))
+    props = {}
+    for _ in range(prop_count):
+        name, count, value = _read_cast_property(f, node_end, full=node_id == CAST_NODE_NOTETRACK)
+        props[name] = (count, value)
+
+    if node_id == CAST_NODE_ANIMATION:
+        info["animations"] += 1
+        if "fr" in props:
+            info["framerate"] = props["fr"][1]
+    elif node_id == CAST_NODE_CURVE:
+        bone = props.get("nn", (0, None))[1]
+        if bone and bone not in info["bones"]:
+            info["bones"].append(bone)
+        count, last_frame = props.get("kb", (0, None))
+        if count and last_frame is not None:
+            info["frame_count"] = max(info["frame_count"], int(last_frame) + 1)
+    elif node_id == CAST_NODE_NOTETRACK:
+        note_name = props.get("n", (0, ""))[1]
+        count, frames = props.get("kb", (0, []))
+        info["note_count"] += count
+        info["notes"].extend((note_name, int(frame)) for frame in frames)
+        if frames:
+            info["frame_count"] = max(info["frame_count"], int(max(frames)) + 1)
+
+    for _ in range(child_count):
+        _scan_cast_node(f, node_end, info)
+    f.seek(node_end)
+
+
+def _read_cast_header(f, size, info):
+    magic, _version, root_count, _flags = _read_struct(f, "<4I")
+    if magic != CAST_MAGIC:
+        raise ValueError("not a Cast file")
+    info["animations"] = 0
+    for _ in range(root_count):
+        _scan_cast_node(f, size, info)
+    if not info["animations"]:
+        raise ValueError("Cast file has no animation")
+
+
+def _read_seanim_header(f, size, info):
+    if f.read(6) != SEANIM_MAGIC:
+        raise ValueError("not an SEAnim file")
+    _version, header_size = _read_struct(f, "<hh")
+    (_anim_type, _anim_flags, presence, properties, _r0, _r1, framerate,
+     frame_count, bone_count, modifier_count, _r2, _r3, _r4, note_count) = _read_struct(f, "<6BfIIB3BI")
+    # Skip any header fields newer than the layout above
+    f.seek(8 + header_size)
+
+    info["framerate"] = framerate
+    info["frame_count"] = frame_count
+    info["note_count"] = note_count
+    info["bones"] = [_read_cstring(f) for _ in range(bone_count)]
+
+    bone_index_t = "<B" if bone_count <= 0xFF else "<H"
+    frame_t = "<B" if frame_count <= 0xFF else "<H" if frame_count <= 0xFFFF else "<I"
+    frame_size = struct.calcsize(frame_t)
+    value_size = 8 if properties & SEANIM_PRECISION_HIGH else 4
+    f.seek(modifier_count * (struct.calcsize(bone_index_t) + 1), os.SEEK_CUR)
+
+    # Walk the key tables by seeking so a truncated tail is still caught
+    for _ in range(bone_count):
+        _read_struct(f, "<B")  # bone flags
+        for flag, components in ((SEANIM_PRESENCE_LOC, 3), (SEANIM_PRESENCE_ROT, 4), (SEANIM_PRESENCE_SCALE, 3)):
+            if presence & flag:
+                key_count = _read_struct(f, frame_t)[0]
+                f.seek(key_count * (frame_size + components * value_size), os.SEEK_CUR)
+        if f.tell() > size:
+            raise ValueError("file is truncated")
+
+    for _ in range(note_count):
+        frame = _read_struct(f, frame_t)[0]
+        info["notes"].append((_read_cstring(f), frame))
+
+
+def read_anim_header(file_path, data=None):
+    """Read frame/bone/notetrack info from a .cast or .seanim without loading keys.
+
+    `data` can hold the file contents when they are already in memory.
+    """
+    info = {
+        "path": file_path,
+        "format": "cast" if file_path.lower().endswith(".cast") else "seanim",
+        "size": 0,
+        "framerate": 0.0,
+        "frame_count": 0,
+        "bones": [],
+        "note_count": 0,
+        "notes": [],
+        "error": None,
+        "warnings": [],
+    }
+    try:
+        with (io.BytesIO(data) if data is not None else open_source(file_path)) as f:
+            info["size"] = len(data) if data is not None else source_size(file_path)
+            if info["format"] == "cast":
+                _read_cast_header(f, info["size"], info)
+            else:
+                _read_seanim_header(f, info["size"], info)
+        if not info["bones"]:
+            info["error"] = "no bones"
+        elif not info["frame_count"]:
+            info["error"] = "no frames"
+    except (OSError, ValueError, struct.error) as e:
+        info["error"] = str(e)
+    return info
+
+
+def is_ads_anim(file_path):
+    """ADS clips get the ADS joint set (also matches the 'base' variants)."""
+    name = os.path.basename(file_path).lower()
+    return (
+        "ads_up" in name
+        or "ads_down" in name
+        or "ads_base_up" in name
+        or "ads_base_down" in name
+    )
 
-    # --- Cache original manual selection BEFORE CAST modifies it
-    cached_manual_selection = cmds.ls(selection=True)
 
-    for idx, cast_file_path in enumerate(files_to_process, 1):
-        cast_file = os.path.basename(cast_file_path)
-        print(f"[ManyAnims] Loading CAST animation: {cast_file_path}")
+def current_export_method():
+    if export_selected_only:
+        return "manual"
+    if cmds.menuItem(treyarch_checkbox, query=True, checkBox=True):
+        return "treyarch"
+    if cmds.menuItem(auto_checkbox, query=True, checkBox=True):
+        return "auto"
+    return "iw/sh"
+
+
+# --- Rig profile detection ---
+# The "auto" method picks Treyarch or IW/SH per clip, so a folder mixing both
+# styles exports in one pass. settings["method_overrides"] ({"name glob":
+# "treyarch" / "iw/sh"}, first match wins) is checked first, then the clip's
+# bones (tag_ads means IW/SH, tag_torso without it Treyarch), then which of
+# the two joint sets the rig in the scene has.
+
+PROFILE_BONES = (("tag_ads", "iw/sh"), ("tag_torso", "treyarch"))
+
+_clip_methods = {}  # path -> (method, reason), for the current batch
+_auto_rig_joints = None
+
+
+def detect_clip_method(file_path, rig_joints):
+    """(method, reason) for one clip under the "auto" method."""
+    name = os.path.basename(file_path).lower()
+    for pattern, method in (settings.get("method_overrides") or {}).items():
+        if method in ("treyarch", "iw/sh") and fnmatch.fnmatch(name, pattern.lower()):
+            return method, f"override {pattern}"
+
+    info = anim_header_cache.get(file_path)
+    if info is None:
+        info = anim_header_cache[file_path] = read_anim_header(file_path)
+    bones = {bone.split(":")[-1] for bone in info["bones"]}
+    for bone, method in PROFILE_BONES:
+        if bone in bones:
+            return method, f"clip has {bone}"
+
+    is_ads = is_ads_anim(file_path)
+    fits = [method for method in ("iw/sh", "treyarch")
+            if all(joint in rig_joints for joint in REQUIRED_JOINTS[(method, is_ads)])]
+    if len(fits) == 1:
+        return fits[0], "rig joints"
+    return settings.get("auto_method_fallback", "iw/sh"), "fallback"
+
+
+def resolve_clip_method(file_path, method_type):
+    """The method a clip is exported with: method_type itself, or the detected one for "auto"."""
+    global _auto_rig_joints
+    if method_type != "auto":
+        return method_type
+    if file_path not in _clip_methods:
+        if _auto_rig_joints is None:
+            _auto_rig_joints = set().union(*(get_rig_joint_names(ns) for ns in get_export_namespaces()))
+        method, reason = _clip_methods[file_path] = detect_clip_method(file_path, _auto_rig_joints)
+        print(f"[ManyAnims] {os.path.basename(file_path)}: {method} ({reason})")
+    return _clip_methods[file_path][0]
+
+
+def reset_clip_methods():
+    """Forget detected methods so a new batch sees the current scene and settings."""
+    global _auto_rig_joints
+    _clip_methods.clear()
+    _auto_rig_joints = None
+
+
+def get_rig_joint_names(namespace):
+    """Short names of every joint in the rig namespace."""
+    joints = cmds.ls(f"{namespace}:*", type="joint") if namespace else cmds.ls(type="joint")
+    return {j.split("|")[-1].split(":")[-1] for j in (joints or [])}
+
+
+def check_anim_against_rig(info, rig_joints, method, namespace=None):
+    """Flag clips that can't export against the loaded rig."""
+    if info["error"]:
+        return
+    namespace = default_namespace if namespace is None else namespace
+    method = resolve_clip_method(info["path"], method)
+
+    if method in ("treyarch", "iw/sh"):
+        required = REQUIRED_JOINTS[(method, is_ads_anim(info["path"]))]
+        missing = [j for j in required if j not in rig_joints]
+        if missing:
+            info["error"] = f"rig is missing {', '.join(namespace + ':' + j for j in missing)}"
+            return
 
-        # --- Clear animation keys
-        joints = cmds.ls(type="joint")
-        if joints:
-            cmds.cutKey(joints, time=(), option="keys")
+    if rig_joints:
+        unmatched = [b for b in info["bones"] if b not in rig_joints]
+        if len(unmatched) == len(info["bones"]):
+            info["error"] = "no clip bones match the rig"
+        elif unmatched:
+            info["warnings"].append(f"{len(unmatched)} bone(s) not in rig")
 
 
-        # --- Check for specific rig joint groups before clearing notetracks ---
-        rig_joint_groups = {"tx:Joints", "iw2:Joints", "iw3:Joints"}
-        scene_transforms = set(cmds.ls(type='transform'))
+def prescan_anim_files(files, method):
+    """Read every clip header in parallel and check it against the rig."""
+    from concurrent.futures import ThreadPoolExecutor
+    namespaces = get_export_namespaces() if method in ("treyarch", "iw/sh", "auto") else [default_namespace]
+    rigs = [(namespace, get_rig_joint_names(namespace)) for namespace in namespaces]
+    workers = settings.get("prescan_threads", 0) or min(8, (os.cpu_count() or 1) + 4)
 
-        # Look for any of the exact groups in the scene
-        found_rig_groups = rig_joint_groups.intersection(scene_transforms)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(read_anim_header, files))
 
-        if found_rig_groups:
-            print(f"[ManyAnims]  Found special rig joint group(s): {list(found_rig_groups)} → Skipping ClearAndRemoveCastNotetracks()")
-        else:
-            try:
-                CoDMayaTools.ClearAndRemoveCastNotetracks("xanim")
-                print("[ManyAnims]  Cleared and removed CAST notetracks.")
-            except Exception as e:
-                print(f"[ManyAnims]  Failed to clear CAST notetracks: {e}")
-                
-        castplugin.importCast(cast_file_path)
-
-        # --- Determine export extension (.xanim_bin / .xanim_export)
-        ext = ".xanim_export" if export_cod4 else ".xanim_bin"
-        # --- CLEAN FILENAME (remap anim names) ---
-        base = cast_file.replace(".cast", "")
-        if use_name_remap:
-            base = remap_anim_names(base)
-        base = apply_game_prefix(base)
-
-        output_file_path = os.path.join(export_path, base + ext)
-
-        print(f"[ManyAnims] Remapped CAST output filename → {output_file_path}")
-
-        print(f"[ManyAnims] Exporting to: {output_file_path}")
-
-        # --- Refresh CoDMayaTools and prepare export
-        CoDMayaTools.RefreshXAnimWindow()
-        CoDMayaTools.SaveReminder = modified_save_reminder
-
-        # Set export fields
-        textFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_SaveToField"
-        cmds.textField(textFieldName, edit=True, text=output_file_path)
-        print(f"Exporting To: {textFieldName}")
-        CoDMayaTools.SetFrames('xanim')
-        fpsFieldName = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_FPSField"
-        cmds.intField(fpsFieldName, edit=True, value=30)
-        qualityField = CoDMayaTools.OBJECT_NAMES['xanim'][0] + "_qualityField"
-        cmds.intField(qualityField, edit=True, value=0)
-
-        # --- Determine method type
-        #method_type = "treyarch" if cmds.menuItem(treyarch_checkbox, query=True, checkBox=True) else "iw/sh" 
-        if export_selected_only:
-            method_type = "manual"
-        elif cmds.menuItem(treyarch_checkbox, query=True, checkBox=True):
-            method_type = "treyarch"
-        else:
-            method_type = "iw/sh"
-        fname = cast_file.lower() # have added in support for base as well 18/02/26
-        is_ads = (
-            "ads_up" in fname
-            or "ads_down" in fname
-            or "ads_base_up" in fname
-            or "ads_base_down" in fname
-        )
+    for info in results:
+        anim_header_cache[info["path"]] = info
 
-        # --- Joint selection
-        try:
-            if method_type == "manual":
+    for info in results:
+        if len(rigs) == 1 or info["error"]:
+            check_anim_against_rig(info, rigs[0][1], method, rigs[0][0])
+            continue
+        # Several rigs: only an error when no rig can export the clip
+        rig_errors = []
+        for namespace, rig_joints in rigs:
+            probe = dict(info, warnings=[])
+            check_anim_against_rig(probe, rig_joints, method, namespace)
+            info["warnings"].extend(f"{namespace}: {w}" for w in probe["warnings"])
+            if probe["error"]:
+                rig_errors.append(f"{namespace}: {probe['error']}")
+        if len(rig_errors) == len(rigs):
+            info["error"] = "; ".join(rig_errors)
+        else:
+            info["warnings"].extend(rig_errors)
+    return results
+
+
+def print_prescan_table(results):
+    name_width = max([len(os.path.basename(r["path"])) for r in results] + [4])
+    print(f"[ManyAnims] Prescan of {len(results)} file(s):")
+    print(f"  {'File':<{name_width}}  {'Frames':>6}  {'Bones':>5}  {'Notes':>5}  {'Size KB':>8}  Status")
+    for r in results:
+        status = "ERROR: " + r["error"] if r["error"] else "; ".join(r["warnings"]) or "OK"
+        print(f"  {os.path.basename(r['path']):<{name_width}}  {r['frame_count']:>6}  {len(r['bones']):>5}  "
+              f"{r['note_count']:>5}  {r['size'] / 1024.0:>8.1f}  {status}")
+
+
+def run_prescan(files, method):
+    """Prescan the batch and return the files that are safe to export, or None if cancelled."""
+    if not prescan_enabled:
+        return files
+
+    results = prescan_anim_files(files, method)
+    print_prescan_table(results)
+
+    good = [r["path"] for r in results if not r["error"]]
+    bad = [r for r in results if r["error"]]
+    total_frames = sum(r["frame_count"] for r in results if not r["error"])
+
+    if not good:
+        if headless_mode:
+            print(f"[ManyAnims] Prescan: none of the {len(files)} file(s) can be exported.")
+            return None
+        cmds.confirmDialog(title="Prescan Failed",
+                           message=f"None of the {len(files)} file(s) can be exported.\nSee the Script Editor for details.",
+                           button=["OK"])
+        return None
+
+    message = f"{len(good)} file(s) ready ({total_frames} frames)."
+    if bad:
+        listed = "\n".join(f"{os.path.basename(r['path'])}: {r['error']}" for r in bad[:10])
+        more = f"\n...and {len(bad) - 10} more" if len(bad) > 10 else ""
+        message += f"\n{len(bad)} file(s) will be skipped:\n{listed}{more}"
+
+    if headless_mode:
+        print("[ManyAnims] Prescan: " + message)
+        return good
+
+    result = cmds.confirmDialog(title="Prescan Complete", message=message,
+                                button=["Start", "Cancel"], defaultButton="Start",
+                                cancelButton="Cancel", dismissString="Cancel")
+    if result != "Start":
+        print("[ManyAnims] Batch cancelled after prescan.")
+        return None
+    return good
+
+
+def toggle_fail_fast(*args):
+    if batch_is_running({"failFastMenuItem": settings.get("fail_fast", False)}):
+        return
+    settings["fail_fast"] = not settings.get("fail_fast", False)
+    cmds.menuItem("failFastMenuItem", edit=True, checkBox=settings["fail_fast"])
+    save_settings()
 
-                current_selection = cached_manual_selection
+    print(f"[ManyAnims] Stop On First Error: {settings['fail_fast']}")
 
-                if not current_selection:
-                    cmds.confirmDialog(
-                        title="Error",
-                        message="No joints selected for manual export!",
-                        button=["OK"]
-                    )
-                    continue
 
-                print(f"[ManyAnims] CAST Manual Mode → Using current selection: {current_selection}")
-                cmds.select(clear=True)
-                for j in current_selection:
-                    if cmds.objExists(j):
-                        cmds.select(j, add=True)
+def set_failure_limit(*args):
+    if batch_is_running():
+        return
+    result = cmds.promptDialog(
+        title="Set Failure Limit",
+        message="Abort the batch after this many failed files (0 = never):",
+        button=["OK", "Cancel"],
+        defaultButton="OK",
+        cancelButton="Cancel",
+        dismissString="Cancel",
+        text=str(settings.get("max_failures", 0))
+    )
+    if result == "OK":
+        try:
+            settings["max_failures"] = max(0, int(cmds.promptDialog(query=True, text=True).strip() or 0))
+        except ValueError:
+            cmds.confirmDialog(title="Error", message="Please enter a whole number.", button=["OK"])
+            return
+        save_settings()
+        print(f"[ManyAnims] Failure limit set to: {settings['max_failures']}")
 
-            elif method_type == "treyarch":
 
-                if is_ads:
-                    cmds.select(f"{default_namespace}:tag_view",
-                                f"{default_namespace}:tag_torso")
+def set_export_targets(*args):
+    if batch_is_running():
+        return
+    result = cmds.promptDialog(
+        title="Set Export Targets",
+        message="Export targets as JSON, e.g. [{\"format\": \"xanim_bin\", \"prefix\": \"t7\"}]\n(empty = use the menu options):",
+        button=["OK", "Cancel"],
+        defaultButton="OK",
+        cancelButton="Cancel",
+        dismissString="Cancel",
+        text=json.dumps(settings.get("export_targets", []))
+    )
+    if result != "OK":
+        return
+    previous = settings.get("export_targets", [])
+    try:
+        text = cmds.promptDialog(query=True, text=True).strip()
+        settings["export_targets"] = json.loads(text) if text else []
+        check_export_targets(get_export_targets())
+    except (ValueError, TypeError, AttributeError) as e:
+        settings["export_targets"] = previous
+        cmds.confirmDialog(title="Error", message=f"Invalid export targets: {e}", button=["OK"])
+        return
+    save_settings()
+    print(f"[ManyAnims] Export targets set to: {settings['export_targets']}")
+
+
+def toggle_prescan(*args):
+    global prescan_enabled
+    if batch_is_running({"prescanMenuItem": prescan_enabled}):
+        return
+
+    prescan_enabled = not prescan_enabled
+    cmds.menuItem("prescanMenuItem", edit=True, checkBox=prescan_enabled)
+
+    settings["prescan_enabled"] = prescan_enabled
+    save_settings()
+
+    print(f"[ManyAnims] Prescan Before Export: {prescan_enabled}")
+
+
+# --- Animation library ---
+# An SQLite index of the import library, so clips can be picked by what they
+# hold instead of by name in the file dialog. Indexing walks a folder (archives
+# included) and only re-reads clips whose mtime or size changed. A query is a
+# list of terms that must all match, e.g.
+#   category=ads weapon=ak47 frames>60
+#   note=reload_end name=*fast*
+# Text terms take * and ? wildcards and ignore case; note= and bone= match a
+# clip with any such notetrack or bone. Queries feed the loaders through a
+# job's "query" or ManyAnims > Select From Library...
+
+LIBRARY_FILE_NAME = "manyanims_library.sqlite"
+LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    path TEXT PRIMARY KEY, root TEXT, name TEXT, format TEXT, mtime REAL, size INTEGER, hash TEXT,
+    frame_count INTEGER, framerate REAL, bone_count INTEGER, note_count INTEGER,
+    category TEXT, weapon TEXT, error TEXT);
+CREATE INDEX IF NOT EXISTS clips_root ON clips (root);
+CREATE TABLE IF NOT EXISTS bones (path TEXT REFERENCES clips (path) ON DELETE CASCADE, bone TEXT);
+CREATE INDEX IF NOT EXISTS bones_path ON bones (path);
+CREATE INDEX IF NOT EXISTS bones_bone ON bones (bone);
+CREATE TABLE IF NOT EXISTS notes (path TEXT REFERENCES clips (path) ON DELETE CASCADE, note TEXT);
+CREATE INDEX IF NOT EXISTS notes_path ON notes (path);
+CREATE INDEX IF NOT EXISTS notes_note ON notes (note);
+"""
+
+# Categories by name keyword, first match wins; ADS clips are found by is_ads_anim first
+CLIP_CATEGORIES = (
+    ("reload", ("reload",)),
+    ("fire", ("fire", "shot", "shoot")),
+    ("raise", ("raise", "pullout")),
+    ("drop", ("drop", "putaway")),
+    ("sprint", ("sprint",)),
+    ("inspect", ("inspect",)),
+    ("melee", ("melee", "knife")),
+    ("idle", ("idle",)),
+)
+CLIP_NAME_PREFIXES = {"vm", "va", "wm", "viewmodel", "worldmodel", "wpn", "weapon"}
+GAME_PREFIX_PATTERN = re.compile(r"^(t\d+|iw\d+|s\d+|h\d+)$")
+
+LIBRARY_QUERY_TERM = re.compile(r"^(\w+)(<=|>=|!=|=|<|>)(.*)$")
+LIBRARY_TEXT_FIELDS = {"name": "name", "path": "path", "category": "category", "weapon": "weapon", "format": "format"}
+LIBRARY_NUMBER_FIELDS = {"frames": "frame_count", "fps": "framerate", "bones": "bone_count", "notes": "note_count"}
+
+
+def infer_clip_category(name):
+    if is_ads_anim(name):
+        return "ads"
+    lowered = name.lower()
+    for category, keywords in CLIP_CATEGORIES:
+        if any(keyword in lowered for keyword in keywords):
+            return category
+    return "other"
+
+
+def infer_weapon(name):
+    """First name token after any view/world model and game prefixes (vm_t6_ak47_reload → ak47)."""
+    for token in os.path.splitext(os.path.basename(name))[0].lower().split("_"):
+        if token and token not in CLIP_NAME_PREFIXES and not GAME_PREFIX_PATTERN.match(token):
+            return token
+    return ""
+
+
+def source_signature(file_path):
+    """(mtime, size) of a clip on disk or inside an archive, or None if it can't be read."""
+    import zipfile
+    archive_path, member = split_archive_path(file_path)
+    try:
+        if member is None:
+            stat = os.stat(file_path)
+            return stat.st_mtime, stat.st_size
+        info = get_archive(archive_path).getinfo(member)
+        return time.mktime(info.date_time + (0, 0, -1)), info.file_size
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def library_db_path():
+    return settings.get("library_path") or os.path.join(get_settings_dir(), LIBRARY_FILE_NAME)
+
+
+def open_library(db_path=None):
+    import sqlite3
+    db_path = db_path or library_db_path()
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(LIBRARY_SCHEMA)
+    return db
+
+
+def _scan_library_clip(file_path):
+    """(path, sha256, header info) for one clip; runs on the indexing thread pool."""
+    import hashlib
+    try:
+        data = read_source_bytes(file_path)
+    except OSError:
+        return file_path, None, read_anim_header(file_path)
+    return file_path, hashlib.sha256(data).hexdigest(), read_anim_header(file_path, data)
+
+
+def index_library(root, db=None):
+    """Bring the index of every clip under root up to date. Returns (clips, reindexed, removed)."""
+    from concurrent.futures import ThreadPoolExecutor
+    started = time.perf_counter()
+    root = os.path.abspath(root)
+    own_db = db is None
+    db = db or open_library()
+    try:
+        known = {path: (mtime, size) for path, mtime, size in
+                 db.execute("SELECT path, mtime, size FROM clips WHERE root = ?", (root,))}
+        signatures = {}
+        for folder, _dirs, names in os.walk(root):
+            for path in expand_anim_inputs([os.path.join(folder, name) for name in sorted(names)], (".cast", ".seanim")):
+                signature = source_signature(path)
+                if signature:
+                    signatures[path] = signature
+        changed = [path for path, signature in signatures.items() if known.get(path) != signature]
+        removed = [path for path in known if path not in signatures]
+
+        workers = settings.get("prescan_threads", 0) or min(8, (os.cpu_count() or 1) + 4)
+        errors = 0
+        with db:
+            db.executemany("DELETE FROM clips WHERE path = ?", [(path,) for path in removed + changed])
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for path, digest, info in pool.map(_scan_library_clip, changed):
+                    name = os.path.basename(path)
+                    mtime, size = signatures[path]
+                    note_names = sorted({note for note, _frame in info["notes"]})
+                    errors += bool(info["error"])
+                    db.execute("INSERT INTO clips VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                        path, root, name, info["format"], mtime, size, digest, info["frame_count"],
+                        info["framerate"], len(info["bones"]), len(note_names),
+                        infer_clip_category(name), infer_weapon(name), info["error"]))
+                    db.executemany("INSERT INTO bones VALUES (?, ?)", [(path, bone) for bone in info["bones"]])
+                    db.executemany("INSERT INTO notes VALUES (?, ?)", [(path, note) for note in note_names])
+    finally:
+        close_archives()
+        if own_db:
+            db.close()
+
+    print(f"[ManyAnims] Library {root}: {len(signatures)} clip(s), {len(changed)} indexed "
+          f"({errors} unreadable), {len(removed)} removed, in {time.perf_counter() - started:.1f}s.")
+    return len(signatures), len(changed), len(removed)
+
+
+def library_query_sql(query):
+    """WHERE clause and parameters for a library query. Raises ValueError on a bad term."""
+    import shlex
+    clauses, params = ["error IS NULL"], []
+    for term in shlex.split(query):
+        match = LIBRARY_QUERY_TERM.match(term)
+        if not match:
+            raise ValueError(f"bad query term '{term}' (expected e.g. frames>60 or note=reload_end)")
+        key, op, value = match.groups()
+        key = key.lower()
+        if key in ("note", "bone"):
+            if op not in ("=", "!="):
+                raise ValueError(f"{key} only takes = or !=")
+            table = key + "s"
+            exists = f"EXISTS (SELECT 1 FROM {table} WHERE {table}.path = clips.path AND LOWER({key}) GLOB LOWER(?))"
+            clauses.append(exists if op == "=" else "NOT " + exists)
+            params.append(value)
+        elif key in LIBRARY_TEXT_FIELDS:
+            if op not in ("=", "!="):
+                raise ValueError(f"{key} only takes = or !=")
+            clauses.append(f"{'NOT ' if op == '!=' else ''}LOWER({LIBRARY_TEXT_FIELDS[key]}) GLOB LOWER(?)")
+            params.append(value)
+        elif key in LIBRARY_NUMBER_FIELDS:
+            try:
+                params.append(float(value))
+            except ValueError:
+                raise ValueError(f"{key} needs a number, not '{value}'")
+            clauses.append(f"{LIBRARY_NUMBER_FIELDS[key]} {op} ?")
+        else:
+            fields = sorted(LIBRARY_TEXT_FIELDS) + sorted(LIBRARY_NUMBER_FIELDS) + ["bone", "note"]
+            raise ValueError(f"unknown query field '{key}' (use {', '.join(fields)})")
+    return " AND ".join(clauses), params
+
+
+def query_library(query, root=None, db=None):
+    """Paths of the indexed clips matching the query, optionally only those under root."""
+    where, params = library_query_sql(query)
+    if root:
+        where += " AND root = ?"
+        params.append(os.path.abspath(root))
+    own_db = db is None
+    db = db or open_library()
+    try:
+        return [row[0] for row in db.execute(f"SELECT path FROM clips WHERE {where} ORDER BY path", params)]
+    finally:
+        if own_db:
+            db.close()
+
+
+def select_from_library(*args):
+    """Index the import folder and select the clips matching a query."""
+    global anim_path, selected_anim_files
+    import sqlite3
+    root = anim_path or settings.get("import_location", "")
+    if not root or not os.path.isdir(root):
+        cmds.confirmDialog(title="Library", message="Set an import location first.", button=["OK"])
+        return
+
+    result = cmds.promptDialog(
+        title="Select From Library",
+        message="Query (e.g. category=ads weapon=ak47 frames>60, note=reload_end):",
+        button=["OK", "Cancel"],
+        defaultButton="OK",
+        cancelButton="Cancel",
+        dismissString="Cancel",
+        text=settings.get("library_query", "")
+    )
+    if result != "OK":
+        return
+    query = cmds.promptDialog(query=True, text=True).strip()
+    try:
+        index_library(root)
+        extension = ".cast" if use_cast else ".seanim"
+        matches = [path for path in query_library(query, root) if path.lower().endswith(extension)]
+    except (ValueError, sqlite3.Error) as e:
+        cmds.confirmDialog(title="Library", message=str(e), button=["OK"])
+        return
+    settings["library_query"] = query
+    save_settings()
+
+    if not matches:
+        cmds.confirmDialog(title="Library", message=f"No {extension} clips match:\n{query}", button=["OK"])
+        return
+    anim_path = root
+    selected_anim_files = matches
+    print(f"[ManyAnims] Library query '{query}' selected {len(matches)} file(s)")
+    cmds.confirmDialog(title="Animations Selected", message=f"Selected {len(matches)} animation(s).", button=["OK"])
+    enable_ui_elements_if_paths_selected()
+
+
+# --- Bulk curve import ---
+# castplugin and SEToolsPlugin build curves one key at a time. With
+# "bulk_import" on, ManyAnims parses the clip itself and keys each joint
+# attribute with one MFnAnimCurve.addKeys call. The curve of every attribute is
+# kept between clips and rekeyed, not deleted and recreated. Only absolute
+# curves are handled, and notes come from the clip file (native_notetracks);
+# any other clip falls back to the plugin importer.
+
+CAST_CURVE_ATTRS = {
+    "tx": "translateX", "ty": "translateY", "tz": "translateZ",
+    "sx": "scaleX", "sy": "scaleY", "sz": "scaleZ",
+}
+ROTATE_ATTRS = ("rotateX", "rotateY", "rotateZ")
+# SEAnim animation types by id, named as Cast curve modes
+SEANIM_ANIM_TYPES = ("absolute", "additive", "relative", "delta")
+SEANIM_ANIM_LOOPED = 1 << 0
+SEANIM_PRESENCE_NOTE = 1 << 6
+
+
+class BulkImportUnsupported(Exception):
+    """The clip needs something only the plugin importers handle."""
+
+
+def _collect_cast_curves(f, end, clip):
+    start = f.tell()
+    node_id, node_size, _hash, prop_count, child_count = _read_struct(f, "<IIQII")
+    node_end = start + node_size
+    if node_size < 24 or node_end > end:
+        raise ValueError("file is truncated")
+
+    if node_id not in (CAST_NODE_ROOT, CAST_NODE_ANIMATION, CAST_NODE_CURVE, CAST_NODE_NOTETRACK):
+        f.seek(node_end)
+        return
+
+    props = {}
+    for _ in range(prop_count):
+        name, _count, value = _read_cast_property(f, node_end, full=node_id in (CAST_NODE_CURVE, CAST_NODE_NOTETRACK))
+        props[name] = value
+
+    if node_id == CAST_NODE_ANIMATION:
+        clip["framerate"] = props.get("fr", clip["framerate"])
+        clip["looping"] = bool(props.get("lo", 0))
+    elif node_id == CAST_NODE_CURVE:
+        bone, prop, frames = props.get("nn"), props.get("kp"), props.get("kb")
+        if bone and prop and frames:
+            mode = props.get("m", "absolute")
+            if bone not in clip["curves"]:
+                clip["curves"][bone] = {}
+                clip["modes"][bone] = mode
+            elif mode != "absolute":
+                clip["modes"][bone] = mode
+            clip["curves"][bone][prop] = ([int(frame) for frame in frames], props.get("kv") or [])
+            clip["frame_count"] = max(clip["frame_count"], int(max(frames)) + 1)
+    elif node_id == CAST_NODE_NOTETRACK:
+        note_name = props.get("n", "")
+        clip["notes"].extend((note_name, int(frame)) for frame in props.get("kb") or [])
+
+    for _ in range(child_count):
+        _collect_cast_curves(f, node_end, clip)
+    f.seek(node_end)
+
+
+def _read_seanim_curves(f, size, clip):
+    if f.read(6) != SEANIM_MAGIC:
+        raise ValueError("not an SEAnim file")
+    _version, header_size = _read_struct(f, "<hh")
+    (anim_type, anim_flags, presence, properties, _r0, _r1, framerate,
+     frame_count, bone_count, modifier_count, _r2, _r3, _r4, note_count) = _read_struct(f, "<6BfIIB3BI")
+    f.seek(8 + header_size)
+
+    clip["framerate"] = framerate
+    clip["frame_count"] = frame_count
+    clip["looping"] = bool(anim_flags & SEANIM_ANIM_LOOPED)
+    bones = [_read_cstring(f) for _ in range(bone_count)]
+    modes = {bone: SEANIM_ANIM_TYPES[anim_type] for bone in bones}
+
+    bone_index_t = "B" if bone_count <= 0xFF else "H"
+    frame_t = "B" if frame_count <= 0xFF else "H" if frame_count <= 0xFFFF else "I"
+    value_t = "d" if properties & SEANIM_PRECISION_HIGH else "f"
+    for _ in range(modifier_count):
+        bone_index, modifier_type = _read_struct(f, f"<{bone_index_t}B")
+        if bone_index < bone_count:
+            modes[bones[bone_index]] = SEANIM_ANIM_TYPES[modifier_type]
+
+    for bone in bones:
+        _read_struct(f, "<B")  # bone flags
+        curves = {}
+        for flag, props in ((SEANIM_PRESENCE_LOC, ("tx", "ty", "tz")),
+                            (SEANIM_PRESENCE_ROT, ("rq",)),
+                            (SEANIM_PRESENCE_SCALE, ("sx", "sy", "sz"))):
+            if not presence & flag:
+                continue
+            key_count = _read_struct(f, "<" + frame_t)[0]
+            components = 4 if props == ("rq",) else 3
+            key_fmt = f"<{frame_t}{components}{value_t}"
+            data = f.read(key_count * struct.calcsize(key_fmt))
+            if len(data) != key_count * struct.calcsize(key_fmt):
+                raise ValueError("file is truncated")
+            keys = list(struct.iter_unpack(key_fmt, data))
+            if not keys:
+                continue
+            frames = [key[0] for key in keys]
+            if components == 4:
+                curves["rq"] = (frames, [key[1:] for key in keys])
+            else:
+                for axis, prop in enumerate(props, 1):
+                    curves[prop] = (frames, [key[axis] for key in keys])
+        if curves:
+            clip["curves"][bone] = curves
+            clip["modes"][bone] = modes[bone]
+
+    for _ in range(note_count):
+        frame = _read_struct(f, "<" + frame_t)[0]
+        clip["notes"].append((_read_cstring(f), frame))
+
+
+def read_anim_curves(file_path, data=None):
+    """Every key of a .cast or .seanim, with its notetracks.
+
+    Returns {"framerate", "frame_count", "looping", "curves": {bone: {prop: (frames, values)}},
+    "modes": {bone: "absolute" / "relative" / "additive" / "delta"}, "notes": [(name, frame)]}.
+    Props are tx/ty/tz, sx/sy/sz (floats) and rq (x, y, z, w quaternions), as in Cast.
+    """
+    clip = {"framerate": 30.0, "frame_count": 0, "looping": False, "curves": {}, "modes": {}, "notes": []}
+    with (io.BytesIO(data) if data is not None else open_source(file_path)) as f:
+        size = len(data) if data is not None else source_size(file_path)
+        if file_path.lower().endswith(".cast"):
+            magic, _version, root_count, _flags = _read_struct(f, "<4I")
+            if magic != CAST_MAGIC:
+                raise ValueError("not a Cast file")
+            for _ in range(root_count):
+                _collect_cast_curves(f, size, clip)
+        else:
+            _read_seanim_curves(f, size, clip)
+    return clip
+
+
+class BulkCurveImporter(object):
+    """Keys parsed clips onto rig joints with MFnAnimCurve.addKeys, rekeying each attribute's curve between clips.
+
+    `om` / `oma` default to maya.api.OpenMaya / maya.api.OpenMayaAnim and can be replaced with stand-ins.
+    """
+
+    def __init__(self, om=None, oma=None):
+        if om is None:
+            import maya.api.OpenMaya as om
+        if oma is None:
+            import maya.api.OpenMayaAnim as oma
+        self.om = om
+        self.oma = oma
+        self._curves = {}  # "joint.attr" -> MObjectHandle of its anim curve
+        self._created = set()  # the "joint.attr" curves this importer created; others belong to the scene
+        self._joints = {}  # joint name -> (MObjectHandle, inverse joint orient, rotate order) or None
+
+    def forget_joints(self):
+        """Drop the joint cache, including joints that weren't found, so the next batch looks them up again."""
+        self._joints.clear()
+
+    def _joint(self, name):
+        entry = self._joints.get(name)
+        if entry is not None and entry[0].isValid():
+            return entry
+        if entry is None and name in self._joints:
+            return None
+
+        selection = self.om.MSelectionList()
+        try:
+            selection.add(name)
+            node = selection.getDependNode(0)
+        except RuntimeError:
+            self._joints[name] = None
+            return None
+
+        fn = self.om.MFnDependencyNode(node)
+        orient = self.om.MEulerRotation()
+        if fn.hasAttribute("jointOrient"):
+            orient = self.om.MEulerRotation(*(fn.findPlug(a, False).asDouble()
+                                              for a in ("jointOrientX", "jointOrientY", "jointOrientZ")))
+        entry = (self.om.MObjectHandle(node), orient.asQuaternion().inverse(), fn.findPlug("rotateOrder", False).asInt())
+        self._joints[name] = entry
+        return entry
+
+    def _euler_channels(self, quaternions, joint):
+        """Rotate X/Y/Z values (radians) for local quaternions, taking out the joint orient and keeping them continuous."""
+        _handle, orient_inverse, rotate_order = joint
+        channels = ([], [], [])
+        previous = None
+        for x, y, z, w in quaternions:
+            euler = (self.om.MQuaternion(x, y, z, w) * orient_inverse).asEulerRotation()
+            euler.reorderIt(rotate_order)
+            if previous is not None:
+                euler.setToClosestSolution(previous)
+            previous = euler
+            channels[0].append(euler.x)
+            channels[1].append(euler.y)
+            channels[2].append(euler.z)
+        return channels
+
+    def _key(self, node, attr, frames, values):
+        """Replace the keys of node.attr, reusing its anim curve. Returns the curve key."""
+        node_fn = self.om.MFnDependencyNode(node)
+        name = f"{node_fn.name()}.{attr}"
+        curve = self.oma.MFnAnimCurve()
+        handle = self._curves.get(name)
+        if handle is not None and handle.isValid():
+            curve.setObject(handle.object())
+        else:
+            plug = node_fn.findPlug(attr, False)
+            source = plug.source()
+            try:
+                if not source.isNull and source.node().hasFn(self.om.MFn.kAnimCurve):
+                    curve.setObject(source.node())
                 else:
-                    cmds.select(f"{default_namespace}:tag_torso",
-                                f"{default_namespace}:tag_cambone",
-                                hierarchy=True)
-
-            elif method_type == "iw/sh":
-
-                if is_ads:
-                    if cmds.objExists(f"{default_namespace}:tag_ads"):
-                        cmds.select(f"{default_namespace}:tag_view",
-                                    f"{default_namespace}:tag_ads")
-                    else:
-                        cmds.confirmDialog(
-                            title="Error",
-                            message=f"ADS joint ('{default_namespace}:tag_ads') not found!",
-                            button=["OK"]
-                        )
-                        continue
+                    curve.create(plug)
+                    self._created.add(name)
+            except RuntimeError as e:
+                raise BulkImportUnsupported(f"can't key {name}: {e}")
+            self._curves[name] = self.om.MObjectHandle(curve.object())
+
+        unit = self.om.MTime.uiUnit()
+        # keepExistingKeys=False clears the keys of the previous clip first
+        curve.addKeys([self.om.MTime(frame, unit) for frame in frames], values,
+                      self.oma.MFnAnimCurve.kTangentLinear, self.oma.MFnAnimCurve.kTangentLinear, False)
+        return name
+
+    def import_clip(self, clip, namespaces):
+        """Key every curve of `clip` (from read_anim_curves) onto each rig namespace. Returns the number of curves keyed."""
+        keyed = set()
+        for bone, props in clip["curves"].items():
+            for namespace in namespaces:
+                joint = self._joint(f"{namespace}:{bone}" if namespace else bone)
+                if joint is None:
+                    continue
+                node = joint[0].object()
+                for prop, (frames, values) in props.items():
+                    if prop == "rq":
+                        for attr, channel in zip(ROTATE_ATTRS, self._euler_channels(values, joint)):
+                            keyed.add(self._key(node, attr, frames, channel))
+                    elif prop in CAST_CURVE_ATTRS:
+                        keyed.add(self._key(node, CAST_CURVE_ATTRS[prop], frames, values))
+        if not keyed:
+            raise BulkImportUnsupported("no clip bones match the rig")
+
+        # Curves the previous clip animated but this one doesn't. Only curves this
+        # importer created are deleted; curves that were already on the rig lose their keys
+        stale = [name for name in self._curves if name not in keyed]
+        if stale:
+            modifier = self.om.MDGModifier()
+            for name in stale:
+                handle = self._curves.pop(name)
+                created = name in self._created
+                self._created.discard(name)
+                if not handle.isValid():
+                    continue
+                if created:
+                    modifier.deleteNode(handle.object())
                 else:
-                    if cmds.objExists(f"{default_namespace}:tag_ads") and cmds.objExists(f"{default_namespace}:tag_cambone"):
-                        cmds.select(f"{default_namespace}:tag_ads",
-                                    f"{default_namespace}:tag_cambone",
-                                    hierarchy=True)
-                    else:
-                        cmds.confirmDialog(
-                            title="Error",
-                            message=f"Required joints not found in namespace '{default_namespace}'!",
-                            button=["OK"]
-                        )
-                        continue
+                    curve = self.oma.MFnAnimCurve()
+                    curve.setObject(handle.object())
+                    for index in range(curve.numKeys - 1, -1, -1):
+                        curve.remove(index)
+            modifier.doIt()
+        return len(keyed)
 
-        except Exception as e:
-            cmds.warning(f"[ManyAnims]  Failed to select joints for {cast_file}: {e}")
-            continue
 
-        # --- Read notetracks (only if CastNotetracks node exists in scene)
-        has_cast_notetracks = cmds.objExists("CastNotetracks")
-        if has_cast_notetracks:
+_bulk_importer = None
+
+
+def reset_bulk_importer():
+    """Forget cached joints so a new batch sees the current rig."""
+    if _bulk_importer is not None:
+        _bulk_importer.forget_joints()
+
+
+def import_clip_bulk(local_path, source_path):
+    """Import a clip with the bulk importer if enabled. Returns False when the plugin importer should run instead."""
+    global _bulk_importer
+    if not settings.get("bulk_import", False) or not settings.get("native_notetracks", False):
+        return False
+
+    started = time.perf_counter()
+    try:
+        if _bulk_importer is None:
+            _bulk_importer = BulkCurveImporter()
+        clip = read_anim_curves(local_path)
+        other_modes = sorted(set(clip["modes"].values()) - {"absolute"})
+        if other_modes:
+            raise BulkImportUnsupported(f"{', '.join(other_modes)} curves")
+        keyed = _bulk_importer.import_clip(clip, get_export_namespaces())
+    except (BulkImportUnsupported, ImportError) as e:
+        print(f"[ManyAnims] Bulk import not used for {os.path.basename(source_path)}: {e}")
+        return False
+
+    last_frame = max(0, clip["frame_count"] - 1)
+    cmds.playbackOptions(minTime=0, maxTime=last_frame, animationStartTime=0, animationEndTime=last_frame)
+    print(f"[ManyAnims] Bulk-imported {keyed} curve(s) from {os.path.basename(source_path)} "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms.")
+    return True
+
+
+def _sample_joint_pose(bones, frames):
+    """{(joint.attr, frame): value} for the translate/rotate of every matching rig joint."""
+    pose = {}
+    for bone in bones:
+        for namespace in get_export_namespaces():
+            joint = f"{namespace}:{bone}" if namespace else bone
+            if not cmds.objExists(joint):
+                continue
+            for attr in ("translateX", "translateY", "translateZ") + ROTATE_ATTRS:
+                for frame in frames:
+                    pose[(f"{joint}.{attr}", frame)] = cmds.getAttr(f"{joint}.{attr}", time=frame)
+    return pose
+
+
+def benchmark_bulk_import(files, plugin_import):
+    """Import each clip with `plugin_import(path)` and with the bulk importer, timing both and comparing the poses.
+
+    Run in Maya with the rig loaded. Returns one row per clip.
+    """
+    rows = []
+    for path in files:
+        clip = read_anim_curves(path)
+        last_frame = max(0, clip["frame_count"] - 1)
+        frames = sorted({0, last_frame // 2, last_frame})
+
+        joints = cmds.ls(type="joint")
+        if joints:
+            cmds.cutKey(joints, time=(), option="keys")
+        started = time.perf_counter()
+        plugin_import(path)
+        plugin_seconds = time.perf_counter() - started
+        plugin_pose = _sample_joint_pose(clip["curves"], frames)
+
+        # Second bulk pass measures the rekeying of existing curves used within a batch
+        bulk_seconds = []
+        importer = BulkCurveImporter()
+        for _ in range(2):
+            started = time.perf_counter()
+            importer.import_clip(clip, get_export_namespaces())
+            bulk_seconds.append(time.perf_counter() - started)
+        bulk_pose = _sample_joint_pose(clip["curves"], frames)
+
+        diffs = [abs(bulk_pose[k] - v) for k, v in plugin_pose.items() if k in bulk_pose]
+        rows.append({
+            "file": os.path.basename(path),
+            "plugin_ms": plugin_seconds * 1000,
+            "bulk_ms": bulk_seconds[0] * 1000,
+            "rekey_ms": bulk_seconds[1] * 1000,
+            "max_diff": max(diffs) if diffs else None,
+        })
+
+    print(f"  {'File':<32} {'Plugin ms':>10} {'Bulk ms':>9} {'Rekey ms':>9} {'Speedup':>8}  Max diff")
+    for row in rows:
+        speedup = row["plugin_ms"] / row["rekey_ms"] if row["rekey_ms"] else 0.0
+        diff = "n/a" if row["max_diff"] is None else f"{row['max_diff']:.5f}"
+        print(f"  {row['file']:<32} {row['plugin_ms']:>10.1f} {row['bulk_ms']:>9.1f} {row['rekey_ms']:>9.1f} "
+              f"{speedup:>7.1f}x  {diff}")
+    return rows
+
+
+# --- Format converter ---
+# python ManyAnims.py convert <source folder> <output folder> [--to cast|seanim] [--jobs N]
+#
+# Converts whole folders between .seanim and .cast without Maya, one worker
+# process per core, for teams that only have one of SETools / castplugin.
+# Bones, curves, curve modes, looping and notetracks carry over. Cast's separate
+# tx/ty/tz (and sx/sy/sz) curves are merged onto shared SEAnim keys with linear
+# interpolation. Values are copied as they are, with no unit conversion.
+
+CONVERT_EXTENSIONS = {"cast": ".cast", "seanim": ".seanim"}
+CAST_MODES = ("absolute", "relative", "additive")
+
+_cast_hashes = itertools.count(1)
+
+
+def _sample_curve(frames, values, frame):
+    """Value of a linear curve at `frame`, holding the first/last value outside its keys."""
+    index = bisect.bisect_left(frames, frame)
+    if index < len(frames) and frames[index] == frame:
+        return values[index]
+    if index == 0:
+        return values[0]
+    if index == len(frames):
+        return values[-1]
+    f0, f1 = frames[index - 1], frames[index]
+    return values[index - 1] + (values[index] - values[index - 1]) * (frame - f0) / float(f1 - f0)
+
+
+def _merged_vector_keys(curves, props, default, bone, warnings):
+    """[(frame, x, y, z)] for three scalar curves, keyed on the union of their frames."""
+    present = [curves.get(prop) for prop in props]
+    if not any(present):
+        return []
+    missing = [prop for prop, curve in zip(props, present) if not curve]
+    if missing:
+        warnings.append(f"{bone}: no {'/'.join(missing)} curve, written as {default}")
+    frames = sorted(set().union(*(curve[0] for curve in present if curve)))
+    return [(frame,) + tuple(_sample_curve(curve[0], curve[1], frame) if curve else default for curve in present)
+            for frame in frames]
+
+
+def build_seanim(clip, warnings):
+    """SEAnim file bytes for a clip from read_anim_curves."""
+    bones = list(clip["curves"])
+    modes = {bone: clip["modes"].get(bone, "absolute") for bone in bones}
+    if not bones:
+        raise ValueError("no curves")
+    counts = {}
+    for mode in modes.values():
+        counts[mode] = counts.get(mode, 0) + 1
+    anim_mode = max(counts, key=counts.get)
+    modifiers = [(index, SEANIM_ANIM_TYPES.index(modes[bone])) for index, bone in enumerate(bones)
+                 if modes[bone] != anim_mode]
+    if len(modifiers) > 0xFF:
+        raise ValueError("too many bones with their own curve mode for SEAnim")
+
+    tracks = []
+    for bone in bones:
+        curves = clip["curves"][bone]
+        rotation = curves.get("rq")
+        tracks.append((
+            _merged_vector_keys(curves, ("tx", "ty", "tz"), 0.0, bone, warnings),
+            [(frame,) + tuple(value) for frame, value in zip(*rotation)] if rotation else [],
+            _merged_vector_keys(curves, ("sx", "sy", "sz"), 1.0, bone, warnings),
+        ))
+
+    notes = sorted(clip["notes"], key=lambda note: note[1])
+    last_frame = max([key[0] for track in tracks for keys in track for key in keys] +
+                     [frame for _name, frame in notes] + [clip["frame_count"] - 1, 0])
+    frame_count = last_frame + 1
+    presence = 0
+    for flag, slot in ((SEANIM_PRESENCE_LOC, 0), (SEANIM_PRESENCE_ROT, 1), (SEANIM_PRESENCE_SCALE, 2)):
+        if any(track[slot] for track in tracks):
+            presence |= flag
+    if notes:
+        presence |= SEANIM_PRESENCE_NOTE
+
+    frame_t = "B" if frame_count <= 0xFF else "H" if frame_count <= 0xFFFF else "I"
+    bone_index_t = "B" if len(bones) <= 0xFF else "H"
+    out = io.BytesIO()
+    out.write(SEANIM_MAGIC)
+    out.write(struct.pack("<hh", 1, 0x1C))
+    out.write(struct.pack("<6BfIIB3BI", SEANIM_ANIM_TYPES.index(anim_mode),
+                          SEANIM_ANIM_LOOPED if clip["looping"] else 0, presence, 0, 0, 0,
+                          clip["framerate"], frame_count, len(bones), len(modifiers), 0, 0, 0, len(notes)))
+    for bone in bones:
+        out.write(bone.encode("utf-8") + b"\x00")
+    for index, mode_id in modifiers:
+        out.write(struct.pack(f"<{bone_index_t}B", index, mode_id))
+
+    for track in tracks:
+        out.write(b"\x00")  # bone flags
+        for flag, keys, components in ((SEANIM_PRESENCE_LOC, track[0], 3),
+                                       (SEANIM_PRESENCE_ROT, track[1], 4),
+                                       (SEANIM_PRESENCE_SCALE, track[2], 3)):
+            if presence & flag:
+                out.write(struct.pack("<" + frame_t, len(keys)))
+                key_fmt = f"<{frame_t}{components}f"
+                out.write(b"".join(struct.pack(key_fmt, *key) for key in keys))
+
+    for name, frame in notes:
+        out.write(struct.pack("<" + frame_t, frame) + name.encode("utf-8") + b"\x00")
+    return out.getvalue()
+
+
+def _cast_property(name, prop_id, fmt, values):
+    data = b"".join(struct.pack("<" + fmt, *(value if isinstance(value, (tuple, list)) else (value,)))
+                    for value in values)
+    return struct.pack("<HHI", prop_id, len(name), len(values)) + name.encode("utf-8") + data
+
+
+def _cast_string_property(name, value):
+    return (struct.pack("<HHI", CAST_PROPERTY_STRING, len(name), 1) + name.encode("utf-8")
+            + value.encode("utf-8") + b"\x00")
+
+
+def _cast_frame_property(frames):
+    """Key frame buffer in the smallest unsigned integer type that fits."""
+    last = max(frames) if frames else 0
+    if last <= 0xFF:
+        return _cast_property("kb", 0x62, "B", frames)
+    if last <= 0xFFFF:
+        return _cast_property("kb", 0x68, "H", frames)
+    return _cast_property("kb", 0x69, "I", frames)
+
+
+def _cast_node(node_id, props, children=()):
+    body = b"".join(props) + b"".join(children)
+    return struct.pack("<IIQII", node_id, 24 + len(body), next(_cast_hashes), len(props), len(children)) + body
+
+
+def build_cast(clip, warnings):
+    """Cast file bytes for a clip from read_anim_curves."""
+    if not clip["curves"]:
+        raise ValueError("no curves")
+    curve_nodes = []
+    for bone, curves in clip["curves"].items():
+        mode = clip["modes"].get(bone, "absolute")
+        if mode not in CAST_MODES:
+            warnings.append(f"{bone}: {mode} curves written as relative")
+            mode = "relative"
+        for prop, (frames, values) in curves.items():
+            value_prop = (_cast_property("kv", 0x7634, "4f", values) if prop == "rq"
+                          else _cast_property("kv", 0x66, "f", values))
+            curve_nodes.append(_cast_node(CAST_NODE_CURVE, [
+                _cast_string_property("nn", bone),
+                _cast_string_property("kp", prop),
+                _cast_frame_property(frames),
+                value_prop,
+                _cast_string_property("m", mode),
+            ]))
+
+    note_frames = {}
+    for name, frame in clip["notes"]:
+        note_frames.setdefault(name, []).append(frame)
+    note_nodes = [_cast_node(CAST_NODE_NOTETRACK, [_cast_string_property("n", name), _cast_frame_property(sorted(frames))])
+                  for name, frames in note_frames.items()]
+
+    animation = _cast_node(CAST_NODE_ANIMATION, [
+        _cast_property("fr", 0x66, "f", [clip["framerate"]]),
+        _cast_property("lo", 0x62, "B", [1 if clip["looping"] else 0]),
+    ], curve_nodes + note_nodes)
+    return struct.pack("<4I", CAST_MAGIC, 1, 1, 0) + _cast_node(CAST_NODE_ROOT, [], [animation])
+
+
+def convert_anim_file(source_path, output_path):
+    """Convert one clip to the format of output_path's extension. Runs in the converter's worker processes."""
+    started = time.perf_counter()
+    clip = read_anim_curves(source_path)
+    warnings = []
+    data = build_cast(clip, warnings) if output_path.lower().endswith(".cast") else build_seanim(clip, warnings)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = output_path + OUTPUT_TEMP_SUFFIX
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, output_path)
+    return {
+        "source": source_path,
+        "output": output_path,
+        "bytes_in": os.path.getsize(source_path),
+        "bytes_out": len(data),
+        "keys": sum(len(frames) for curves in clip["curves"].values() for frames, _values in curves.values()),
+        "seconds": time.perf_counter() - started,
+        "warnings": warnings,
+    }
+
+
+def convert_folder(source_folder, output_folder, to_format=None, jobs=0):
+    """Convert every clip under source_folder in parallel, mirroring subfolders. Returns (results, [(path, error)]).
+
+    Without `to_format` each file goes to the other format.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    pairs = []
+    for root, _dirs, names in os.walk(source_folder):
+        for name in sorted(names):
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in (".cast", ".seanim"):
+                continue
+            target = CONVERT_EXTENSIONS[to_format or ("seanim" if ext == ".cast" else "cast")]
+            if target == ext:
+                continue
+            relative = os.path.relpath(os.path.join(root, name), source_folder)
+            pairs.append((os.path.join(root, name), os.path.join(output_folder, os.path.splitext(relative)[0] + target)))
+    if not pairs:
+        print(f"[ManyAnims] Nothing to convert in {source_folder}.")
+        return [], []
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(pairs)))
+    started = time.perf_counter()
+    results, errors = [], []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(convert_anim_file, source, output): source for source, output in pairs}
+        for done, future in enumerate(as_completed(futures), 1):
             try:
-                CoDMayaTools.ReadNotetracks('xanim')
-                print("[ManyAnims] Read CAST notetracks.")
+                results.append(future.result())
             except Exception as e:
-                print(f"[ManyAnims]  Failed to read notetracks: {e}")
+                errors.append((futures[future], f"{type(e).__name__}: {e}"))
+            if done % 100 == 0:
+                print(f"[ManyAnims] Converted {done}/{len(pairs)}...")
+    elapsed = max(time.perf_counter() - started, 1e-6)
+
+    megabytes = sum(r["bytes_in"] for r in results) / 1048576.0
+    keys = sum(r["keys"] for r in results)
+    print(f"[ManyAnims] Converted {len(results)} of {len(pairs)} file(s) in {elapsed:.1f}s with {jobs} process(es): "
+          f"{len(results) / elapsed:.1f} files/s, {megabytes / elapsed:.1f} MB/s, {keys / elapsed:,.0f} keys/s.")
+    for r in results:
+        for warning in r["warnings"]:
+            print(f"  [WARNING] {os.path.basename(r['source'])}: {warning}")
+    for path, error in errors:
+        print(f"  [ERROR] {os.path.basename(path)}: {error}")
+    return results, errors
+
+
+# --- Batch scheduling ---
+# Export time is estimated from header data and calibrated against earlier runs
+# (stored next to the settings file), so the longest clips start first and the
+# progress window can show a real ETA.
+
+TIMINGS_FILE = os.path.join(os.path.dirname(SETTINGS_FILE), "manyanims_timings.json")
+MAX_TIMING_SAMPLES = 500
+# Seconds per file, per (frame x bone), per notetrack key — used until there are enough samples
+DEFAULT_COST_MODEL = (2.0, 0.0005, 0.05)
+
+
+def load_timing_samples():
+    if not os.path.exists(TIMINGS_FILE):
+        return []
+    try:
+        with open(TIMINGS_FILE, "r") as f:
+            return json.load(f).get("samples", [])
+    except Exception as e:
+        print("[ManyAnims] Failed to load export timings:", e)
+        return []
 
-            # --- Clean notetracks (RemoveAudioOneShot calls RefreshXAnimWindow internally,
-            #     which wipes the SaveToField — so we re-apply the path afterwards) ---
+
+def save_timing_samples(samples):
+    ensure_setting_dir()
+    try:
+        with open(TIMINGS_FILE, "w") as f:
+            json.dump({"samples": samples[-MAX_TIMING_SAMPLES:]}, f)
+    except Exception as e:
+        print("[ManyAnims] Failed to save export timings:", e)
+
+
+def _cost_features(info):
+    return (1.0, float(info["frame_count"] * len(info["bones"])), float(info["note_count"]))
+
+
+def fit_cost_model(samples):
+    """Least-squares fit of seconds = a + b*frames*bones + c*notes over past runs."""
+    if len(samples) < 5:
+        return DEFAULT_COST_MODEL
+
+    rows = [((1.0, s["frames"] * s["bones"], s["notes"]), s["seconds"]) for s in samples]
+    # Normal equations (X^T X) b = X^T y, solved with Gaussian elimination
+    a = [[sum(x[i] * x[j] for x, _ in rows) for j in range(3)] + [sum(x[i] * y for x, y in rows)] for i in range(3)]
+    try:
+        for col in range(3):
+            pivot = max(range(col, 3), key=lambda r: abs(a[r][col]))
+            a[col], a[pivot] = a[pivot], a[col]
+            if abs(a[col][col]) < 1e-12:
+                raise ZeroDivisionError
+            for r in range(3):
+                if r != col:
+                    factor = a[r][col] / a[col][col]
+                    a[r] = [v - factor * p for v, p in zip(a[r], a[col])]
+        model = tuple(a[i][3] / a[i][i] for i in range(3))
+    except ZeroDivisionError:
+        model = None
+
+    if model is None or any(c < 0 for c in model):
+        # Not enough variety to fit all three terms; scale the defaults instead
+        predicted = sum(estimate_export_cost_from(f, DEFAULT_COST_MODEL) for f, _ in rows)
+        actual = sum(y for _, y in rows)
+        scale = actual / predicted if predicted else 1.0
+        model = tuple(c * scale for c in DEFAULT_COST_MODEL)
+    return model
+
+
+def estimate_export_cost_from(features, model):
+    return sum(f * c for f, c in zip(features, model))
+
+
+def estimate_export_cost(info, model):
+    return estimate_export_cost_from(_cost_features(info), model)
+
+
+def order_longest_first(files, model):
+    """Sort files by estimated export time, longest first. Returns (files, {path: seconds})."""
+    estimates = {}
+    for path in files:
+        info = anim_header_cache.get(path) or read_anim_header(path)
+        estimates[path] = estimate_export_cost(info, model)
+    return sorted(files, key=lambda p: estimates[p], reverse=True), estimates
+
+
+def shard_by_cost(files, estimates, shard_count):
+    """Longest-processing-time assignment of files to shard_count roughly equal buckets."""
+    shards = [[] for _ in range(max(1, shard_count))]
+    loads = [0.0] * len(shards)
+    for path in sorted(files, key=lambda p: estimates.get(p, 0.0), reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(path)
+        loads[i] += estimates.get(path, 0.0)
+    return shards
+
+
+def format_duration(seconds):
+    seconds = int(max(0, seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class BatchTimer(object):
+    """Tracks per-file export time for the ETA and for calibrating the cost model."""
+
+    def __init__(self, files, estimates, model):
+        self.estimates = estimates
+        self.remaining = sum(estimates.get(p, 0.0) for p in files)
+        self.model = model
+        self.elapsed_actual = 0.0
+        self.elapsed_estimated = 0.0
+        self.samples = []
+        self.parallel = 1  # files exported at once
+        self._start = None
+
+    def start_file(self):
+        self._start = time.perf_counter()
+
+    def finish_file(self, path, exported=True, seconds=None):
+        if seconds is None:
+            seconds = time.perf_counter() - self._start if self._start else 0.0
+        estimate = self.estimates.get(path, 0.0)
+        self.remaining -= estimate
+        self._start = None
+        if not exported:
+            return
+        self.elapsed_actual += seconds
+        self.elapsed_estimated += estimate
+        info = anim_header_cache.get(path)
+        if info and not info["error"]:
+            self.samples.append({"frames": info["frame_count"], "bones": len(info["bones"]),
+                                 "notes": info["note_count"], "seconds": round(seconds, 3)})
+
+    def eta_seconds(self):
+        # Correct the model by how far off it has been for this batch so far
+        ratio = self.elapsed_actual / self.elapsed_estimated if self.elapsed_estimated else 1.0
+        return max(0.0, self.remaining) * ratio / self.parallel
+
+    def status_text(self, done, total):
+        return f"Exporting Animations — {done}/{total}, ETA {format_duration(self.eta_seconds())}"
+
+    def save(self):
+        if self.samples:
+            save_timing_samples(load_timing_samples() + self.samples)
+
+
+def schedule_batch(files):
+    """Order the batch longest-first and return a timer that drives the ETA."""
+    model = fit_cost_model(load_timing_samples())
+    ordered, estimates = order_longest_first(files, model)
+    timer = BatchTimer(ordered, estimates, model)
+    print(f"[ManyAnims] Scheduled {len(ordered)} file(s) longest-first, estimated {format_duration(timer.remaining)}.")
+    return ordered, timer
+
+
+# --- Archive inputs ---
+# Clips can be read straight out of .zip archives instead of being extracted
+# first. A clip inside an archive is addressed as "<archive>::<member>", which
+# is the path the batch, journal and report carry around; output names come
+# from the member's file name. Members are streamed into memory one at a time
+# and only spooled to a temp file for the importers, which need a real path.
+
+ARCHIVE_MEMBER_SEPARATOR = "::"
+ARCHIVE_EXTENSIONS = (".zip",)
+
+_open_archives = {}
+_archive_lock = threading.Lock()
+_archive_spool_dir = None
+
+
+def split_archive_path(file_path):
+    """(archive, member) for a clip inside an archive, else (file_path, None)."""
+    archive_path, separator, member = file_path.partition(ARCHIVE_MEMBER_SEPARATOR)
+    if separator and archive_path.lower().endswith(ARCHIVE_EXTENSIONS):
+        return archive_path, member
+    return file_path, None
+
+
+def is_archive(file_path):
+    return file_path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(file_path)
+
+
+def get_archive(archive_path):
+    """Shared open ZipFile, so the central directory is read once per batch rather than per member."""
+    import zipfile
+    with _archive_lock:
+        archive = _open_archives.get(archive_path)
+        if archive is None:
+            archive = _open_archives[archive_path] = zipfile.ZipFile(archive_path)
+        return archive
+
+
+def close_archives():
+    """Close the batch's archives and drop any spooled members."""
+    global _archive_spool_dir
+    with _archive_lock:
+        for archive in _open_archives.values():
+            archive.close()
+        _open_archives.clear()
+    if _archive_spool_dir:
+        shutil.rmtree(_archive_spool_dir, ignore_errors=True)
+        _archive_spool_dir = None
+
+
+def list_archive_anims(archive_path, extension):
+    """Paths of the clips with `extension` inside an archive, in archive order."""
+    import zipfile
+    with zipfile.ZipFile(archive_path) as archive:
+        return [archive_path + ARCHIVE_MEMBER_SEPARATOR + info.filename for info in archive.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(extension)]
+
+
+def folder_inputs(folder):
+    """Every entry of an import folder; an archive used as the import folder stands for itself."""
+    if is_archive(folder):
+        return [folder]
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))]
+
+
+def expand_anim_inputs(paths, extension):
+    """Clip paths with `extension`, with each archive replaced by the matching clips inside it."""
+    import zipfile
+    files = []
+    for path in paths:
+        if is_archive(path):
             try:
-                CoDMayaTools.RemoveUnusableNotes('xanim')
-                print("[ManyAnims] Removed unusable notetracks.")
-            except Exception as e:
-                print(f"[ManyAnims]  Failed to remove unusable notetracks: {e}")
+                files.extend(list_archive_anims(path, extension))
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"[ManyAnims] Could not read archive {path}: {e}")
+        elif path.lower().endswith(extension):
+            files.append(path)
+    return files
+
+
+def open_source(file_path):
+    """Binary file object for a clip on disk or inside an archive."""
+    import zipfile
+    archive_path, member = split_archive_path(file_path)
+    if member is None:
+        return open(file_path, "rb")
+    try:
+        return get_archive(archive_path).open(member)
+    except (KeyError, zipfile.BadZipFile) as e:
+        raise OSError(f"cannot read {member} from {archive_path}: {e}")
+
+
+def spool_archive_member(file_path, data=None):
+    """Local file the importers can open for a clip. Loose files are returned as they are."""
+    global _archive_spool_dir
+    import tempfile
+    if split_archive_path(file_path)[1] is None:
+        return file_path
+    if data is None:
+        data = read_source_bytes(file_path)
+    with _archive_lock:
+        if not _archive_spool_dir:
+            _archive_spool_dir = tempfile.mkdtemp(prefix="manyanims_archive_")
+    local_path = os.path.join(_archive_spool_dir, os.path.basename(file_path))
+    with open(local_path, "wb") as f:
+        f.write(data)
+    return local_path
+
+
+# --- Prefetch ---
+# Reads the next few clips into memory on a background thread while Maya is busy
+# exporting, so slow shared storage isn't on the critical path of the import.
+
+def read_source_bytes(file_path):
+    with open_source(file_path) as f:
+        return f.read()
+
+
+def source_size(file_path):
+    import zipfile
+    archive_path, member = split_archive_path(file_path)
+    try:
+        if member is None:
+            return os.path.getsize(file_path)
+        return get_archive(archive_path).getinfo(member).file_size
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return 0
+
+
+class AnimPrefetcher(object):
+    """Keeps up to `depth` upcoming clips (and at most `memory_limit` bytes) buffered in memory."""
+
+    def __init__(self, files, depth=2, memory_limit=512 * 1024 * 1024, parse_headers=True):
+        import tempfile
+        self.files = list(files)
+        self.depth = max(1, depth)
+        self.memory_limit = memory_limit
+        self.parse_headers = parse_headers
+        self._order = {path: i for i, path in enumerate(self.files)}
+        self._buffers = {}
+        self._buffered_bytes = 0
+        self._next = 0  # index of the file the batch wants next; earlier ones are never read
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._spool_dir = tempfile.mkdtemp(prefix="manyanims_prefetch_")
+        self._thread = threading.Thread(target=self._run, name="ManyAnimsPrefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _has_room(self, size):
+        if not self._buffers:
+            return True  # always allow one file, however large
+        return len(self._buffers) < self.depth and self._buffered_bytes + size <= self.memory_limit
+
+    def _passed(self, path):
+        return self._order[path] < self._next
+
+    def _run(self):
+        for path in self.files:
+            size = source_size(path)
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._passed(path) or self._has_room(size))
+                if self._stopped:
+                    return
+                if self._passed(path):
+                    continue
+
             try:
-                CoDMayaTools.RemoveAudioOneShot('xanim')
-                print("[ManyAnims] Stripped AudioOneShot prefixes from notetracks.")
+                data = read_source_bytes(path)
+                if self.parse_headers and path not in anim_header_cache:
+                    anim_header_cache[path] = read_anim_header(path, data)
             except Exception as e:
-                print(f"[ManyAnims]  Failed to strip AudioOneShot notetracks: {e}")
+                data = e
 
-            # Re-apply export fields that RefreshXAnimWindow may have wiped
-            cmds.textField(textFieldName, edit=True, text=output_file_path)
-            cmds.intField(fpsFieldName, edit=True, value=30)
-            cmds.intField(qualityField, edit=True, value=0)
-        else:
-            print("[ManyAnims] No CastNotetracks node found — skipping notetrack read/clean.")
+            with self._cond:
+                if self._stopped:
+                    return
+                if self._passed(path):
+                    continue  # the batch skipped it while it was being read
+                self._buffers[path] = data
+                if not isinstance(data, Exception):
+                    self._buffered_bytes += len(data)
+                self._cond.notify_all()
+
+    def _pop(self, path):
+        data = self._buffers.pop(path)
+        if not isinstance(data, Exception):
+            self._buffered_bytes -= len(data)
+        return data
+
+    def take(self, path):
+        """Wait for `path` and spool it to a local file for the importer. Falls back to the source path."""
+        if path not in self._order:
+            return path
+
+        with self._cond:
+            if self._passed(path):
+                return spool_archive_member(path)  # already taken, or skipped by the reader
+            # Drop anything the batch skipped over so the reader never stalls on it
+            self._next = self._order[path]
+            for skipped in [p for p in self._buffers if self._passed(p)]:
+                self._pop(skipped)
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._stopped or path in self._buffers)
+            data = self._pop(path) if path in self._buffers else None
+            self._next += 1
+            self._cond.notify_all()
+
+        if data is None or isinstance(data, Exception):
+            if data is not None:
+                print(f"[ManyAnims] Prefetch failed for {path}: {data}")
+            return spool_archive_member(path)
+
+        local_path = os.path.join(self._spool_dir, os.path.basename(path))
+        with open(local_path, "wb") as f:
+            f.write(data)
+        return local_path
+
+    def release(self, local_path):
+        """Delete a spooled file once the importer is done with it."""
+        if os.path.dirname(local_path) == self._spool_dir:
+            try:
+                os.remove(local_path)
+            except OSError:
+                pass
 
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._buffers.clear()
+            self._buffered_bytes = 0
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
 
 
-        # --- Suppress CoDMayaTools progress bar
-        _original_window = cmds.window
+_active_prefetcher = None
 
-        def _silent_window(*args, **kwargs):
-            name_arg = args[0] if args and isinstance(args[0], str) else ""
-            title = kwargs.get("title", "")
-            if (name_arg and name_arg.startswith("wprogress")) or ("Export" in title or "Progress" in title):
-                hidden_name = "wprogress_hidden_safe"
-                if not _original_window(hidden_name, exists=True):
-                    _original_window(hidden_name, title="Hidden Progress", visible=False,
-                                     topEdge=-10000, leftEdge=-10000, widthHeight=(1, 1))
-                print(f"[ManyAnims] 🧩 Suppressing CoDMayaTools progress window: {name_arg or title}")
-                return hidden_name
-            return _original_window(*args, **kwargs)
 
-        cmds.window = _silent_window
+def start_prefetch(files):
+    """Start prefetching the batch; a prefetcher left over from an aborted batch is stopped first."""
+    global _active_prefetcher
+    stop_prefetch()
 
+    depth = settings.get("prefetch_count", 2)
+    if depth <= 0:
+        _active_prefetcher = None
+        return None
 
-        # --- Export animation and safely clear notetracks
+    memory_limit = int(settings.get("prefetch_memory_mb", 512) * 1024 * 1024)
+    _active_prefetcher = AnimPrefetcher(files, depth, memory_limit).start()
+    print(f"[ManyAnims] Prefetching up to {depth} file(s) / {settings.get('prefetch_memory_mb', 512)} MB ahead.")
+    return _active_prefetcher
+
+
+def stop_prefetch():
+    global _active_prefetcher
+    if _active_prefetcher:
+        _active_prefetcher.stop()
+        _active_prefetcher = None
+
+
+def take_prefetched(file_path):
+    return _active_prefetcher.take(file_path) if _active_prefetcher else spool_archive_member(file_path)
+
+
+def release_prefetched(local_path):
+    if _active_prefetcher:
+        _active_prefetcher.release(local_path)
+    if _archive_spool_dir and os.path.dirname(local_path) == _archive_spool_dir:
         try:
-            CoDMayaTools.GeneralWindow_ExportSelected('xanim', False)
-            castplugin.utilityClearAnimation()
+            os.remove(local_path)
+        except OSError:
+            pass
 
-            # -----------------------------
-            # Manual Mode Reset Per Anim
-            # -----------------------------
-            if method_type == "manual":
+
+# --- Output writer ---
+# CoDMayaTools writes each export to a local staging file. A background thread
+# then copies it into export_path under a temporary name and renames it into
+# place, so a crash or cancel never leaves a half-written .xanim_* behind.
+# In bundle mode the thread appends it to the output bundle instead.
+
+OUTPUT_TEMP_SUFFIX = ".manyanims-tmp"
+
+
+def fsync_path(path):
+    """Flush a written file (or a directory on POSIX) to disk."""
+    if os.path.isdir(path):
+        if os.name == "nt":
+            return
+        fd = os.open(path, os.O_RDONLY)
+    else:
+        fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class OutputWriter(object):
+    """Moves staged exports into place on a background thread through a bounded queue."""
+
+    def __init__(self, queue_size=8, fsync=False, bundle=None):
+        import tempfile
+        self.fsync = fsync
+        self.bundle = bundle
+        self.written = []
+        self.errors = []
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._staging_dir = tempfile.mkdtemp(prefix="manyanims_out_")
+        self._staged_count = 0
+        self._thread = threading.Thread(target=self._run, name="ManyAnimsOutputWriter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stage(self, final_path):
+        """Local path the exporter should write `final_path` to."""
+        self._staged_count += 1
+        folder = os.path.join(self._staging_dir, str(self._staged_count))
+        os.makedirs(folder)
+        return os.path.join(folder, os.path.basename(final_path))
+
+    def submit(self, staged_path, final_path, then=None, source=None, done=None):
+        """Queue a finished export; blocks while the queue is full.
+
+        `then` runs once it is in place, and `done(final_path, error)` once the write has succeeded or failed.
+        """
+        self._queue.put((staged_path, final_path, then, source, done))
+
+    def _write(self, staged_path, final_path, source=None):
+        if not os.path.isfile(staged_path) or not os.path.getsize(staged_path):
+            raise IOError("exporter produced no output")
+
+        record_output_bytes(os.path.getsize(staged_path))
+        if self.bundle:
+            self.bundle.add(staged_path, final_path, source)
+            os.remove(staged_path)
+            return
+
+        os.makedirs(os.path.dirname(final_path) or ".", exist_ok=True)
+        temp_path = final_path + OUTPUT_TEMP_SUFFIX
+        shutil.copyfile(staged_path, temp_path)
+        os.replace(temp_path, final_path)
+        os.remove(staged_path)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                staged_path, final_path, then, source, done = item
+                started = time.perf_counter()
                 try:
-                    castplugin.utilityClearAnimation()
-                    print("[ManyAnims] Manual mode → resetting scene per anim (CAST)")
+                    self._write(staged_path, final_path, source)
+                    record_phase("write", time.perf_counter() - started)
+                    self.written.append(final_path)
+                    if then:
+                        then()
+                    error = None
                 except Exception as e:
-                    print(f"[ManyAnims] Manual reset failed: {e}")
+                    error = str(e)
+                    self.errors.append((final_path, error))
+                    print(f"[ManyAnims] Failed to write {final_path}: {e}")
+                if done:
+                    done(final_path, error)
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        """Drain the queue, fsync everything written if enabled and remove the staging folder."""
+        self._queue.put(None)
+        self._thread.join()
+
+        if self.bundle:
+            try:
+                self.bundle.close(self.fsync)
+            except OSError as e:
+                self.errors.append((self.bundle.pack_path, f"fsync failed: {e}"))
+        elif self.fsync and self.written:
+            for path in self.written:
+                try:
+                    fsync_path(path)
+                except OSError as e:
+                    self.errors.append((path, f"fsync failed: {e}"))
+            for folder in {os.path.dirname(p) for p in self.written}:
+                try:
+                    fsync_path(folder)
+                except OSError:
+                    pass
+            print(f"[ManyAnims] Synced {len(self.written)} exported file(s) to disk.")
+
+        shutil.rmtree(self._staging_dir, ignore_errors=True)
+        return self.errors
+
+
+_active_writer = None
+
+
+def start_output_writer():
+    global _active_writer
+    finish_output_writer()
+    bundle = open_output_bundle()
+    if not settings.get("atomic_output", True) and not bundle:
+        _active_writer = None
+        return None
+    _active_writer = OutputWriter(settings.get("output_queue_size", 8), settings.get("output_fsync", False),
+                                  bundle).start()
+    return _active_writer
+
+
+def stage_output(final_path):
+    """Path to hand to the exporter for `final_path`."""
+    return _active_writer.stage(final_path) if _active_writer else final_path
+
+
+def commit_output(staged_path, final_path, then=None, source=None):
+    done = _output_tracker.expect(source) if _output_tracker and source else None
+    if _active_writer and staged_path != final_path:
+        _active_writer.submit(staged_path, final_path, then, source, done)
+        return
+    if os.path.isfile(final_path):
+        record_output_bytes(os.path.getsize(final_path))
+    if then:
+        then()
+    if done:
+        done(final_path, None)
+
+
+# A file only counts as exported (in the report, metrics, Batch Manager and
+# journal) once every output it queued has been written. The batch loop hands
+# each exported file to the tracker and picks it up again from settled().
+
+class OutputTracker(object):
+    """Per source file, the outputs still being written; the file settles once all of them have landed."""
+
+    def __init__(self):
+        self.failed_outputs = set()
+        self._lock = threading.Lock()
+        self._files = {}
+        self._settled = []
+
+    def begin(self, file_path):
+        with self._lock:
+            self._files[file_path] = {"pending": 0, "errors": [], "info": None}
+
+    def expect(self, file_path):
+        """Count one more output of file_path. Returns the writer's done(final_path, error) callback."""
+        with self._lock:
+            entry = self._files.get(file_path)
+            if entry is None:
+                return None
+            entry["pending"] += 1
+
+        def done(final_path, error):
+            with self._lock:
+                entry["pending"] -= 1
+                if error:
+                    entry["errors"].append((final_path, error))
+                    self.failed_outputs.add(final_path)
+                self._settle(file_path, entry)
+        return done
+
+    def finish(self, file_path, info):
+        """The export of file_path has returned; `info` is handed back by settled()."""
+        with self._lock:
+            entry = self._files.get(file_path)
+            if entry is not None:
+                entry["info"] = info
+                self._settle(file_path, entry)
+
+    def discard(self, file_path):
+        """Forget a file whose export failed; its queued outputs no longer settle anything."""
+        with self._lock:
+            self._files.pop(file_path, None)
+
+    def _settle(self, file_path, entry):
+        if entry["info"] is not None and not entry["pending"] and self._files.get(file_path) is entry:
+            del self._files[file_path]
+            self._settled.append((file_path, entry["info"], entry["errors"]))
+
+    def settled(self):
+        """[(file_path, info, [(output, error)])] for files settled since the last call."""
+        with self._lock:
+            settled, self._settled = self._settled, []
+        return settled
+
+
+_output_tracker = None
+
+
+def finish_output_writer():
+    """Wait for queued writes to land; returns [(path, error)] for any that failed."""
+    global _active_writer, _active_bundle
+    if not _active_writer:
+        return []
+    writer, _active_writer = _active_writer, None
+    errors = writer.close()
+    _active_bundle = None
+    if errors:
+        print(f"[ManyAnims] {len(errors)} output file(s) failed to write:")
+        for path, error in errors:
+            print(f"  {path}: {error}")
+    return errors
+
+
+# --- Output bundle ---
+# With settings["output_bundle"] set, the writer thread appends every export to
+# one pack file in the export folder instead of writing loose files, with a
+# JSON-lines index next to it: name, offset, size, sha256 and source per entry.
+# Entries are only indexed once their bytes are flushed, so a crash never
+# indexes half an export. A name written again (e.g. by a resume) supersedes
+# the earlier entry. `python ManyAnims.py extract` pulls entries back out.
+
+BUNDLE_PACK_EXT = ".xanim_pack"
+BUNDLE_INDEX_EXT = ".xanim_pack.jsonl"
+
+_bundle_index_cache = {}
+
+
+def bundle_paths(folder, name):
+    """(pack, index) paths of a bundle."""
+    return os.path.join(folder, name + BUNDLE_PACK_EXT), os.path.join(folder, name + BUNDLE_INDEX_EXT)
+
+
+def bundle_index_path(pack_path):
+    return pack_path[:-len(BUNDLE_PACK_EXT)] + BUNDLE_INDEX_EXT if pack_path.endswith(BUNDLE_PACK_EXT) else pack_path
+
+
+def read_bundle_index(index_path):
+    """{entry name: latest entry} from a bundle index; a line cut short by a crash is ignored."""
+    entries = {}
+    if not os.path.isfile(index_path):
+        return entries
+    with open(index_path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries[entry["name"]] = entry
+    return entries
+
+
+def read_bundle_entry(pack_path, entry):
+    """Bytes of one entry; raises IOError if they don't match the index."""
+    import hashlib
+    with open(pack_path, "rb") as f:
+        f.seek(entry["offset"])
+        data = f.read(entry["size"])
+    if len(data) != entry["size"]:
+        raise IOError("truncated in pack")
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise IOError("hash mismatch")
+    return data
+
+
+class OutputBundle(object):
+    """Append-only pack file plus index for one export folder."""
+
+    def __init__(self, folder, name):
+        self.folder = folder
+        self.pack_path, self.index_path = bundle_paths(folder, name)
+        self.entries = read_bundle_index(self.index_path)
+
+        # Bytes after the last indexed entry belong to an export a crash cut short
+        end = max([e["offset"] + e["size"] for e in self.entries.values()] + [0])
+        self._pack = open(self.pack_path, "ab")
+        if self._pack.tell() > end:
+            self._pack.truncate(end)
+            self._pack.seek(end)
+        self._index = open(self.index_path, "a")
+        if self._index.tell() and not self._ends_with_newline():
+            self._index.write("\n")
+
+    def _ends_with_newline(self):
+        with open(self.index_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def entry_name(self, final_path):
+        return os.path.relpath(final_path, self.folder).replace(os.sep, "/")
+
+    def add(self, staged_path, final_path, source=None):
+        import hashlib
+        with open(staged_path, "rb") as f:
+            data = f.read()
+        offset = self._pack.tell()
+        self._pack.write(data)
+        self._pack.flush()
+        entry = {
+            "name": self.entry_name(final_path),
+            "offset": offset,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "source": source,
+        }
+        self._index.write(json.dumps(entry) + "\n")
+        self._index.flush()
+        self.entries[entry["name"]] = entry
+
+    def close(self, fsync=False):
+        if fsync:
+            os.fsync(self._pack.fileno())
+            os.fsync(self._index.fileno())
+        self._pack.close()
+        self._index.close()
+        print(f"[ManyAnims] Output bundle {os.path.basename(self.pack_path)}: {len(self.entries)} entries.")
+
+
+_active_bundle = None
+
+
+def open_output_bundle():
+    """The bundle the batch writes to, or None for loose files."""
+    global _active_bundle
+    name = settings.get("output_bundle", "")
+    _active_bundle = None
+    if name:
+        try:
+            _active_bundle = OutputBundle(export_path, name)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[ManyAnims] Output bundle disabled, writing loose files: {e}")
+    return _active_bundle
+
+
+def read_bundled_output(output_path):
+    """Contents of an export packed into its folder's bundle, or None if it isn't there. Raises IOError if damaged."""
+    name = settings.get("output_bundle", "")
+    if not name:
+        return None
+    output_path = os.path.abspath(output_path)
+    if _active_bundle and is_inside(output_path, _active_bundle.folder):
+        folder = _active_bundle.folder
+        bundle_entries = _active_bundle.entries
+        pack_path = _active_bundle.pack_path
+    else:
+        # The bundle sits in the export root, possibly a few folders up
+        folder = os.path.dirname(output_path)
+        while True:
+            pack_path, index_path = bundle_paths(folder, name)
+            try:
+                stat = os.stat(index_path)
+                break
+            except OSError:
+                parent = os.path.dirname(folder)
+                if parent == folder:
+                    return None
+                folder = parent
+        cached = _bundle_index_cache.get(index_path)
+        if not cached or cached[0] != (stat.st_size, stat.st_mtime):
+            cached = _bundle_index_cache[index_path] = ((stat.st_size, stat.st_mtime), read_bundle_index(index_path))
+        bundle_entries = cached[1]
+    # Same name OutputBundle.entry_name stores
+    entry = bundle_entries.get(os.path.relpath(output_path, folder).replace(os.sep, "/"))
+    return read_bundle_entry(pack_path, entry) if entry else None
+
+
+def is_inside(path, folder):
+    folder = os.path.abspath(folder)
+    try:
+        return os.path.commonpath([path, folder]) == folder
+    except ValueError:  # different drives
+        return False
+
+
+def extract_bundle(pack_path, output_folder=None, patterns=None):
+    """Write the entries matching any fnmatch pattern (all without patterns) to output_folder, or just list them.
+
+    Returns (entries, [(name, error)]).
+    """
+    entries = [e for e in read_bundle_index(bundle_index_path(pack_path)).values()
+               if not patterns or any(fnmatch.fnmatch(e["name"], p) for p in patterns)]
+    errors = []
+    if output_folder is None:
+        for entry in entries:
+            print(f"  {entry['name']:<48} {entry['size'] / 1024.0:>9.1f} KB  {entry['source'] or ''}")
+        print(f"[ManyAnims] {len(entries)} matching entries in {pack_path}.")
+        return entries, errors
+
+    for entry in entries:
+        try:
+            data = read_bundle_entry(pack_path, entry)
+            output_path = os.path.join(output_folder, *entry["name"].split("/"))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path + OUTPUT_TEMP_SUFFIX, "wb") as f:
+                f.write(data)
+            os.replace(output_path + OUTPUT_TEMP_SUFFIX, output_path)
+        except (OSError, IOError) as e:
+            errors.append((entry["name"], str(e)))
+            print(f"  [ERROR] {entry['name']}: {e}")
+    print(f"[ManyAnims] Extracted {len(entries) - len(errors)} of {len(entries)} entries to {output_folder}.")
+    return entries, errors
+
+
+# --- Output verification ---
+# Every written .xanim_export/.xanim_bin is re-read on a thread pool while the
+# batch carries on, and compared with what the source clip says it should hold.
+
+XANIM_BIN_MAGIC = b"*LZ4"
+
+
+def parse_xanim_export(file_path, data=None):
+    """Count parts, frames and notetrack keys in a text .xanim_export (`data` holds bundled contents)."""
+    result = {"parts": 0, "numframes": 0, "frames": 0, "note_keys": 0, "notetracks": False, "error": None}
+    section = "header"
+    part_lines = 0
+    try:
+        with (io.StringIO(data.decode("utf-8", "replace")) if data is not None
+              else open(file_path, "r", errors="replace")) as f:
+            for line in f:
+                tokens = line.split()
+                if not tokens or tokens[0].startswith("//"):
+                    continue
+                key = tokens[0]
+                if key == "NUMPARTS":
+                    result["parts"] = int(tokens[1])
+                elif key == "NUMFRAMES":
+                    result["numframes"] = int(tokens[1])
+                    section = "frames"
+                elif key == "NOTETRACKS":
+                    result["notetracks"] = True
+                    section = "notes"
+                elif key == "FRAME":
+                    if section == "frames":
+                        result["frames"] += 1
+                    elif section == "notes":
+                        result["note_keys"] += 1
+                elif key == "PART" and section == "frames":
+                    part_lines += 1
+    except (OSError, ValueError, IndexError) as e:
+        result["error"] = f"unreadable: {e}"
+        return result
+
+    # Nothing guarantees the exporter writes a NOTETRACKS section, so only the
+    # frame and part counts decide whether the file was cut short
+    if result["frames"] < result["numframes"]:
+        result["error"] = "truncated"
+    elif result["parts"] and part_lines != result["frames"] * result["parts"]:
+        result["error"] = "truncated frame data"
+    return result
+
+
+def verify_xanim_output(output_path, source_path, expected_parts):
+    """Check a written export against its source header. Returns a result row for the batch summary."""
+    row = {"output": output_path, "source": source_path, "status": "ok", "problems": []}
+
+    bundled = None
+    if not os.path.isfile(output_path):
+        try:
+            bundled = read_bundled_output(output_path)
+        except (OSError, IOError) as e:
+            row["status"] = "failed"
+            row["problems"].append(f"bundle entry {e}")
+            return row
+        if bundled is None:
+            row["status"] = "failed"
+            row["problems"].append("missing")
+            return row
+    if not (len(bundled) if bundled is not None else os.path.getsize(output_path)):
+        row["status"] = "failed"
+        row["problems"].append("empty")
+        return row
+
+    source = anim_header_cache.get(source_path)
+
+    if output_path.lower().endswith(".xanim_bin"):
+        if bundled is not None:
+            head = bundled[:8]
+        else:
+            with open(output_path, "rb") as f:
+                head = f.read(8)
+        if len(head) < 8:
+            row["status"] = "failed"
+            row["problems"].append("truncated")
+        elif head[:4] != XANIM_BIN_MAGIC:
+            row["status"] = "warning"
+            row["problems"].append("unrecognized xanim_bin header")
+        elif not struct.unpack("<I", head[4:8])[0]:
+            row["status"] = "failed"
+            row["problems"].append("no animation data")
+        return row
+
+    parsed = parse_xanim_export(output_path, bundled)
+    if parsed["error"]:
+        row["status"] = "failed"
+        row["problems"].append(parsed["error"])
+        return row
+
+    if expected_parts and parsed["parts"] != expected_parts:
+        row["problems"].append(f"{parsed['parts']} bones, expected {expected_parts}")
+    if source and not source["error"] and abs(parsed["numframes"] - source["frame_count"]) > 1:
+        row["problems"].append(f"{parsed['numframes']} frames, source has {source['frame_count']}")
+    if source and source["note_count"] and not parsed["note_keys"]:
+        row["problems"].append(f"no notetracks, source has {source['note_count']}")
+    if row["problems"]:
+        row["status"] = "mismatch"
+    return row
+
+
+class OutputVerifier(object):
+    """Runs verify_xanim_output on a thread pool and gathers the results."""
+
+    def __init__(self, threads=4):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="ManyAnimsVerify")
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def _verify(self, output_path, source_path, expected_parts):
+        started = time.perf_counter()
+        try:
+            return verify_xanim_output(output_path, source_path, expected_parts)
+        finally:
+            record_phase("verify", time.perf_counter() - started)
+
+    def submit(self, output_path, source_path, expected_parts):
+        future = self._pool.submit(self._verify, output_path, source_path, expected_parts)
+        with self._lock:
+            self._futures.append(future)
+
+    def close(self):
+        with self._lock:
+            futures = list(self._futures)
+        results = [f.result() for f in futures]
+        self._pool.shutdown()
+        return results
+
+
+_active_verifier = None
+
+
+def start_verification():
+    global _active_verifier
+    _active_verifier = OutputVerifier(settings.get("verify_threads", 4)) if settings.get("verify_outputs", True) else None
+    return _active_verifier
+
+
+def verification_job(output_path, source_path, expected_parts):
+    """Callable that queues verification of output_path, for commit_output to run once it is written."""
+    if not _active_verifier:
+        return None
+    verifier = _active_verifier
+    return lambda: verifier.submit(output_path, source_path, expected_parts)
+
+
+def add_verification_results(report):
+    """Finish verification and add every output with problems to the report."""
+    for row in finish_verification():
+        if row["status"] == "failed":
+            record_verify_failure()
+        if row["status"] != "ok":
+            severity = "error" if row["status"] == "failed" else "warning"
+            report.add(row["source"], "verify", f"{os.path.basename(row['output'])}: {', '.join(row['problems'])}",
+                       severity=severity)
+
+
+def finish_verification():
+    """Wait for outstanding checks, print problems and return every result row."""
+    global _active_verifier
+    if not _active_verifier:
+        return []
+    verifier, _active_verifier = _active_verifier, None
+    results = verifier.close()
+
+    bad = [r for r in results if r["status"] != "ok"]
+    print(f"[ManyAnims] Verified {len(results)} output file(s), {len(bad)} with problems.")
+    for r in bad:
+        print(f"  [{r['status'].upper()}] {os.path.basename(r['output'])} ({os.path.basename(r['source'])}): {', '.join(r['problems'])}")
+    return results
+
+
+# --- Memory ---
+# Long batches leave anim curves, notetrack nodes, undo entries and hidden
+# progress windows behind. Memory is sampled after every file, and a
+# housekeeping pass clears those out every "housekeeping_every" files, or after
+# any file that leaves the process above "housekeeping_memory_mb". Only curves
+# created during the batch are deleted. The samples are saved in the batch report.
+
+def process_rss_mb():
+    """Resident memory of this process in MB (peak on macOS), or None if it can't be read."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                        "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+            if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / 1048576.0
+            return None
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1048576.0
+    except Exception:
+        return None
+
+
+def scene_anim_curves():
+    """Names of the animCurves in the scene, or None if they can't be listed."""
+    try:
+        return set(cmds.ls(type="animCurve") or [])
+    except Exception:
+        return None
+
+
+def maya_memory_mb():
+    """Maya's own heap figure in MB, or None."""
+    try:
+        return float(cmds.memory(heapMemory=True, megaByte=True))
+    except Exception:
+        return None
+
+
+class MemoryMonitor(object):
+    """Per-file memory samples for one batch, and when to run housekeeping."""
+
+    def __init__(self, every=0, limit_mb=0):
+        self.every = every
+        self.limit_mb = limit_mb
+        self.samples = []
+        self.housekeeping_runs = 0
+        self._since_housekeeping = 0
+        # Curves the scene had before the batch; housekeeping never deletes them
+        self.scene_curves = scene_anim_curves()
+
+    def sample(self, file_path):
+        """Record memory after a file. Returns True when housekeeping is due."""
+        rss = process_rss_mb()
+        maya_mb = maya_memory_mb()
+        self.samples.append({
+            "file": os.path.basename(file_path),
+            "rss_mb": None if rss is None else round(rss, 1),
+            "maya_mb": None if maya_mb is None else round(maya_mb, 1),
+        })
+        self._since_housekeeping += 1
+        due = (self.every and self._since_housekeeping >= self.every) or \
+              (self.limit_mb and rss is not None and rss >= self.limit_mb)
+        if due:
+            self._since_housekeeping = 0
+            self.housekeeping_runs += 1
+        return bool(due)
+
+    def growth_per_100(self, key="rss_mb"):
+        """Least-squares slope of a memory figure in MB per 100 files, or None."""
+        points = [(i, s[key]) for i, s in enumerate(self.samples) if s[key] is not None]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        var = sum((x - mean_x) ** 2 for x, _ in points)
+        if not var:
+            return None
+        return 100 * sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+    def summary(self):
+        rss = [s["rss_mb"] for s in self.samples if s["rss_mb"] is not None]
+        growth = self.growth_per_100()
+        maya_growth = self.growth_per_100("maya_mb")
+        return {
+            "start_mb": rss[0] if rss else None,
+            "end_mb": rss[-1] if rss else None,
+            "peak_mb": max(rss) if rss else None,
+            "growth_mb_per_100_files": None if growth is None else round(growth, 1),
+            "maya_growth_mb_per_100_files": None if maya_growth is None else round(maya_growth, 1),
+            "housekeeping_runs": self.housekeeping_runs,
+            "samples": self.samples,
+        }
+
+
+def format_memory_summary(memory):
+    if not memory or memory["start_mb"] is None:
+        return ""
+    text = f"Memory: {memory['start_mb']:.0f} → {memory['end_mb']:.0f} MB (peak {memory['peak_mb']:.0f})"
+    if memory["growth_mb_per_100_files"] is not None:
+        text += f", {memory['growth_mb_per_100_files']:+.1f} MB per 100 files"
+    if memory["housekeeping_runs"]:
+        text += f", {memory['housekeeping_runs']} housekeeping pass(es)"
+    return text + "."
+
+
+# Notetrack nodes left in the scene by SETools / castplugin imports
+NOTETRACK_NODES = ("SENotes", "CastNotetracks")
+
+
+def run_housekeeping(scene_curves=None):
+    """Free what finished clips leave behind: undo queue, orphaned curves/notes and progress windows.
+
+    Only curves missing from `scene_curves` (the scene's curves at batch start)
+    were made by the batch; without that list no curves are deleted.
+    """
+    started = time.perf_counter()
+    try:
+        cmds.flushUndo()
+    except Exception as e:
+        print(f"[ManyAnims] Could not flush undo: {e}")
+
+    # Curves the batch created that no longer drive anything
+    orphans = []
+    if scene_curves is not None:
+        curves = [c for c in cmds.ls(type="animCurve") or [] if c not in scene_curves]
+        orphans = [c for c in curves if not cmds.listConnections(c, source=False, destination=True)]
+        if orphans:
+            cmds.delete(orphans)
+
+    # Notes of finished clips; the next import makes its own. Converted rigs keep
+    # their CAST notetracks, as in clear_cast_notetracks
+    keep = {"CastNotetracks"} if find_cast_rig_groups() else set()
+    notes = [n for n in NOTETRACK_NODES if n not in keep and cmds.objExists(n)]
+    if notes:
+        cmds.delete(notes)
+
+    windows = [w for w in cmds.lsUI(windows=True) or [] if w.startswith("wprogress")]
+    for window in windows:
+        cmds.deleteUI(window, window=True)
+
+    print(f"[ManyAnims] Housekeeping: removed {len(orphans)} orphaned curve(s), {len(notes)} notetrack node(s), "
+          f"{len(windows)} progress window(s) in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+
+# --- Metrics ---
+# For farm runs, batch health can be scraped by Prometheus instead of read
+# from Maya's log. Set settings["metrics_textfile"] to a .prom file in the
+# node_exporter textfile-collector folder (rewritten every metrics_interval
+# seconds), and/or settings["metrics_port"] to serve /metrics over HTTP.
+# Counters live for the whole process, so watch mode keeps counting across
+# batches. manyanims_last_file_timestamp_seconds is there for stall alerts.
+
+METRIC_PHASE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+METRIC_FILE_STATES = ("exported", "failed", "skipped")
+
+
+def metric_label(value):
+    """Label value escaped for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class BatchMetrics(object):
+    """Export counters, per-phase duration histograms and batch gauges, in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files = dict.fromkeys(METRIC_FILE_STATES, 0)
+        self.phases = {}  # phase -> ([count per bucket], sum, count)
+        self.output_bytes = 0
+        self.verify_failures = 0
+        self.peak_rss = 0.0
+        self.running = False
+        self.batch_files = 0
+        self.batch_processed = 0
+        self.batch_started = 0.0
+        self.last_file = 0.0
+
+    def start_batch(self, total):
+        with self._lock:
+            self.running = True
+            self.batch_files = total
+            self.batch_processed = 0
+            self.batch_started = self.last_file = time.time()
+
+    def finish_batch(self):
+        with self._lock:
+            self.running = False
+
+    def count_file(self, state, count=1):
+        rss = process_rss_mb()
+        with self._lock:
+            self.files[state] += count
+            if state != "skipped":
+                self.batch_processed += count
+                self.last_file = time.time()
+            self.peak_rss = max(self.peak_rss, rss or 0.0)
+
+    def observe_phase(self, phase, seconds):
+        with self._lock:
+            buckets, total, count = self.phases.get(phase) or ([0] * len(METRIC_PHASE_BUCKETS), 0.0, 0)
+            for i, bound in enumerate(METRIC_PHASE_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self.phases[phase] = (buckets, total + seconds, count + 1)
+
+    def add_output_bytes(self, size):
+        with self._lock:
+            self.output_bytes += size
+
+    def count_verify_failure(self):
+        with self._lock:
+            self.verify_failures += 1
+
+    def render(self):
+        rss = process_rss_mb()
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss or 0.0)
+            lines = [
+                "# HELP manyanims_files_total Clips finished, by outcome.",
+                "# TYPE manyanims_files_total counter",
+            ]
+            lines += [f'manyanims_files_total{{state="{metric_label(state)}"}} {self.files[state]}'
+                      for state in METRIC_FILE_STATES]
+            lines += [
+                "# HELP manyanims_phase_duration_seconds Time spent per clip in each export phase.",
+                "# TYPE manyanims_phase_duration_seconds histogram",
+            ]
+            for phase, (buckets, total, count) in sorted(self.phases.items()):
+                phase = metric_label(phase)
+                lines += [f'manyanims_phase_duration_seconds_bucket{{phase="{phase}",le="{bound}"}} {n}'
+                          for bound, n in zip(METRIC_PHASE_BUCKETS, buckets)]
+                lines.append(f'manyanims_phase_duration_seconds_bucket{{phase="{phase}",le="+Inf"}} {count}')
+                lines.append(f'manyanims_phase_duration_seconds_sum{{phase="{phase}"}} {total:.6f}')
+                lines.append(f'manyanims_phase_duration_seconds_count{{phase="{phase}"}} {count}')
+            for name, kind, help_text, value in (
+                ("output_bytes_total", "counter", "Bytes of exported animation written.", self.output_bytes),
+                ("verify_failures_total", "counter", "Outputs that failed verification.", self.verify_failures),
+                ("memory_rss_bytes", "gauge", "Resident memory of the Maya process.", int((rss or 0.0) * 1048576)),
+                ("memory_peak_bytes", "gauge", "Highest resident memory seen.", int(self.peak_rss * 1048576)),
+                ("batch_running", "gauge", "1 while a batch is exporting.", int(self.running)),
+                ("batch_files", "gauge", "Clips in the current or last batch.", self.batch_files),
+                ("batch_files_processed", "gauge", "Clips of the current or last batch finished.", self.batch_processed),
+                ("batch_start_timestamp_seconds", "gauge", "When the current or last batch started.", self.batch_started),
+                ("last_file_timestamp_seconds", "gauge", "When the last clip finished.", self.last_file),
+            ):
+                lines += [f"# HELP manyanims_{name} {help_text}", f"# TYPE manyanims_{name} {kind}",
+                          f"manyanims_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_metrics_server = None
+_metrics_stop = None
+_metrics_thread = None
+
+
+def write_metrics_textfile(path):
+    # Written under a temporary name and renamed, as the textfile collector requires
+    try:
+        with open(path + OUTPUT_TEMP_SUFFIX, "w") as f:
+            f.write(_metrics.render())
+        os.replace(path + OUTPUT_TEMP_SUFFIX, path)
+    except OSError as e:
+        print(f"[ManyAnims] Could not write metrics to {path}: {e}")
+
+
+def serve_metrics(host, port):
+    """Serve /metrics on a daemon thread for the rest of the session."""
+    global _metrics_server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = _metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        _metrics_server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"[ManyAnims] Could not serve metrics on {host}:{port}: {e}")
+        return
+    _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, name="ManyAnimsMetrics", daemon=True).start()
+    print(f"[ManyAnims] Serving metrics on http://{host}:{port}/metrics")
+
+
+def start_metrics(total):
+    """Start metrics for a batch of `total` clips, if a textfile or port is configured."""
+    global _metrics, _metrics_stop, _metrics_thread
+    textfile = settings.get("metrics_textfile", "")
+    port = settings.get("metrics_port", 0)
+    if not textfile and not port and _metrics is None:
+        return None
+
+    if _metrics is None:
+        _metrics = BatchMetrics()
+    _metrics.start_batch(total)
+    if port and _metrics_server is None:
+        serve_metrics(settings.get("metrics_host", "127.0.0.1"), port)
+
+    stop_metrics_textfile()
+    if textfile:
+        _metrics_stop = threading.Event()
+
+        def run(stop=_metrics_stop, interval=max(1.0, settings.get("metrics_interval", 15.0))):
+            write_metrics_textfile(textfile)
+            while not stop.wait(interval):
+                write_metrics_textfile(textfile)
+
+        _metrics_thread = threading.Thread(target=run, name="ManyAnimsMetricsFile", daemon=True)
+        _metrics_thread.start()
+    return _metrics
+
+
+def stop_metrics_textfile():
+    global _metrics_stop, _metrics_thread
+    if _metrics_thread:
+        _metrics_stop.set()
+        _metrics_thread.join(timeout=5)
+        _metrics_stop = _metrics_thread = None
+
+
+def finish_metrics():
+    """Mark the batch finished and write the textfile one last time."""
+    if not _metrics:
+        return
+    _metrics.finish_batch()
+    stop_metrics_textfile()
+    if settings.get("metrics_textfile", ""):
+        write_metrics_textfile(settings["metrics_textfile"])
+
+
+def record_file(state, count=1):
+    if _metrics:
+        _metrics.count_file(state, count)
+
+
+def record_phase(phase, seconds):
+    if _metrics:
+        _metrics.observe_phase(phase, seconds)
+
+
+def record_output_bytes(size):
+    if _metrics:
+        _metrics.add_output_bytes(size)
+
+
+def record_verify_failure():
+    if _metrics:
+        _metrics.count_verify_failure()
+
+
+# --- Batch report ---
+# Per-file problems are collected instead of stopping the batch with a modal
+# dialog; one summary is shown (and written next to the exports) at the end.
+
+REPORT_FILE_NAME = "manyanims_report.json"
+
+
+class ExportError(Exception):
+    """A per-file problem that should be reported without stopping the batch."""
+
+    def __init__(self, phase, message):
+        Exception.__init__(self, message)
+        self.phase = phase
+
+
+class BatchReport(object):
+    """Collects per-file errors and outcome counts for one batch."""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self._phase = "import"  # updated by the per-file export as it goes
+        self._phase_started = None
+        self.processed = 0
+        self.exported = []
+        self.entries = []
+        self.aborted = False
+        self.cancelled = False
+        self.started = time.time()
+        self.path = None
+        self.memory = None  # MemoryMonitor.summary() once the batch ends
+
+    @property
+    def phase(self):
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase):
+        # Each phase change closes the previous phase's timing for the metrics
+        self.end_phase()
+        self._phase = phase
+        self._phase_started = time.perf_counter()
+
+    def end_phase(self):
+        if self._phase_started is not None:
+            record_phase(self._phase, time.perf_counter() - self._phase_started)
+            self._phase_started = None
+
+    def add(self, file_path, phase, message, traceback_text=None, severity="error"):
+        self.entries.append({
+            "file": file_path,
+            "phase": phase,
+            "severity": severity,
+            "message": message,
+            "traceback": traceback_text,
+        })
+        print(f"[ManyAnims] [{severity.upper()}] {os.path.basename(file_path)} ({phase}): {message}")
+
+    def add_exception(self, file_path, error):
+        if isinstance(error, ExportError):
+            self.add(file_path, error.phase, str(error))
+        else:
+            self.add(file_path, self.phase, f"{type(error).__name__}: {error}", traceback.format_exc())
+
+    def failed_files(self):
+        return {e["file"] for e in self.entries if e["severity"] == "error"}
+
+    def should_abort(self):
+        failures = len(self.failed_files())
+        if not failures:
+            return False
+        if settings.get("fail_fast", False):
+            return True
+        limit = settings.get("max_failures", 0)
+        return bool(limit) and failures >= limit
+
+    def summary(self):
+        skipped = len({e["file"] for e in self.entries if e["severity"] == "skipped"})
+        warnings = len({e["file"] for e in self.entries if e["severity"] == "warning"})
+        text = (f"{self.label}: {len(self.exported)} exported, {len(self.failed_files())} failed, "
+                f"{skipped} skipped, {warnings} with warnings (of {self.total}).")
+        if self.aborted:
+            text += "\nBatch aborted: too many failures."
+        if self.cancelled:
+            text += "\nBatch cancelled; Resume Last Batch exports the rest."
+        memory = format_memory_summary(self.memory)
+        if memory:
+            text += "\n" + memory
+        return text
+
+    def write(self, folder):
+        """Write the report as JSON into `folder`; returns the path or None."""
+        if not folder:
+            return None
+        self.path = os.path.join(folder, REPORT_FILE_NAME)
+        try:
+            with open(self.path, "w") as f:
+                json.dump({
+                    "label": self.label,
+                    "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                    "duration_seconds": round(time.time() - self.started, 1),
+                    "total": self.total,
+                    "exported": self.exported,
+                    "aborted": self.aborted,
+                    "cancelled": self.cancelled,
+                    "entries": self.entries,
+                    "memory": self.memory,
+                }, f, indent=4)
+        except Exception as e:
+            print("[ManyAnims] Failed to write batch report:", e)
+            self.path = None
+        return self.path
+
+    def show(self):
+        print("[ManyAnims] " + self.summary())
+        problems = [e for e in self.entries if e["severity"] != "skipped"]
+        lines = [f"{os.path.basename(e['file'])} [{e['phase']}]: {e['message']}" for e in problems[:15]]
+        if len(problems) > 15:
+            lines.append(f"...and {len(problems) - 15} more")
+        message = self.summary()
+        if lines:
+            message += "\n\n" + "\n".join(lines)
+        if self.path:
+            message += f"\n\nFull report: {self.path}"
+        if headless_mode:
+            print(message)
+            return
+        cmds.confirmDialog(title="Batch Complete", message=message, button=["OK"])
+
+
+# --- Batch journal ---
+# Each batch logs every file's state to a journal in the export folder as it
+# goes, so a batch that died with Maya can be resumed. The first line records
+# the files and export settings; files with no entry yet are pending. A resume
+# appends to the same journal. Files that were in progress are exported again,
+# as are done files whose outputs are missing or fail verification.
+
+JOURNAL_FILE_NAME = "manyanims_journal.jsonl"
+
+# Settings that change what a batch writes, restored on resume
+JOURNAL_SETTINGS = ("export_targets", "remap_profiles", "export_namespaces", "namespace_suffixes",
+                    "native_notetracks", "notetrack_drop_patterns", "notetrack_strip_patterns", "output_bundle",
+                    "method_overrides", "auto_method_fallback")
+
+resuming_batch = False
+
+
+class BatchJournal(object):
+    """Append-only per-file state log (in-progress, done, failed) for one export folder."""
+
+    def __init__(self, folder, header, append=False):
+        self.path = os.path.join(folder, JOURNAL_FILE_NAME)
+        self.outputs = []
+        self._file = open(self.path, "a" if append else "w")
+        if append and self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # last line was cut short by the crash
+        self._write(dict(header, event="resume" if append else "batch", time=time.time()))
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _write(self, entry):
+        # Flushed per line so everything before a crash is on disk
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def start_file(self, file_path):
+        self.outputs = []
+        self._write({"file": file_path, "state": "in-progress"})
+
+    def finish_file(self, file_path, state, outputs=None):
+        self._write({"file": file_path, "state": state, "outputs": self.outputs if outputs is None else outputs})
+
+    def close(self):
+        self._file.close()
+
+
+_active_journal = None
 
-            # --- check for Joint Groups before clearing notetracks ---
 
-            # --- Check for specific rig joint groups before clearing notetracks ---
-            rig_joint_groups = {"tx:Joints", "iw2:Joints", "iw3:Joints"}
-            scene_transforms = set(cmds.ls(type='transform'))
+def journal_header(files, method_type, loader, label):
+    """Everything a resume needs to rebuild the batch: files, paths, rig and export settings."""
+    return {
+        "label": label,
+        "loader": loader,
+        "method": method_type,
+        "files": files,
+        "anim_path": anim_path,
+        "export_path": export_path,
+        "namespace": default_namespace,
+        "prefix": game_prefix,
+        "remap": use_name_remap,
+        "bo3": export_bo3,
+        "export_selected_only": export_selected_only,
+        "selection": (cmds.ls(selection=True) or []) if method_type == "manual" else [],
+        "settings": {k: settings[k] for k in JOURNAL_SETTINGS if k in settings},
+    }
 
-            # Look for any of the exact groups in the scene
-            found_rig_groups = rig_joint_groups.intersection(scene_transforms)
 
-            if found_rig_groups:
-                print(f"[ManyAnims]  Found special rig joint group(s): {list(found_rig_groups)} → Skipping ClearAndRemoveCastNotetracks()")
+def start_journal(header):
+    global _active_journal
+    try:
+        _active_journal = BatchJournal(export_path, header, append=resuming_batch)
+    except (OSError, TypeError) as e:
+        print(f"[ManyAnims] Batch journal disabled: {e}")
+        _active_journal = None
+    return _active_journal
+
+
+def journal_output(output_path):
+    """Note an output of the file being exported, so a resume can check it."""
+    if _active_journal:
+        _active_journal.outputs.append(output_path)
+    if _worker_outputs is not None:
+        _worker_outputs.append(output_path)
+
+
+def finish_journal():
+    global _active_journal
+    if _active_journal:
+        _active_journal.close()
+        _active_journal = None
+
+
+def read_journal(folder):
+    """(first header, files in order, last entry per file) from a folder's journal, or None."""
+    path = os.path.join(folder, JOURNAL_FILE_NAME)
+    if not os.path.isfile(path):
+        return None
+    header, files, states = None, [], {}
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # line cut short by the crash
+            if entry.get("event") in ("batch", "resume"):
+                header = header or entry
+                for file_path in entry.get("files", []):
+                    if file_path not in states:
+                        states[file_path] = None
+                        files.append(file_path)
+            elif "file" in entry:
+                states[entry["file"]] = entry
+    return (header, files, states) if header else None
+
+
+def journal_remaining(folder, files, states):
+    """Files a resume still has to export, in journal order."""
+    from concurrent.futures import ThreadPoolExecutor
+    # Half-written outputs from the crashed batch are never trusted
+    for name in os.listdir(folder):
+        if name.endswith(OUTPUT_TEMP_SUFFIX):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+    done = [p for p in files if states[p] and states[p]["state"] == "done" and states[p].get("outputs")]
+    checks = [(o, p) for p in done for o in states[p]["outputs"]]
+    with ThreadPoolExecutor(max_workers=max(1, settings.get("verify_threads", 4))) as pool:
+        rows = list(pool.map(lambda check: verify_xanim_output(check[0], check[1], None), checks))
+    redo = {row["source"] for row in rows if row["status"] == "failed"}
+    for row in rows:
+        if row["status"] == "failed":
+            print(f"[ManyAnims] Redoing {os.path.basename(row['source'])}: "
+                  f"{os.path.basename(row['output'])} {', '.join(row['problems'])}")
+
+    finished = set(done) - redo
+    return [p for p in files if p not in finished]
+
+
+def apply_journal_header(header):
+    """Restore the paths, rig and export settings a journaled batch ran with."""
+    global anim_path, export_path, default_namespace, game_prefix, use_name_remap
+    global use_cast, use_se_mode, export_selected_only
+
+    settings.update(header.get("settings", {}))
+    anim_path = header.get("anim_path") or anim_path
+    export_path = header.get("export_path") or export_path
+    default_namespace = header.get("namespace", default_namespace)
+    game_prefix = header.get("prefix", game_prefix)
+    use_name_remap = header.get("remap", use_name_remap)
+    use_cast = header.get("loader", "cast") == "cast"
+    use_se_mode = not use_cast
+    apply_export_game(header.get("bo3", export_bo3))
+
+    if header.get("method") == "manual":
+        selection = [j for j in header.get("selection", []) if cmds.objExists(j)]
+        if selection:
+            cmds.select(selection)
+        export_selected_only = header.get("export_selected_only", False)
+
+
+def resume_batch(folder=None):
+    """Rebuild the unfinished part of the last batch in folder (the export folder) and run it."""
+    global resuming_batch
+    if batch_is_running():
+        return None
+    folder = folder or export_path or settings.get("export_location", "")
+    journal = read_journal(folder) if folder and os.path.isdir(folder) else None
+    if not journal:
+        message = f"No batch journal found in:\n{folder or '(no export folder set)'}"
+        print("[ManyAnims] " + message)
+        if not headless_mode:
+            cmds.confirmDialog(title="Resume Batch", message=message, button=["OK"])
+        return None
+
+    header, files, states = journal
+    remaining = journal_remaining(folder, files, states)
+    counts = {}
+    for file_path in files:
+        state = states[file_path]["state"] if states[file_path] else "pending"
+        counts[state] = counts.get(state, 0) + 1
+    print(f"[ManyAnims] Journal: {len(files)} file(s), "
+          + ", ".join(f"{n} {state}" for state, n in sorted(counts.items()))
+          + f"; {len(remaining)} to export.")
+    if not remaining:
+        if not headless_mode:
+            cmds.confirmDialog(title="Resume Batch", message="Every file in the journal is already exported.", button=["OK"])
+        return None
+
+    apply_journal_header(header)
+    resuming_batch = True
+    try:
+        return run_loader(header.get("method") or current_export_method(), files=remaining)
+    finally:
+        resuming_batch = False
+
+
+def resume_last_batch(*args):
+    resume_batch()
+
+
+# --- Export plan ---
+# Every batch first works out what it will write: for each clip its category
+# (ADS or normal), the joint set it is exported with and every output path and
+# format. Remap rules and prefixes can send two clips to the same output, so a
+# clip whose output is already taken is skipped instead of overwriting it. A
+# dry run saves the plan without exporting, and a saved plan can be run later
+# with exactly the settings it was made with.
+
+PLAN_FILE_NAME = "manyanims_plan.json"
+
+dry_run = False
+active_plan = None  # plan being executed; the batch refuses to run if its outputs differ
+
+
+def plan_clip(file_path, method_type, targets, namespaces):
+    """Plan entry for one clip: category, joint set and every output it will write."""
+    is_ads = is_ads_anim(file_path)
+    method_type = resolve_clip_method(file_path, method_type)
+    if method_type == "manual":
+        joints = {"rule": "manual selection", "joints": [], "hierarchy": export_selected_only}
+        namespaces = [None]
+    else:
+        joints = {"rule": f"{method_type} {'ads' if is_ads else 'normal'}",
+                  "joints": list(REQUIRED_JOINTS[(method_type, is_ads)]),
+                  "hierarchy": not is_ads}
+
+    outputs = []
+    for namespace in namespaces:
+        rig_suffix = "" if namespace is None else get_rig_suffix(namespace, namespaces)
+        for target in order_targets_for_game(targets):
+            outputs.append({
+                "path": build_output_path(file_path, export_path, target, rig_suffix),
+                "format": target["ext"].lstrip("."),
+                "namespace": namespace,
+            })
+    return dict({"source": file_path, "category": "ads" if is_ads else "normal", "method": method_type,
+                 "outputs": outputs}, **joints)
+
+
+def find_plan_collisions(clips):
+    """[{"output", "source", "first"}] for every output already claimed by an earlier clip (or target)."""
+    owners = {}
+    collisions = []
+    for clip in clips:
+        for output in clip["outputs"]:
+            # Case-insensitive on every platform: the game tools read outputs on Windows
+            key = os.path.normpath(output["path"]).lower()
+            if key in owners:
+                collisions.append({"output": output["path"], "source": clip["source"], "first": owners[key]})
             else:
+                owners[key] = clip["source"]
+    return collisions
+
+
+def build_export_plan(files, method_type, loader, label):
+    targets = get_export_targets()
+    namespaces = get_export_namespaces()
+    clips = [plan_clip(path, method_type, targets, namespaces) for path in files]
+    return {
+        "header": journal_header(files, method_type, loader, label),
+        "clips": clips,
+        "collisions": find_plan_collisions(clips),
+    }
+
+
+def plan_outputs(plan):
+    return [[output["path"] for output in clip["outputs"]] for clip in plan["clips"]]
+
+
+def print_export_plan(plan):
+    outputs = sum(len(clip["outputs"]) for clip in plan["clips"])
+    print(f"[ManyAnims] Plan: {len(plan['clips'])} clip(s), {outputs} output(s), "
+          f"{len(plan['collisions'])} collision(s).")
+    for clip in plan["clips"]:
+        names = ", ".join(os.path.basename(o["path"]) for o in clip["outputs"])
+        print(f"  {os.path.basename(clip['source'])} [{clip['category']}, {clip['rule']}] → {names}")
+    for collision in plan["collisions"]:
+        print(f"  [COLLISION] {os.path.basename(collision['source'])} → {os.path.basename(collision['output'])}, "
+              f"already written by {os.path.basename(collision['first'])}")
+
+
+def save_export_plan(plan, plan_path=None):
+    """Write the plan as JSON (default: the export folder). Returns the path."""
+    plan_path = plan_path or os.path.join(export_path, PLAN_FILE_NAME)
+    with open(plan_path, "w") as f:
+        json.dump(dict(plan, version=1, created=time.time()), f, indent=4)
+    print(f"[ManyAnims] Export plan saved to {plan_path}")
+    return plan_path
+
+
+def read_export_plan(plan_path):
+    with open(plan_path, "r") as f:
+        plan = json.load(f)
+    if "header" not in plan or "clips" not in plan:
+        raise ValueError(f"{plan_path} is not a ManyAnims export plan")
+    return plan
+
+
+def show_plan_result(plan, plan_path):
+    if headless_mode:
+        return
+    message = f"{len(plan['clips'])} clip(s) planned.\nSaved to:\n{plan_path}"
+    if plan["collisions"]:
+        message += (f"\n\n{len(plan['collisions'])} output collision(s); the later clips would be skipped."
+                    "\nSee the Script Editor for the list.")
+    cmds.confirmDialog(title="Export Plan", message=message, button=["OK"])
+
+
+def dry_run_export(*args):
+    """Save the plan for the current import and export folders without exporting anything."""
+    global dry_run
+    if not (anim_path or selected_anim_files) or not export_path:
+        cmds.confirmDialog(title="Error", message="Please select both Anim Path and Export Path first.", button=["OK"])
+        return
+    dry_run = True
+    try:
+        run_loader(current_export_method())
+    finally:
+        dry_run = False
+
+
+def execute_plan(plan_path):
+    """Run a saved plan with the settings it was made with. Returns the BatchReport, or None."""
+    global active_plan
+    if batch_is_running():
+        return None
+    plan = read_export_plan(plan_path)
+    apply_journal_header(plan["header"])
+    active_plan = plan
+    try:
+        return run_loader(plan["header"].get("method") or current_export_method(),
+                          files=[clip["source"] for clip in plan["clips"]])
+    finally:
+        active_plan = None
+
+
+def run_saved_plan(*args):
+    selected = cmds.fileDialog2(fileMode=1, dialogStyle=2, caption="Select Export Plan",
+                                fileFilter="ManyAnims plan (*.json)",
+                                startingDirectory=export_path or settings.get("export_location", ""))
+    if not selected:
+        return
+    try:
+        execute_plan(selected[0])
+    except (OSError, ValueError) as e:
+        cmds.confirmDialog(title="Export Plan", message=f"Could not run the plan:\n{e}", button=["OK"])
+
+
+# --- Isolated workers ---
+# A corrupt clip can hang castplugin or the XAnim exporter, and with it the
+# whole batch. With settings["isolate_workers"] > 0 a headless batch exports in
+# that many mayapy child processes instead. Each opens the rig scene once and
+# is fed one file at a time. A worker that spends longer than "file_timeout" on
+# a file, or dies, is killed and replaced; the file is recorded as failed and
+# the batch goes on. Workers answer on stdout with lines starting with
+# WORKER_MESSAGE_PREFIX; anything else they print is echoed with their number.
+
+WORKER_MESSAGE_PREFIX = "@@manyanims "
+WORKER_START_ATTEMPTS = 3
+
+active_job = None  # job dict of the headless session, for the workers
+_worker_outputs = None  # outputs of the file a worker is exporting
+
+
+def isolated_worker_count():
+    """Workers to run the batch on, or 0 to export in this process."""
+    count = int(settings.get("isolate_workers", 0) or 0)
+    if count <= 0:
+        return 0
+    if active_job is None or not headless_mode:
+        print("[ManyAnims] Isolated workers need a headless job (mayapy -m ManyAnims batch); exporting in this process.")
+        return 0
+    if settings.get("output_bundle"):
+        print("[ManyAnims] Isolated workers can't share an output bundle; exporting in this process.")
+        return 0
+    return count
+
+
+def find_mayapy():
+    configured = settings.get("mayapy_path", "")
+    if configured:
+        return configured
+    folder, name = os.path.split(sys.executable)
+    if name.lower().startswith("mayapy"):
+        return sys.executable
+    return os.path.join(folder, "mayapy.exe" if os.name == "nt" else "mayapy")
+
+
+def worker_job(method_type):
+    """The running session as a job for the workers: same scene, rig and settings, no file list."""
+    job = {k: v for k, v in active_job.items() if k not in ("files", "query", "targets", "namespaces")}
+    job.update({
+        "loader": "cast" if use_cast else "se",
+        "method": method_type,
+        "game": "bo3" if export_bo3 else "cod4",
+        "namespace": default_namespace,
+        "prefix": game_prefix,
+        "remap": use_name_remap,
+        "import": anim_path,
+        "export": export_path,
+        "settings": dict(settings, isolate_workers=0),
+    })
+    if method_type == "manual":
+        job["joints"] = cmds.ls(selection=True) or []
+    return job
+
+
+class IsolatedWorker(object):
+    """One supervised mayapy child process. Its messages go to the shared events queue."""
+
+    def __init__(self, number, job, events):
+        self.number = number
+        self.job = job
+        self.events = events
+        self.process = None
+        self.ready = False
+        self.file = None
+        self.deadline = None
+        self.files_done = 0
+        self.failed_starts = 0
+
+    def start(self):
+        import subprocess
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+        process = subprocess.Popen([find_mayapy(), os.path.abspath(__file__), "worker"],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   encoding="utf-8", errors="replace", bufsize=1, env=env)
+        self.process, self.ready, self.file, self.files_done = process, False, None, 0
+        self.deadline = time.monotonic() + settings.get("worker_start_timeout", 600.0)
+        threading.Thread(target=self._read, args=(process,), daemon=True).start()
+        self.send({"job": self.job})
+
+    def _read(self, process):
+        for line in process.stdout:
+            if line.startswith(WORKER_MESSAGE_PREFIX):
                 try:
-                    CoDMayaTools.ClearAndRemoveCastNotetracks("xanim")
-                    print("[ManyAnims]  Cleared and removed CAST notetracks.")
-                except Exception as e:
-                    print(f"[ManyAnims]  Failed to clear CAST notetracks: {e}")
+                    self.events.put((self, process, json.loads(line[len(WORKER_MESSAGE_PREFIX):])))
+                except ValueError:
+                    pass
+            else:
+                print(f"[w{self.number}] {line.rstrip()}")
+        self.events.put((self, process, {"event": "exit", "code": process.wait()}))
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            pass  # the exit event follows
+
+    def assign(self, file_path):
+        self.file = file_path
+        self.deadline = time.monotonic() + settings.get("file_timeout", 300.0)
+        self.send({"file": file_path})
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it doesn't."""
+        import subprocess
+        if not self.process:
+            return
+        self.send({})
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            pass
+        self.kill()
+
+    def kill(self):
+        import subprocess
+        process, self.process = self.process, None
+        if process and process.poll() is None:
+            try:
+                process.kill()
+                process.wait(timeout=10)
+            except (OSError, subprocess.SubprocessError):
+                pass
+
+
+def run_isolated_batch(files, method_type, worker_count, report, journal, batch_timer, progress_control):
+    """Export `files` longest-first on a pool of isolated workers, filling in `report` like the in-process loop."""
+    timeout = settings.get("file_timeout", 300.0)
+    max_files = settings.get("worker_max_files", 0)
+    events = queue.Queue()
+    job = worker_job(method_type)
+    pending = list(reversed(files))  # pop() takes the longest first
+    workers = [IsolatedWorker(n, job, events) for n in range(1, min(worker_count, len(files)) + 1)]
+    batch_timer.parallel = len(workers)
+    done = 0
+    print(f"[ManyAnims] Exporting on {len(workers)} isolated worker(s), {timeout:g}s limit per file.")
+
+    def finish(path, exported, entries=(), outputs=(), seconds=None):
+        nonlocal done
+        done += 1
+        report.processed += 1
+        report.entries.extend(entries)
+        for entry in entries:
+            if entry["phase"] == "verify" and entry["severity"] == "error":
+                record_verify_failure()
+        if exported:
+            report.exported.append(path)
+        record_file("exported" if exported else "failed")
+        batch_entries.update(path, status="done" if exported else "failed", seconds=seconds)
+        batch_timer.finish_file(path, exported, seconds)
+        if journal:
+            journal.outputs = list(outputs)
+            journal.finish_file(path, "done" if exported else "failed")
+        if not report.aborted and report.should_abort():
+            report.aborted = True
+            print("[ManyAnims] Aborting batch: failure limit reached.")
+        update_progress_bar(progress_control, done, batch_timer.status_text(done, len(files)))
+
+    def launch(worker):
+        while worker.process is None and worker.failed_starts < WORKER_START_ATTEMPTS \
+                and pending and not report.aborted:
+            try:
+                worker.start()
+            except OSError as e:
+                worker.failed_starts += 1
+                print(f"[ManyAnims] Could not start worker {worker.number} ({find_mayapy()}): {e}")
+
+    def replace(worker, reason):
+        path, worker.file = worker.file, None
+        worker.kill()
+        if path:
+            report.add(path, "worker", reason)
+            finish(path, False)
+        elif not worker.ready:
+            worker.failed_starts += 1
+            print(f"[ManyAnims] Worker {worker.number} failed to start: {reason}")
+        launch(worker)
+
+    for worker in workers:
+        launch(worker)
+    try:
+        while any(w.process for w in workers) and ((pending and not report.aborted) or any(w.file for w in workers)):
+            try:
+                worker, process, message = events.get(timeout=1.0)
+            except queue.Empty:
+                worker = None
+            if worker and process is worker.process:
+                event = message.get("event")
+                if event == "ready":
+                    worker.ready, worker.deadline, worker.failed_starts = True, None, 0
+                elif event == "error":
+                    print(f"[ManyAnims] Worker {worker.number}: {message.get('message')}")
+                elif event == "result" and message.get("file") == worker.file:
+                    worker.file, worker.deadline = None, None
+                    worker.files_done += 1
+                    finish(message["file"], message["exported"], message["entries"], message["outputs"],
+                           message["seconds"])
+                    if max_files and worker.files_done >= max_files and pending:
+                        worker.stop()
+                        launch(worker)
+                elif event == "exit":
+                    replace(worker, f"worker exited with code {message.get('code')}")
+
+            now = time.monotonic()
+            for worker in workers:
+                if worker.process and worker.deadline and now > worker.deadline:
+                    replace(worker, f"timed out after {timeout:g}s" if worker.file else "timed out")
+                if worker.process and worker.ready and not worker.file and pending and not report.aborted:
+                    path = pending.pop()
+                    if journal:
+                        journal.start_file(path)
+                    batch_entries.update(path, status="running")
+                    worker.assign(path)
+    finally:
+        for worker in workers:
+            worker.stop()
+
+    if pending and not report.aborted:
+        print(f"[ManyAnims] No worker could start; {len(pending)} file(s) not exported.")
+        for path in reversed(pending):
+            report.add(path, "worker", "no worker could start")
+            finish(path, False)
+
+
+def worker_file_processor(method_type):
+    """The loader's per-file export, for a worker set up with setup_job."""
+    if use_cast:
+        import castplugin
+        selection = cmds.ls(selection=True)
+        return lambda path, report: export_cast_file(path, report, method_type, selection, castplugin)
+    if not load_setools_plugin():
+        raise ValueError("SEToolsPlugin could not be imported")
+    return lambda path, report: export_seanim_file(path, report, method_type)
+
+
+def run_worker():
+    """Worker side: set up the job sent on stdin, then export one file per request until told to stop."""
+    global _worker_outputs
+
+    def send(message):
+        sys.stdout.write(WORKER_MESSAGE_PREFIX + json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    try:
+        method = setup_job(json.loads(sys.stdin.readline() or "{}")["job"])
+        process_file = worker_file_processor(method)
+    except Exception as e:
+        send({"event": "error", "message": f"{type(e).__name__}: {e}"})
+        return 2
+    memory = MemoryMonitor(settings.get("housekeeping_every", 50), settings.get("housekeeping_memory_mb", 0))
+    send({"event": "ready", "pid": os.getpid()})
+
+    processed = 0
+    for line in sys.stdin:
+        file_path = json.loads(line).get("file")
+        if not file_path:
+            break
+        processed += 1
+        report = BatchReport("worker", 1)
+        report.processed = processed  # the CAST export clears notetracks on the first file
+        _worker_outputs = []
+        start_output_writer()
+        start_verification()
+        started = time.perf_counter()
+        exported = False
+        try:
+            process_file(file_path, report)
+            exported = True
+        except Exception as e:
+            report.add_exception(file_path, e)
+        report.end_phase()
+        seconds = time.perf_counter() - started
+        for path, error in finish_output_writer():
+            report.add(path, "write", error)
+            exported = False
+        add_verification_results(report)
+        send({"event": "result", "file": file_path, "exported": exported, "seconds": round(seconds, 3),
+              "entries": report.entries, "outputs": _worker_outputs})
+        if memory.sample(file_path):
+            run_housekeeping(memory.scene_curves)
+    _worker_outputs = None
+    return 0
+
+
+# --- Cooperative batches ---
+# Menu batches run one slice at a time from maya.utils.executeDeferred, so Maya
+# redraws and takes input between files. Each slice exports files until
+# "cooperative_slice_ms" has passed (always at least one). The progress window
+# has Pause/Resume and Cancel. Both take effect between files, and Cancel
+# finishes the batch as if it had ended there: outputs are flushed and
+# verified, the scene is reset and the journal keeps the rest for Resume.
+# Headless batches run the same loop straight through.
+
+_active_batch = None
+
+
+def batch_is_running(restore=None):
+    """True (after telling the user) if a batch is running.
+
+    The running batch reads the export path, game, prefix, namespaces, joints and
+    settings for every file, so the commands that change them check this first.
+    `restore` maps checkbox menu items back to the state the batch runs with.
+    """
+    if not _active_batch:
+        return False
+    message = "A batch is running. Cancel it or wait for it to finish first."
+    print("[ManyAnims] " + message)
+    if not headless_mode:
+        for item, checked in (restore or {}).items():
+            if cmds.menuItem(item, exists=True):
+                cmds.menuItem(item, edit=True, checkBox=checked)
+        cmds.confirmDialog(title="Batch Running", message=message, button=["OK"])
+    return True
 
+
+class BatchRun(object):
+    """The per-file loop of one batch, run to the end or a slice at a time."""
+
+    def __init__(self, files, process_file, report, journal, batch_timer, memory, progress_control, game_bo3,
+                 on_finished=None):
+        global _output_tracker
+        self.files = files
+        self.process_file = process_file
+        self.report = report
+        self.journal = journal
+        self.batch_timer = batch_timer
+        self.memory = memory
+        self.progress_control = progress_control
+        self.game_bo3 = game_bo3
+        self.on_finished = on_finished
+        self.index = 0
+        self.paused = False
+        self.closed = False
+        self.ended = False
+        self._scheduled = False
+        _output_tracker = self.outputs = OutputTracker()
+
+    def step(self):
+        """Export the next file. Returns False once the batch has nothing left to do."""
+        report, journal, batch_timer = self.report, self.journal, self.batch_timer
+        if self.index >= len(self.files) or report.aborted or report.cancelled:
+            return False
+        file_path = self.files[self.index]
+        self.index += 1
+
+        batch_timer.start_file()
+        batch_entries.update(file_path, status="running")
+        started = time.perf_counter()
+        report.phase = "import"
+        report.processed += 1
+        if journal:
+            journal.start_file(file_path)
+        self.outputs.begin(file_path)
+        try:
+            self.process_file(file_path, report)
+            report.end_phase()
+            # Counted as exported once its outputs are written, in settle()
+            self.outputs.finish(file_path, {"seconds": time.perf_counter() - started,
+                                            "outputs": list(journal.outputs) if journal else []})
+        except Exception as e:
+            self.outputs.discard(file_path)
+            report.end_phase()
+            report.add_exception(file_path, e)
+            self.file_failed(file_path, time.perf_counter() - started)
+            self.check_abort()
+        self.settle()
+        if report.aborted:
+            return False
+        if self.memory.sample(file_path):
+            run_housekeeping(self.memory.scene_curves)
+        update_progress_bar(self.progress_control, self.index,
+                            batch_timer.status_text(self.index, len(self.files)))
+        refresh_batch_manager()
+        return True
+
+    def file_failed(self, file_path, seconds, outputs=None):
+        record_file("failed")
+        batch_entries.update(file_path, status="failed", seconds=seconds, error=_entry_text(self.report.entries[-1]))
+        self.batch_timer.finish_file(file_path, exported=False, seconds=seconds)
+        if self.journal:
+            self.journal.finish_file(file_path, "failed", outputs)
+
+    def check_abort(self):
+        if self.report.should_abort() and not self.report.aborted:
+            self.report.aborted = True
+            print("[ManyAnims] Aborting batch: failure limit reached.")
+
+    def settle(self):
+        """Record the files whose outputs have all been written, or failed to."""
+        report = self.report
+        for file_path, info, errors in self.outputs.settled():
+            if errors:
+                for output_path, error in errors:
+                    report.add(file_path, "write", f"{os.path.basename(output_path)}: {error}")
+                self.file_failed(file_path, info["seconds"], info["outputs"])
+                self.check_abort()
+                continue
+            report.exported.append(file_path)
+            record_file("exported")
+            batch_entries.update(file_path, status="done", seconds=info["seconds"])
+            self.batch_timer.finish_file(file_path, seconds=info["seconds"])
+            if self.journal:
+                self.journal.finish_file(file_path, "done", info["outputs"])
+
+    def close(self):
+        """Flush outputs, verification, journal and metrics; safe to call twice."""
+        global _output_tracker
+        if self.closed:
+            return
+        self.closed = True
+        report = self.report
+        close_progress_bar()
+        stop_prefetch()
+        if export_bo3 != self.game_bo3:
+            apply_export_game(self.game_bo3)
+        write_errors = finish_output_writer()
+        self.settle()
+        _output_tracker = None
+        for path, error in write_errors:
+            if path not in self.outputs.failed_outputs:
+                report.add(path, "write", error)
+        add_verification_results(report)
+        self.batch_timer.save()
+        finish_journal()
+        close_archives()
+        finish_metrics()
+        report.memory = self.memory.summary()
+        batch_entries.apply_entries(report.entries)
+        refresh_batch_manager(force=True)
+
+    def complete(self):
+        """Write and show the report and run the loader's clean-up. Returns the report."""
+        self.report.write(export_path)
+        self.report.show()
+        if self.on_finished:
+            self.on_finished(self.report)
+        return self.report
+
+    def run(self):
+        try:
+            while self.step():
+                pass
         finally:
-            cmds.window = _original_window
-            update_progress_bar(progress_control, idx)
+            self.close()
+        return self.complete()
+
+    # Cooperative mode
+    def start(self):
+        global _active_batch
+        _active_batch = self
+        self._schedule()
+
+    def _schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            maya.utils.executeDeferred(self._tick)
+
+    def _tick(self):
+        self._scheduled = False
+        if self.ended or self.paused:
+            return  # resume() schedules the next slice
+        slice_end = time.perf_counter() + settings.get("cooperative_slice_ms", 100) / 1000.0
+        try:
+            more = self.step()
+            while more and not self.paused and time.perf_counter() < slice_end:
+                more = self.step()
+        except Exception:
+            traceback.print_exc()
+            more = False
+        if more:
+            if not self.paused:
+                self._schedule()
+            return
+        self._end()
+
+    def _end(self):
+        global _active_batch
+        if self.ended:
+            return
+        self.ended = True
+        _active_batch = None
+        self.close()
+        self.complete()
+
+    def pause(self):
+        self.paused = not self.paused
+        print("[ManyAnims] Batch paused." if self.paused else "[ManyAnims] Batch resumed.")
+        update_batch_controls(self)
+        if not self.paused:
+            self._schedule()
+
+    def cancel(self):
+        self.report.cancelled = True
+        print("[ManyAnims] Cancelling batch after the current file...")
+        if self.paused:
+            self._end()
+
+
+def update_batch_controls(batch):
+    if cmds.control("ManyAnims_pause", exists=True):
+        cmds.button("ManyAnims_pause", edit=True, label="Resume" if batch.paused else "Pause")
+
+
+def pause_active_batch(*args):
+    if _active_batch:
+        _active_batch.pause()
 
-    # --- Close progress bar
-    close_progress_bar()
-    print(f"[ManyAnims]  Processed {len(files_to_process)} CAST animation(s).")
 
-    # --- Reset scene to default
+def cancel_active_batch(*args):
+    if _active_batch:
+        _active_batch.cancel()
+
+
+def cooperative_batches():
+    return not headless_mode and settings.get("cooperative_batch", True)
+
+
+def run_export_batch(files_to_process, method_type, process_file, label, loader, on_finished=None):
+    """Shared batch loop for the CAST and SE loaders.
+
+    `process_file(path, report)` imports and exports one clip, raising on failure,
+    and `on_finished(report)` runs once the batch has ended.
+    Returns the BatchReport, or None if the batch never started or runs cooperatively.
+    """
+    if batch_is_running():
+        return None
+    report = BatchReport(label, len(files_to_process))
+    reset_clip_methods()
+    reset_bulk_importer()
+
     try:
-        castplugin.utilityClearAnimation()
-        print("[ManyAnims] Scene cleared after CAST export.")
+        check_export_targets(get_export_targets())
+    except ValueError as e:
+        print(f"[ManyAnims] Invalid export targets: {e}")
+        if not headless_mode:
+            cmds.confirmDialog(title="Export Targets", message=str(e), button=["OK"])
+        return None
+
+    plan = build_export_plan(files_to_process, method_type, loader, label)
+    if dry_run:
+        print_export_plan(plan)
+        show_plan_result(plan, save_export_plan(plan))
+        return None
+    if active_plan is not None and plan_outputs(plan) != plan_outputs(active_plan):
+        message = "The scene or settings no longer produce the outputs in the saved plan.\nMake a new plan."
+        print("[ManyAnims] " + message.replace("\n", " "))
+        if not headless_mode:
+            cmds.confirmDialog(title="Export Plan", message=message, button=["OK"])
+        return None
+    batch_entries.start(files_to_process, plan, loader, method_type)
+    # The first clip to claim an output keeps it; later ones would overwrite it
+    for collision in plan["collisions"]:
+        report.add(collision["source"], "plan",
+                   f"{os.path.basename(collision['output'])} is already written by "
+                   f"{os.path.basename(collision['first'])}", severity="skipped")
+    colliding = {collision["source"] for collision in plan["collisions"]}
+    files_to_process = [path for path in files_to_process if path not in colliding]
+
+    if not load_codmaya_tools():
+        print("[ManyAnims] CoDMayaTools could not be imported; add its folder to MAYA_SCRIPT_PATH.")
+        if not headless_mode:
+            cmds.confirmDialog(title="CoDMayaTools Missing",
+                               message="CoDMayaTools could not be imported.\nAdd its folder to MAYA_SCRIPT_PATH.",
+                               button=["OK"])
+        return None
+    batch_game_bo3 = export_bo3
+
+    scanned = run_prescan(files_to_process, method_type) if files_to_process else []
+    if not scanned:
+        close_archives()
+        if report.entries:
+            report.show()
+        return None
+    for path in files_to_process:
+        if path not in scanned:
+            error = (anim_header_cache.get(path) or {}).get("error") or "skipped"
+            report.add(path, "prescan", error, severity="skipped")
+
+    journal = start_journal(journal_header(files_to_process, method_type, loader, label))
+    if journal:
+        for entry in report.entries:
+            journal.finish_file(entry["file"], "failed")
+
+    files_to_process, batch_timer = schedule_batch(scanned)
+    memory = MemoryMonitor(settings.get("housekeeping_every", 50), settings.get("housekeeping_memory_mb", 0))
+    start_metrics(report.total)
+    record_file("skipped", len({e["file"] for e in report.entries if e["severity"] == "skipped"}))
+    worker_count = isolated_worker_count()
+    if not worker_count:
+        start_prefetch(files_to_process)
+        start_output_writer()
+        start_verification()
+    cooperative = cooperative_batches()
+    progress_control = create_progress_bar(len(files_to_process), controls=cooperative)
+    batch = BatchRun(files_to_process, process_file, report, journal, batch_timer, memory, progress_control,
+                     batch_game_bo3, on_finished)
+
+    if worker_count:
+        try:
+            run_isolated_batch(files_to_process, method_type, worker_count, report, journal, batch_timer,
+                               progress_control)
+        finally:
+            batch.close()
+        return batch.complete()
+    if cooperative:
+        batch.start()
+        return None
+    return batch.run()
+
+
+# --- Batch manager ---
+# ManyAnims > Batch Manager lists every file of the current or last batch with
+# its status, output, export time and error, and re-runs the failed or ticked
+# files. Only the visible rows exist as Maya controls: a fixed set of
+# BATCH_MANAGER_ROWS rows is relabelled from the filtered, sorted list as the
+# scroll bar moves, so 20,000 files draw as fast as 20. While a batch runs the
+# window refreshes at most every BATCH_MANAGER_REFRESH seconds.
+
+BATCH_MANAGER_WINDOW = "ManyAnims_batch_manager"
+BATCH_MANAGER_ROWS = 25
+BATCH_MANAGER_REFRESH = 0.25
+BATCH_MANAGER_COLUMNS = (24, 250, 64, 250, 60, 330)
+BATCH_MANAGER_FILTERS = ("All", "Problems", "Failed", "Warning", "Running", "Pending", "Done", "Skipped")
+BATCH_MANAGER_SORTS = ("Batch Order", "Name", "Status", "Time", "Output")
+BATCH_STATUS_ORDER = {"failed": 0, "warning": 1, "running": 2, "pending": 3, "skipped": 4, "done": 5}
+
+
+def _entry_text(entry):
+    return f"[{entry['phase']}] {entry['message']}"
+
+
+class BatchEntries(object):
+    """Status, output, time and error of every file in the batch, kept up to date as it runs."""
+
+    def __init__(self):
+        self.files = []
+        self.rows = {}
+        self.sources = {}  # output path -> source, for write errors
+        self.loader = None
+        self.method = None
+        self.rerun = False  # the next batch re-runs some of these files rather than replacing them
+        self.version = 0  # bumped on every change, so the window knows to filter again
+
+    def _row(self, path, status="pending", output=""):
+        return {"file": path, "name": os.path.basename(path), "status": status, "output": output,
+                "seconds": None, "error": ""}
+
+    def start(self, files, plan, loader, method):
+        outputs = {clip["source"]: os.path.basename(clip["outputs"][0]["path"])
+                   for clip in plan["clips"] if clip["outputs"]}
+        if not self.rerun:
+            self.files, self.rows, self.sources = [], {}, {}
+        for clip in plan["clips"]:
+            self.sources.update((output["path"], clip["source"]) for output in clip["outputs"])
+        for path in files:
+            if path not in self.rows:
+                self.files.append(path)
+            self.rows[path] = self._row(path, output=outputs.get(path, ""))
+        self.loader, self.method, self.rerun = loader, method, False
+        self.version += 1
+
+    def update(self, path, **fields):
+        row = self.rows.get(path)
+        if row is not None:
+            row.update(fields)
+            self.version += 1
+
+    def apply_entries(self, entries):
+        """Mark files from report entries: errors fail them, warnings flag exported ones."""
+        for entry in entries:
+            row = self.rows.get(entry["file"]) or self.rows.get(self.sources.get(entry["file"]))
+            if row is None:
+                continue
+            if entry["severity"] == "error":
+                row["status"] = "failed"
+            elif entry["severity"] == "skipped":
+                row["status"] = "skipped"
+            elif row["status"] == "done":
+                row["status"] = "warning"
+            row["error"] = row["error"] or _entry_text(entry)
+        self.version += 1
+
+    def load(self, folder):
+        """Rebuild the list from the journal and report in an export folder. Returns False if there is none."""
+        journal = read_journal(folder) if folder and os.path.isdir(folder) else None
+        if not journal:
+            return False
+        header, files, states = journal
+        self.files, self.rows, self.sources = list(files), {}, {}
+        for path in files:
+            state = states[path]["state"] if states[path] else "pending"
+            outputs = (states[path] or {}).get("outputs") or []
+            self.sources.update((output, path) for output in outputs)
+            row = self.rows[path] = self._row(path, "failed" if state == "in-progress" else state,
+                                              os.path.basename(outputs[0]) if outputs else "")
+            if state == "in-progress":
+                row["error"] = "interrupted"
+        self.loader, self.method = header.get("loader"), header.get("method")
+        try:
+            with open(os.path.join(folder, REPORT_FILE_NAME), "r") as f:
+                self.apply_entries(json.load(f).get("entries", []))
+        except (OSError, ValueError):
+            pass
+        self.version += 1
+        return True
+
+
+batch_entries = BatchEntries()
+_batch_manager = None
+
+
+class BatchManagerWindow(object):
+    """The Batch Manager window: fixed rows showing a slice of the filtered, sorted entries."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.visible = []
+        self.selected = set()
+        self.offset = 0
+        self.rows = []
+        self._version = None
+        self._refreshed = 0.0
+
+    def build(self):
+        if cmds.window(BATCH_MANAGER_WINDOW, exists=True):
+            cmds.deleteUI(BATCH_MANAGER_WINDOW)
+        cmds.window(BATCH_MANAGER_WINDOW, title="ManyAnims Batch Manager", widthHeight=(1010, 640))
+        cmds.columnLayout(adjustableColumn=True, rowSpacing=4)
+
+        cmds.rowLayout(numberOfColumns=6, adjustableColumn=2)
+        cmds.text(label=" Filter:")
+        self.filter_field = cmds.textField(textChangedCommand=lambda *args: self.refresh(force=True))
+        self.status_menu = cmds.optionMenu(label="Status", changeCommand=lambda *args: self.refresh(force=True))
+        for label in BATCH_MANAGER_FILTERS:
+            cmds.menuItem(label=label)
+        self.sort_menu = cmds.optionMenu(label="Sort", changeCommand=lambda *args: self.refresh(force=True))
+        for label in BATCH_MANAGER_SORTS:
+            cmds.menuItem(label=label)
+        self.descending = cmds.checkBox(label="Descending", changeCommand=lambda *args: self.refresh(force=True))
+        cmds.button(label="Refresh", command=lambda *args: self.refresh(force=True))
+        cmds.setParent("..")
+        self.summary = cmds.text(label="", align="left")
+
+        # Rows on the left, the scroll bar that moves them on the right
+        form = cmds.formLayout()
+        rows_column = cmds.columnLayout(adjustableColumn=True)
+        cmds.rowLayout(numberOfColumns=6, columnWidth6=BATCH_MANAGER_COLUMNS)
+        cmds.text(label="")
+        for label in ("File", "Status", "Output", "Time", "Error"):
+            cmds.text(label=label, align="left", font="boldLabelFont")
+        cmds.setParent("..")
+        for index in range(BATCH_MANAGER_ROWS):
+            cmds.rowLayout(numberOfColumns=6, columnWidth6=BATCH_MANAGER_COLUMNS)
+            check = cmds.checkBox(label="", changeCommand=lambda value, i=index: self.on_check(i, value))
+            self.rows.append((check, [cmds.text(label="", align="left") for _ in range(5)]))
+            cmds.setParent("..")
+        cmds.setParent("..")
+        self.scroll = cmds.intScrollBar(horizontal=False, minValue=0, maxValue=1, value=0, step=1,
+                                        largeStep=BATCH_MANAGER_ROWS, changeCommand=self.on_scroll,
+                                        dragCommand=self.on_scroll)
+        cmds.formLayout(form, edit=True,
+            attachForm=[(rows_column, 'top', 0), (rows_column, 'left', 0), (rows_column, 'bottom', 0),
+                        (self.scroll, 'top', 0), (self.scroll, 'right', 0), (self.scroll, 'bottom', 0)],
+            attachControl=[(rows_column, 'right', 2, self.scroll)]
+        )
+        cmds.setParent("..")
+
+        cmds.rowLayout(numberOfColumns=4)
+        cmds.button(label="Re-run Failed", command=self.rerun_failed)
+        cmds.button(label="Re-run Selected", command=self.rerun_selected)
+        cmds.button(label="Select Shown", command=self.select_shown)
+        cmds.button(label="Clear Selection", command=self.clear_selection)
+        cmds.setParent("..")
+        cmds.showWindow(BATCH_MANAGER_WINDOW)
+        self.refresh(force=True)
+
+    def filtered(self):
+        """Paths passing the filter and status menu, in the chosen order."""
+        rows = self.entries.rows
+        paths = self.entries.files
+        status = cmds.optionMenu(self.status_menu, query=True, value=True).lower()
+        if status == "problems":
+            paths = [p for p in paths if rows[p]["status"] in ("failed", "warning")]
+        elif status != "all":
+            paths = [p for p in paths if rows[p]["status"] == status]
+
+        text = (cmds.textField(self.filter_field, query=True, text=True) or "").strip().lower()
+        if text:
+            pattern = text if "*" in text or "?" in text else f"*{text}*"
+            paths = [p for p in paths if fnmatch.fnmatchcase(rows[p]["name"].lower(), pattern)
+                     or fnmatch.fnmatchcase(rows[p]["error"].lower(), pattern)]
+
+        key = {
+            "Name": lambda p: rows[p]["name"].lower(),
+            "Status": lambda p: BATCH_STATUS_ORDER.get(rows[p]["status"], len(BATCH_STATUS_ORDER)),
+            "Time": lambda p: rows[p]["seconds"] or 0.0,
+            "Output": lambda p: rows[p]["output"].lower(),
+        }.get(cmds.optionMenu(self.sort_menu, query=True, value=True))
+        descending = cmds.checkBox(self.descending, query=True, value=True)
+        if key:
+            return sorted(paths, key=key, reverse=descending)
+        return paths[::-1] if descending else list(paths)
+
+    def refresh(self, force=False):
+        """Filter again if anything changed and redraw. Returns False once the window is closed."""
+        if not cmds.window(BATCH_MANAGER_WINDOW, exists=True):
+            return False
+        now = time.perf_counter()
+        if not force and now - self._refreshed < BATCH_MANAGER_REFRESH:
+            return True
+        self._refreshed = now
+        if force or self._version != self.entries.version:
+            self._version = self.entries.version
+            self.visible = self.filtered()
+
+        top = max(0, len(self.visible) - BATCH_MANAGER_ROWS)
+        self.offset = min(self.offset, top)
+        cmds.intScrollBar(self.scroll, edit=True, maxValue=max(top, 1), value=self.offset, enable=top > 0)
+        counts = {}
+        for row in self.entries.rows.values():
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+        cmds.text(self.summary, edit=True,
+                  label=f" {len(self.entries.files)} file(s): "
+                        + ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+                        + f". Showing {len(self.visible)}, {len(self.selected)} selected.")
+        self.draw()
+        return True
+
+    def draw(self):
+        for i, (check, texts) in enumerate(self.rows):
+            index = self.offset + i
+            if index < len(self.visible):
+                row = self.entries.rows[self.visible[index]]
+                seconds = "" if row["seconds"] is None else f"{row['seconds']:.1f}s"
+                values = (row["name"], row["status"], row["output"], seconds, row["error"])
+                cmds.checkBox(check, edit=True, visible=True, value=row["file"] in self.selected)
+            else:
+                values = ("", "", "", "", "")
+                cmds.checkBox(check, edit=True, visible=False)
+            for text, value in zip(texts, values):
+                cmds.text(text, edit=True, label=value, annotation=value)
+
+    def on_scroll(self, *args):
+        self.offset = cmds.intScrollBar(self.scroll, query=True, value=True)
+        self.draw()
+
+    def on_check(self, index, value):
+        if self.offset + index >= len(self.visible):
+            return
+        path = self.visible[self.offset + index]
+        if value:
+            self.selected.add(path)
+        else:
+            self.selected.discard(path)
+
+    def select_shown(self, *args):
+        self.selected.update(self.visible)
+        self.refresh(force=True)
+
+    def clear_selection(self, *args):
+        self.selected.clear()
+        self.refresh(force=True)
+
+    def rerun_failed(self, *args):
+        rerun_batch_files([p for p in self.entries.files if self.entries.rows[p]["status"] == "failed"])
+
+    def rerun_selected(self, *args):
+        rerun_batch_files([p for p in self.entries.files if p in self.selected])
+
+
+def rerun_batch_files(files):
+    """Export some files of the listed batch again, with the batch's loader and method."""
+    if batch_is_running():
+        return None
+    if not files:
+        cmds.confirmDialog(title="Batch Manager", message="No files to re-run.", button=["OK"])
+        return None
+    if not export_path:
+        cmds.confirmDialog(title="Batch Manager", message="Please set an Export Path first.", button=["OK"])
+        return None
+    print(f"[ManyAnims] Re-running {len(files)} file(s) from the Batch Manager.")
+    batch_entries.rerun = True
+    loader = load_cast_from_path if batch_entries.loader == "cast" else load_seanim_from_path
+    try:
+        return loader(anim_path, method_type=batch_entries.method or current_export_method(), files=files)
+    finally:
+        batch_entries.rerun = False
+
+
+def refresh_batch_manager(force=False):
+    global _batch_manager
+    if _batch_manager and not _batch_manager.refresh(force):
+        _batch_manager = None
+
+
+def open_batch_manager(*args):
+    global _batch_manager
+    if not batch_entries.files and not batch_entries.load(export_path or settings.get("export_location", "")):
+        cmds.confirmDialog(title="Batch Manager", message="No batch to show yet.\nRun an export first.",
+                           button=["OK"])
+        return
+    _batch_manager = BatchManagerWindow(batch_entries)
+    _batch_manager.build()
+
+
+# --- Load CAST files ---
+# Converted rigs whose CAST notetracks are left in place
+CAST_RIG_JOINT_GROUPS = {"tx:Joints", "iw2:Joints", "iw3:Joints"}
+
+
+def find_cast_rig_groups():
+    return CAST_RIG_JOINT_GROUPS.intersection(cmds.ls(type='transform') or [])
+
+
+def clear_cast_notetracks():
+    """ClearAndRemoveCastNotetracks, unless the scene holds one of the converted rig joint groups."""
+    # Look for any of the exact groups in the scene
+    found_rig_groups = find_cast_rig_groups()
+
+    if found_rig_groups:
+        print(f"[ManyAnims]  Found special rig joint group(s): {list(found_rig_groups)} → Skipping ClearAndRemoveCastNotetracks()")
+        return
+    try:
+        CoDMayaTools.ClearAndRemoveCastNotetracks("xanim")
+        print("[ManyAnims]  Cleared and removed CAST notetracks.")
     except Exception as e:
-        print(f"[ManyAnims]  Scene reset failed after CAST export: {e}")
+        print(f"[ManyAnims]  Failed to clear CAST notetracks: {e}")
+
+
+def export_cast_file(cast_file_path, report, method_type, cached_manual_selection, castplugin):
+    """Import one CAST file and export it; raises on failure."""
+    cast_file = os.path.basename(cast_file_path)
+    method_type = resolve_clip_method(cast_file_path, method_type)
+    print(f"[ManyAnims] Loading CAST animation: {cast_file_path}")
+
+    # Notes are no longer read from the scene, and every export clears them afterwards
+    if report.processed == 1 or not settings.get("native_notetracks", False):
+        clear_cast_notetracks()
+
+    local_cast_path = take_prefetched(cast_file_path)
+    # The bulk importer rekeys the existing curves, so they aren't cleared first
+    bulk_imported = import_clip_bulk(local_cast_path, cast_file_path)
+    if not bulk_imported:
+        # --- Clear animation keys
+        joints = cmds.ls(type="joint")
+        if joints:
+            cmds.cutKey(joints, time=(), option="keys")
+        castplugin.importCast(local_cast_path)
+    release_prefetched(local_cast_path)
+
+    # --- Joint selection
+    report.phase = "select"
+    if method_type == "manual":
+
+        current_selection = cached_manual_selection
 
-    # --- Reset mode checkboxes
-    cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
-    cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
-    print("[ManyAnims] Reset Treyarch/IW-SH checkboxes after CAST export.")
-    reset_export_selected_mode()
+        if not current_selection:
+            raise ExportError("select", "No joints selected for manual export!")
+
+        print(f"[ManyAnims] CAST Manual Mode → Using current selection: {current_selection}")
+        cmds.select(clear=True)
+        for j in current_selection:
+            if cmds.objExists(j):
+                cmds.select(j, add=True)
+
+        # --- Export fields and notetracks (scene notes are only read if CastNotetracks exists)
+        report.phase = "export"
+        export_clip_targets(cast_file_path, export_path,
+                            read_scene_notes=cmds.objExists("CastNotetracks"))
+    else:
+        report.phase = "export"
+        export_clip_rigs(cast_file_path, export_path, method_type,
+                         read_scene_notes=cmds.objExists("CastNotetracks"))
+    if not bulk_imported:
+        castplugin.utilityClearAnimation()
+
+    # -----------------------------
+    # Manual Mode Reset Per Anim
+    # -----------------------------
+    if method_type == "manual" and not bulk_imported:
+        try:
+            castplugin.utilityClearAnimation()
+            print("[ManyAnims] Manual mode → resetting scene per anim (CAST)")
+        except Exception as e:
+            print(f"[ManyAnims] Manual reset failed: {e}")
+
+    # --- check for Joint Groups before clearing notetracks ---
+    clear_cast_notetracks()
+
+
+def load_cast_from_path(anim_path, method_type=None, files=None):
+    try:
+        import castplugin
+    except ImportError:
+        cmds.warning(" castplugin not found. Cannot import CAST files.")
+        return None
+
+    # Collect all .cast files (or use selected), including those inside archives
+    files_to_process = expand_anim_inputs(files or selected_anim_files or folder_inputs(anim_path), ".cast")
+    if not files_to_process:
+        cmds.confirmDialog(title="No Animations", message="No .cast files to process.", button=["OK"])
+        return
+
+    method_type = method_type or current_export_method()
+
+    # --- Cache original manual selection BEFORE CAST modifies it
+    cached_manual_selection = cmds.ls(selection=True)
+
+    def finish_cast_batch(report):
+        print(f"[ManyAnims]  Processed {len(report.exported)} CAST animation(s).")
+
+        # --- Reset scene to default
+        try:
+            castplugin.utilityClearAnimation()
+            print("[ManyAnims] Scene cleared after CAST export.")
+        except Exception as e:
+            print(f"[ManyAnims]  Scene reset failed after CAST export: {e}")
+
+        # --- Reset mode checkboxes
+        if not headless_mode:
+            cmds.menuItem(treyarch_checkbox, edit=True, checkBox=False)
+            cmds.menuItem(iw_sh_checkbox, edit=True, checkBox=False)
+            cmds.menuItem(auto_checkbox, edit=True, checkBox=False)
+            print("[ManyAnims] Reset Treyarch/IW-SH checkboxes after CAST export.")
+        reset_export_selected_mode()
+
+    return run_export_batch(
+        files_to_process, method_type,
+        lambda path, report: export_cast_file(path, report, method_type, cached_manual_selection, castplugin),
+        "CAST export", "cast", on_finished=finish_cast_batch)
 
 
 def reset_export_selected_mode():
@@ -1164,7 +5570,7 @@ def reset_export_selected_mode():
 
     
 def create_menu():
-    global treyarch_checkbox, iw_sh_checkbox
+    global treyarch_checkbox, iw_sh_checkbox, auto_checkbox
     global select_normal_joints_button, select_ads_joints_button
 
     if cmds.menu("manyAnimsMenu", exists=True):
@@ -1173,10 +5579,16 @@ def create_menu():
     cmds.menu("manyAnimsMenu", label="ManyAnims", parent="MayaWindow")
     cmds.menuItem(divider=True)
     cmds.menuItem(label="Import", command=select_anim_files_dialog)
+    cmds.menuItem(label="Select From Library...", command=select_from_library)
     cmds.menuItem(label="Export", command=set_export_path)
+    cmds.menuItem(label="Resume Last Batch", command=resume_last_batch)
+    cmds.menuItem(label="Batch Manager...", command=open_batch_manager)
+    cmds.menuItem(label="Dry Run (Save Plan)", command=dry_run_export)
+    cmds.menuItem(label="Run Saved Plan...", command=run_saved_plan)
     cmds.menuItem(divider=True)
     treyarch_checkbox = cmds.menuItem(label="Export Treyarch", checkBox=False, command=on_treyarch_checked)
     iw_sh_checkbox = cmds.menuItem(label="Export IW/SH", checkBox=False, command=on_iw_sh_checked)
+    auto_checkbox = cmds.menuItem(label="Export Auto (Treyarch / IW/SH per clip)", checkBox=False, command=on_auto_checked)
     global export_selected_menu_item
 
     export_selected_menu_item = cmds.menuItem(
@@ -1193,6 +5605,7 @@ def create_menu():
     cmds.menuItem(subMenu=True, label="Settings", tearOff=False)
     cmds.menuItem(label="Set Game Prefix...", command=set_game_prefix)
     cmds.menuItem(label="Set Namespace...", command=open_namespace_dialog)
+    cmds.menuItem(label="Set Rig Namespaces...", command=set_export_namespaces)
     cmds.menuItem(divider=True)
     cmds.menuItem("cod4ExportMenuItem", label="Export .xanim_export", checkBox=export_cod4, command=toggle_cod4_export)
     cmds.menuItem("bo3ExportMenuItem", label="Export .xanim_bin", checkBox=export_bo3, command=toggle_bo3_export)
@@ -1207,6 +5620,16 @@ def create_menu():
                 label="Anim Auto Rename",
                 checkBox=use_name_remap,
                 command=toggle_name_remap)
+    cmds.menuItem("prescanMenuItem",
+                label="Prescan Before Export",
+                checkBox=prescan_enabled,
+                command=toggle_prescan)
+    cmds.menuItem("failFastMenuItem",
+                label="Stop On First Error",
+                checkBox=settings.get("fail_fast", False),
+                command=toggle_fail_fast)
+    cmds.menuItem(label="Set Failure Limit...", command=set_failure_limit)
+    cmds.menuItem(label="Set Export Targets...", command=set_export_targets)
 
     cmds.setParent("manyAnimsMenu", menu=True)
     cmds.menuItem(label="About", command=show_about_dialog)
@@ -1215,4 +5638,521 @@ def create_menu():
     # --- Sync UI with saved settings on first load ---
     load_settings()
 
-create_menu()
\ No newline at end of file
+# --- Headless batch (mayapy) ---
+# mayapy -m ManyAnims batch job.json
+#
+# A job file opens a rig scene, applies the export settings and runs the CAST or
+# SE loader without the ManyAnims menu. The exit code is 0 when every file
+# exported, 1 when some failed and 2 when the job itself couldn't run.
+#
+# {
+#     "scene": "D:/rigs/vm_rig.mb",
+#     "namespace": "sloth",
+#     "namespaces": "auto",             # optional: several rigs, a list or "auto"
+#     "loader": "cast",                 # or "se"
+#     "method": "iw/sh",                # "treyarch", "iw/sh", "auto" (per clip) or "manual" + "joints"
+#     "game": "cod4",                   # "cod4" -> .xanim_export, "bo3" -> .xanim_bin
+#     "prefix": "t6",
+#     "remap": true,
+#     "targets": [...],                 # optional, see "Export targets"
+#     "import": "D:/anims/ak47",        # folder, or "files": [...]
+#     "export": "D:/export/ak47",
+#     "settings": {"max_failures": 20}  # any other ManyAnims setting
+# }
+
+JOB_GAMES = {"cod4": False, "xanim_export": False, "bo3": True, "xanim_bin": True}
+
+headless_mode = False
+
+
+class HeadlessUI(object):
+    """In-memory stand-in for the Maya UI commands CoDMayaTools drives its exporter through.
+
+    mayapy has no UI, but CoDMayaTools reads every export option from its XAnim
+    window's controls. While installed, window/control commands store and return
+    values by control name instead.
+    """
+
+    COMMANDS = ("window", "showWindow", "deleteUI", "control", "textField", "intField", "floatField",
+                "checkBox", "optionMenu", "menuItem", "menu", "textScrollList", "progressBar",
+                "progressWindow", "columnLayout", "rowLayout", "rowColumnLayout", "formLayout",
+                "frameLayout", "scrollLayout", "tabLayout", "text", "button", "separator", "setParent",
+                "confirmDialog", "promptDialog", "windowPref", "refresh", "lsUI")
+    FLAG_ALIASES = {"q": "query", "e": "edit", "ex": "exists", "tx": "text", "v": "value",
+                    "sl": "select", "ai": "allItems", "a": "append", "ra": "removeAll", "l": "label"}
+    QUERY_DEFAULTS = {"text": "", "value": 0, "select": 1, "allItems": None, "label": ""}
+
+    def __init__(self):
+        self.controls = {}
+        self._originals = {}
+        self._counter = 0
+
+    def install(self):
+        for command in self.COMMANDS:
+            self._originals[command] = getattr(cmds, command, None)
+            setattr(cmds, command, self._make(command))
+
+    def uninstall(self):
+        for command, original in self._originals.items():
+            if original is None:
+                delattr(cmds, command)
+            else:
+                setattr(cmds, command, original)
+        self._originals = {}
+
+    def _make(self, command):
+        def ui(*args, **kwargs):
+            flags = {self.FLAG_ALIASES.get(k, k): v for k, v in kwargs.items()}
+            name = args[0] if args and isinstance(args[0], str) else None
+
+            if command in ("confirmDialog", "promptDialog"):
+                if flags.get("query"):
+                    return ""
+                return flags.get("defaultButton") or (flags.get("button") or ["OK"])[0]
+            if command in ("refresh", "showWindow", "setParent", "windowPref", "lsUI"):
+                return [] if command == "lsUI" else None
+            if command == "deleteUI":
+                for n in args:
+                    self.controls.pop(n, None)
+                return None
+            if flags.get("exists"):
+                return name in self.controls
+
+            if flags.get("query"):
+                control = self.controls.get(name, {})
+                for key in flags:
+                    if key != "query":
+                        if key == "allItems":
+                            return list(control.get("items", [])) or None
+                        return control.get(key, self.QUERY_DEFAULTS.get(key))
+                return None
+
+            if flags.get("edit"):
+                control = self.controls.setdefault(name, {})
+                for key, value in flags.items():
+                    if key == "append":
+                        control.setdefault("items", []).extend(value if isinstance(value, (list, tuple)) else [value])
+                    elif key == "removeAll":
+                        control["items"] = []
+                    elif key != "edit":
+                        control[key] = value
+                return None
+
+            if not name:
+                self._counter += 1
+                name = f"{command}{self._counter}"
+            self.controls[name] = dict(flags)
+            return name
+        return ui
+
+
+def get_job_value(job, key, default=None):
+    value = job.get(key, default)
+    return default if value is None else value
+
+
+def load_headless_plugins(loader):
+    """Load castplugin / SEToolsPlugin in mayapy and make their modules importable."""
+    plugin = "castplugin" if loader == "cast" else "SEToolsPlugin"
+    try:
+        if not cmds.pluginInfo(plugin, query=True, loaded=True):
+            cmds.loadPlugin(plugin, quiet=True)
+        plugin_dir = os.path.dirname(cmds.pluginInfo(plugin, query=True, path=True))
+        if plugin_dir not in sys.path:
+            sys.path.append(plugin_dir)
+    except Exception as e:
+        print(f"[ManyAnims] Could not load {plugin}: {e}")
+    if loader == "se":
+        load_setools_plugin()
+
+
+def read_job(job_path):
+    with open(job_path, "r") as f:
+        return json.load(f)
+
+
+def setup_job(job):
+    """Apply a job's scene and settings to this session. Returns the method; raises ValueError if invalid."""
+    global anim_path, export_path, selected_anim_files, default_namespace, game_prefix
+    global use_name_remap, use_cast, use_se_mode, export_selected_only, active_job
+    import sqlite3
+
+    active_job = job
+    load_settings()
+    settings.update(get_job_value(job, "settings", {}))
+
+    loader = get_job_value(job, "loader", "cast").lower()
+    method = get_job_value(job, "method", "iw/sh").lower()
+    game = get_job_value(job, "game", "cod4").lower()
+    export_path = get_job_value(job, "export") or settings.get("export_location", "")
+    anim_path = get_job_value(job, "import") or settings.get("import_location", "")
+    selected_anim_files = list(get_job_value(job, "files", []))
+
+    problems = []
+    if loader not in ("cast", "se"):
+        problems.append(f"unknown loader '{loader}'")
+    if method not in ("treyarch", "iw/sh", "auto", "manual"):
+        problems.append(f"unknown method '{method}'")
+    if game not in JOB_GAMES:
+        problems.append(f"unknown game '{game}'")
+    if not export_path:
+        problems.append("no export folder")
+    if not anim_path and not selected_anim_files:
+        problems.append("no import folder or files")
+    if method == "manual" and not get_job_value(job, "joints"):
+        problems.append("manual method needs \"joints\"")
+    if get_job_value(job, "namespaces"):
+        settings["export_namespaces"] = get_job_value(job, "namespaces")
+    if get_job_value(job, "targets"):
+        settings["export_targets"] = get_job_value(job, "targets")
+    try:
+        check_export_targets(get_export_targets())
+    except ValueError as e:
+        problems.append(str(e))
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    default_namespace = get_job_value(job, "namespace", settings.get("default_namespace", ""))
+    game_prefix = get_job_value(job, "prefix", "").strip().lower()
+    use_name_remap = bool(get_job_value(job, "remap", False))
+    use_cast = loader == "cast"
+    use_se_mode = not use_cast
+    anim_path = anim_path or os.path.dirname(split_archive_path(selected_anim_files[0])[0])
+    query = get_job_value(job, "query")
+    if query:
+        try:
+            index_library(anim_path)
+            selected_anim_files = query_library(query, anim_path)
+        except (OSError, sqlite3.Error) as e:
+            raise ValueError(f"library query failed: {e}")
+        if not selected_anim_files:
+            raise ValueError(f"no clips in {anim_path} match the query '{query}'")
+        print(f"[ManyAnims] Library query '{query}' matched {len(selected_anim_files)} file(s).")
+    os.makedirs(export_path, exist_ok=True)
+
+    scene = get_job_value(job, "scene")
+    if scene:
+        try:
+            cmds.file(scene, open=True, force=True)
+        except Exception as e:
+            raise ValueError(f"could not open scene {scene}: {e}")
+        print(f"[ManyAnims] Opened rig scene: {scene}")
+
+    load_headless_plugins(loader)
+    if not load_codmaya_tools():
+        raise ValueError("CoDMayaTools could not be imported")
+    apply_export_game(JOB_GAMES[game])
+
+    if method == "manual":
+        cmds.select(get_job_value(job, "joints"), hierarchy=True)
+        export_selected_only = True
+    return method
+
+
+def run_loader(method, files=None):
+    """Run the CAST or SE loader for the configured session."""
+    if use_cast:
+        return load_cast_from_path(anim_path, method_type=method, files=files)
+    return load_seanim_from_path(anim_path, method_type=method, files=files)
+
+
+def run_job(job_path, plan_path=None, isolate=None):
+    """Run one headless batch described by a job file (or a plan saved for it). Returns the process exit code."""
+    try:
+        method = setup_job(read_job(job_path))
+    except Exception as e:
+        print(f"[ManyAnims] Invalid job {job_path}: {e}")
+        return 2
+    if isolate is not None:
+        settings["isolate_workers"] = isolate
+
+    if plan_path:
+        try:
+            report = execute_plan(plan_path)
+        except (OSError, ValueError) as e:
+            print(f"[ManyAnims] Could not run plan {plan_path}: {e}")
+            return 2
+    else:
+        report = run_loader(method)
+    if report is None:
+        return 1
+    return 1 if report.aborted or report.failed_files() or not report.exported else 0
+
+
+def run_plan_job(job_path, plan_path=None):
+    """Save a job's export plan without exporting. Exit code 1 if outputs collide."""
+    try:
+        method = setup_job(read_job(job_path))
+    except Exception as e:
+        print(f"[ManyAnims] Invalid job {job_path}: {e}")
+        return 2
+
+    files = expand_anim_inputs(selected_anim_files or folder_inputs(anim_path), ".cast" if use_cast else ".seanim")
+    plan = build_export_plan(files, method, "cast" if use_cast else "se", "CAST export" if use_cast else "SEAnim export")
+    print_export_plan(plan)
+    save_export_plan(plan, plan_path)
+    return 1 if plan["collisions"] else 0
+
+
+def run_resume(job_path, isolate=None):
+    """Finish the journaled batch in a job's export folder. Returns the process exit code."""
+    try:
+        setup_job(read_job(job_path))
+    except Exception as e:
+        print(f"[ManyAnims] Invalid job {job_path}: {e}")
+        return 2
+    if isolate is not None:
+        settings["isolate_workers"] = isolate
+
+    if not read_journal(export_path):
+        print(f"[ManyAnims] No batch journal in {export_path}.")
+        return 2
+    report = resume_batch(export_path)
+    if report is None:
+        return 0
+    return 1 if report.aborted or report.failed_files() or not report.exported else 0
+
+
+def run_benchmark(job_path, limit=10):
+    """Compare plugin and bulk import times on the first `limit` clips of a job. Returns the process exit code."""
+    try:
+        setup_job(read_job(job_path))
+    except Exception as e:
+        print(f"[ManyAnims] Invalid job {job_path}: {e}")
+        return 2
+
+    extension = ".cast" if use_cast else ".seanim"
+    files = expand_anim_inputs(selected_anim_files or folder_inputs(anim_path), extension)[:limit]
+    if use_cast:
+        import castplugin
+        importer = castplugin.importCast
+    else:
+        importer = lambda path: SEToolsPlugin.__load_seanim__(path, scene_time=False, blend_anim=False)
+
+    def plugin_import(path):
+        local_path = take_prefetched(path)
+        try:
+            importer(local_path)
+        finally:
+            release_prefetched(local_path)
+
+    try:
+        benchmark_bulk_import(files, plugin_import)
+    finally:
+        close_archives()
+    return 0
+
+
+# --- Watch folder ---
+# mayapy -m ManyAnims watch job.json
+#
+# Keeps the rig loaded and exports .cast/.seanim files as they land in the
+# import folder (the job's "import", or settings["import_location"]). A file is
+# picked up once its size and mtime have stopped changing for
+# watch_settle_seconds; a changed file is exported again. What has been
+# exported is remembered in the export folder, so a restart carries on.
+
+WATCH_STATE_FILE_NAME = "manyanims_watch.json"
+
+
+class FolderWatcher(object):
+    """Polls a folder and reports files that are new or changed and have finished writing."""
+
+    def __init__(self, folder, extension, settle_seconds, state_path):
+        self.folder = folder
+        self.extension = extension
+        self.settle_seconds = settle_seconds
+        self.state_path = state_path
+        self.done = {}     # path -> [mtime, size] when it was last exported
+        self.pending = {}  # path -> ((mtime, size), time first seen with that signature)
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, "r") as f:
+                    self.done = json.load(f)
+            except Exception as e:
+                print("[ManyAnims] Failed to load watch state:", e)
+
+    def scan(self):
+        found = {}
+        try:
+            for entry in os.scandir(self.folder):
+                if entry.is_file() and entry.name.lower().endswith(self.extension):
+                    stat = entry.stat()
+                    found[entry.path] = [stat.st_mtime, stat.st_size]
+        except OSError as e:
+            print(f"[ManyAnims] Could not scan {self.folder}: {e}")
+        return found
+
+    def poll(self):
+        """Files that are ready to export now."""
+        now = time.time()
+        ready = []
+        found = self.scan()
+        for path, signature in found.items():
+            if self.done.get(path) == signature:
+                continue
+            seen = self.pending.get(path)
+            if not seen or seen[0] != signature:
+                self.pending[path] = (signature, now)
+                continue
+            if now - seen[1] >= self.settle_seconds and self._readable(path):
+                ready.append(path)
+        for path in list(self.pending):
+            if path not in found:
+                del self.pending[path]
+        return sorted(ready)
+
+    def _readable(self, path):
+        # On Windows a file still being copied can't be opened for reading yet
+        try:
+            with open(path, "rb") as f:
+                f.read(1)
+            return True
+        except OSError:
+            return False
+
+    def mark_done(self, paths):
+        for path in paths:
+            signature = self.pending.pop(path, (None,))[0]
+            if signature:
+                self.done[path] = signature
+        try:
+            with open(self.state_path, "w") as f:
+                json.dump(self.done, f, indent=4)
+        except Exception as e:
+            print("[ManyAnims] Failed to save watch state:", e)
+
+
+def run_watch(job_path):
+    """Export new or changed clips from the import folder until interrupted. Returns the exit code."""
+    try:
+        method = setup_job(read_job(job_path))
+    except Exception as e:
+        print(f"[ManyAnims] Invalid job {job_path}: {e}")
+        return 2
+
+    interval = settings.get("watch_interval", 2.0)
+    watcher = FolderWatcher(anim_path, ".cast" if use_cast else ".seanim",
+                            settings.get("watch_settle_seconds", 3.0),
+                            os.path.join(export_path, WATCH_STATE_FILE_NAME))
+    print(f"[ManyAnims] Watching {anim_path} → {export_path} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            ready = watcher.poll()
+            if ready:
+                print(f"[ManyAnims] {len(ready)} new or changed file(s) ready.")
+                run_loader(method, files=ready)
+                # Failed files are marked too; they are retried once they change again
+                watcher.mark_done(ready)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("[ManyAnims] Watch stopped.")
+    return 0
+
+
+def start_maya_standalone():
+    """Start Maya in this process for the mayapy commands."""
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+
+def main(argv):
+    """Command-line entry point: mayapy -m ManyAnims batch|plan|watch|resume|benchmark job.json, or convert|extract|index|query
+
+    "worker" is the isolated export worker that batch --isolate starts.
+    """
+    global headless_mode
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="mayapy -m ManyAnims", description="ManyAnims batch animation exporter")
+    commands = parser.add_subparsers(dest="command")
+    batch_parser = commands.add_parser("batch", help="run a headless export batch from a job file")
+    batch_parser.add_argument("job", help="path to the job .json file")
+    batch_parser.add_argument("--plan", help="run this saved export plan instead of the job's files")
+    batch_parser.add_argument("--isolate", type=int, metavar="N",
+                              help="export in N supervised mayapy worker processes with a per-file timeout")
+    plan_parser = commands.add_parser("plan", help="save the export plan for a job without exporting")
+    plan_parser.add_argument("job", help="path to the job .json file")
+    plan_parser.add_argument("--out", help=f"where to save the plan (default: {PLAN_FILE_NAME} in the export folder)")
+    watch_parser = commands.add_parser("watch", help="export new or changed files in the import folder as they land")
+    watch_parser.add_argument("job", help="path to the job .json file")
+    resume_parser = commands.add_parser("resume", help="finish a crashed batch from the journal in its export folder")
+    resume_parser.add_argument("job", help="path to the job .json file")
+    resume_parser.add_argument("--isolate", type=int, metavar="N", help="export in N worker processes")
+    benchmark_parser = commands.add_parser("benchmark", help="time the plugin importer against the bulk importer")
+    benchmark_parser.add_argument("job", help="path to the job .json file")
+    benchmark_parser.add_argument("--limit", type=int, default=10, help="number of clips to import (default 10)")
+    convert_parser = commands.add_parser("convert", help="convert folders between .seanim and .cast (no Maya needed)")
+    convert_parser.add_argument("source", help="folder of .seanim / .cast files (searched recursively)")
+    convert_parser.add_argument("output", help="folder for the converted files")
+    convert_parser.add_argument("--to", choices=sorted(CONVERT_EXTENSIONS), help="target format (default: the other one)")
+    convert_parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: one per core)")
+    extract_parser = commands.add_parser("extract", help="extract entries from an output bundle (no Maya needed)")
+    extract_parser.add_argument("bundle", help="the .xanim_pack file")
+    extract_parser.add_argument("patterns", nargs="*", help="entry names or wildcards (default: every entry)")
+    extract_parser.add_argument("--out", help="folder to extract to; without it the matching entries are listed")
+    index_parser = commands.add_parser("index", help="index a clip library folder for queries (no Maya needed)")
+    index_parser.add_argument("folder", help="library folder (searched recursively, archives included)")
+    index_parser.add_argument("--db", help=f"index database (default: {LIBRARY_FILE_NAME} in the settings folder)")
+    query_parser = commands.add_parser("query", help="list indexed clips matching a query (no Maya needed)")
+    query_parser.add_argument("query", help='e.g. "category=ads weapon=ak47 frames>60"')
+    query_parser.add_argument("--root", help="only clips indexed from this folder")
+    query_parser.add_argument("--db", help="index database")
+    commands.add_parser("worker", help="isolated export worker (started by batch --isolate; reads stdin)")
+
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+
+    if args.command == "convert":
+        _results, errors = convert_folder(args.source, args.output, args.to, args.jobs)
+        return 1 if errors else 0
+    if args.command == "extract":
+        entries, errors = extract_bundle(args.bundle, args.out, args.patterns)
+        return 1 if errors or not entries else 0
+    if args.command == "index":
+        index_library(args.folder, open_library(args.db))
+        return 0
+    if args.command == "query":
+        try:
+            paths = query_library(args.query, args.root, open_library(args.db))
+        except ValueError as e:
+            print(f"[ManyAnims] {e}")
+            return 2
+        for path in paths:
+            print(path)
+        print(f"[ManyAnims] {len(paths)} matching clip(s).")
+        return 0 if paths else 1
+    if cmds is None:
+        print(f"[ManyAnims] '{args.command}' needs Maya; run it with mayapy.")
+        return 2
+    start_maya_standalone()
+
+    headless_mode = True
+    ui = HeadlessUI()
+    ui.install()
+    try:
+        if args.command == "batch":
+            return run_job(args.job, args.plan, args.isolate)
+        if args.command == "plan":
+            return run_plan_job(args.job, args.out)
+        if args.command == "watch":
+            return run_watch(args.job)
+        if args.command == "resume":
+            return run_resume(args.job, args.isolate)
+        if args.command == "worker":
+            return run_worker()
+        if args.command == "benchmark":
+            return run_benchmark(args.job, args.limit)
+    finally:
+        ui.uninstall()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+elif cmds is not None and __name__ != "__mp_main__":  # not in converter worker processes
+    create_menu()
+    print(f"[ManyAnims] Menu ready in {(time.perf_counter() - _import_started) * 1000:.0f} ms.")
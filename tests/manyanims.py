@@ -0,0 +1,16 @@
+"""Loads the 2023+ ManyAnims.py for the tests. Without Maya only its Maya-free parts are usable."""
+import importlib.util
+import os
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ManyAnims", "2023+", "ManyAnims.py")
+
+
+def load():
+    module = sys.modules.get("ManyAnims")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("ManyAnims", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["ManyAnims"] = module
+        spec.loader.exec_module(module)
+    return module
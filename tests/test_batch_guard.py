@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class BatchGuardTest(unittest.TestCase):
+    """Commands that change what a running batch reads refuse to run."""
+
+    def setUp(self):
+        self.cmds = mock.MagicMock()
+        self.cmds.menuItem.return_value = True
+        patches = [
+            mock.patch.object(ManyAnims, "cmds", self.cmds),
+            mock.patch.object(ManyAnims, "headless_mode", False),
+            mock.patch.object(ManyAnims, "_active_batch", object()),
+            mock.patch.object(ManyAnims, "save_settings"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_prompts_are_not_shown(self):
+        commands = (ManyAnims.set_game_prefix, ManyAnims.set_export_path, ManyAnims.set_export_namespaces,
+                    ManyAnims.set_export_targets, ManyAnims.open_namespace_dialog, ManyAnims.set_anim_path,
+                    ManyAnims.select_anim_files_dialog, ManyAnims.set_import_location)
+        for command in commands:
+            command()
+        self.cmds.promptDialog.assert_not_called()
+        self.cmds.fileDialog2.assert_not_called()
+        self.assertEqual(self.cmds.confirmDialog.call_count, len(commands))
+
+    def test_method_checkbox_is_restored(self):
+        with mock.patch.object(ManyAnims, "treyarch_checkbox", "treyarchBox", create=True), \
+                mock.patch.object(ManyAnims, "iw_sh_checkbox", "iwBox", create=True), \
+                mock.patch.object(ManyAnims, "auto_checkbox", "autoBox", create=True), \
+                mock.patch.object(ManyAnims, "load_cast_from_path") as load_cast, \
+                mock.patch.object(ManyAnims, "load_seanim_from_path") as load_seanim:
+            self.cmds.menuItem.side_effect = lambda item, **kw: True if kw.get("query") or kw.get("exists") else None
+            ManyAnims.on_treyarch_checked()
+        self.cmds.menuItem.assert_any_call("treyarchBox", edit=True, checkBox=False)
+        for item in ("iwBox", "autoBox"):
+            self.assertNotIn(mock.call(item, edit=True, checkBox=False), self.cmds.menuItem.call_args_list)
+        load_cast.assert_not_called()
+        load_seanim.assert_not_called()
+
+    def test_game_toggle_keeps_game_and_checkboxes(self):
+        with mock.patch.object(ManyAnims, "export_bo3", False), mock.patch.object(ManyAnims, "export_cod4", True):
+            ManyAnims.toggle_bo3_export()
+            self.assertFalse(ManyAnims.export_bo3)
+            self.assertTrue(ManyAnims.export_cod4)
+        self.cmds.menuItem.assert_any_call("bo3ExportMenuItem", edit=True, checkBox=False)
+        self.cmds.menuItem.assert_any_call("cod4ExportMenuItem", edit=True, checkBox=True)
+
+    def test_resume_and_plan_leave_the_selection(self):
+        with mock.patch.object(ManyAnims, "read_journal") as read_journal, \
+                mock.patch.object(ManyAnims, "read_export_plan") as read_export_plan:
+            self.assertIsNone(ManyAnims.resume_batch("/exports"))
+            self.assertIsNone(ManyAnims.execute_plan("/exports/plan.json"))
+        read_journal.assert_not_called()
+        read_export_plan.assert_not_called()
+        self.cmds.select.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
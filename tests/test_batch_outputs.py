@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class BatchOutputsTest(unittest.TestCase):
+    """A file is exported, and journaled done, only once the writer has written its output."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        self.writer = ManyAnims.OutputWriter().start()
+        self.release = threading.Event()
+        write = self.writer._write
+
+        def slow_write(staged_path, final_path, source=None):
+            self.release.wait(5)
+            write(staged_path, final_path, source)
+        self.writer._write = slow_write
+
+        for patch in (mock.patch.object(ManyAnims, "cmds", mock.MagicMock()),
+                      mock.patch.object(ManyAnims, "headless_mode", True),
+                      mock.patch.object(ManyAnims, "_active_writer", self.writer),
+                      mock.patch.object(ManyAnims.BatchTimer, "save"),
+                      mock.patch.object(ManyAnims, "batch_entries", mock.MagicMock())):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(ManyAnims.finish_output_writer)
+
+        self.journal = ManyAnims.BatchJournal(self.folder, {"files": ["good.cast", "empty.cast"]})
+        files = ["good.cast", "empty.cast"]
+        self.report = ManyAnims.BatchReport("test", len(files))
+        self.batch = ManyAnims.BatchRun(files, self.export, self.report, self.journal,
+                                        ManyAnims.BatchTimer(files, {}, None), ManyAnims.MemoryMonitor(),
+                                        None, ManyAnims.export_bo3)
+
+    def export(self, path, report):
+        output = os.path.join(self.folder, os.path.splitext(path)[0] + ".xanim_export")
+        staged = ManyAnims.stage_output(output)
+        if path == "good.cast":
+            with open(staged, "w") as f:
+                f.write("ANIMATION\n")
+        ManyAnims.journal_output(output)
+        ManyAnims.commit_output(staged, output, source=path)
+
+    def journal_states(self):
+        with open(self.journal.path) as f:
+            entries = [json.loads(line) for line in f][1:]
+        return {e["file"]: e["state"] for e in entries}
+
+    def test_exported_only_after_write(self):
+        self.batch.step()
+        self.assertEqual(self.report.exported, [])
+        self.assertEqual(self.journal_states(), {"good.cast": "in-progress"})
+
+        self.batch.step()
+        self.release.set()
+        self.batch.close()
+        self.assertEqual(self.report.exported, ["good.cast"])
+        self.assertEqual(self.report.failed_files(), {"empty.cast"})
+        self.assertEqual(self.journal_states(), {"good.cast": "done", "empty.cast": "failed"})
+        self.assertEqual([e["phase"] for e in self.report.entries], ["write"])
+
+
+if __name__ == "__main__":
+    unittest.main()
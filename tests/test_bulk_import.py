@@ -0,0 +1,227 @@
+import math
+import types
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+def make_fake_api():
+    """Small stand-ins for maya.api.OpenMaya / OpenMayaAnim: a scene of joints and anim curves."""
+    scene = {}        # node name -> {"attrs": {...}} for joints, {"keys": {...}} for curves
+    connections = {}  # "joint.attr" -> curve name
+    reorders = []
+
+    class MObject(object):
+        def __init__(self, name):
+            self.name = name
+
+        def hasFn(self, fn):
+            return "keys" in scene.get(self.name, {})
+
+    class MObjectHandle(object):
+        def __init__(self, obj):
+            self.obj = obj
+
+        def isValid(self):
+            return self.obj.name in scene
+
+        def object(self):
+            return self.obj
+
+    class MSelectionList(object):
+        def add(self, name):
+            if name not in scene:
+                raise RuntimeError(name)
+            self.name = name
+
+        def getDependNode(self, index):
+            return MObject(self.name)
+
+    class MPlug(object):
+        def __init__(self, node, attr):
+            self.node_name, self.attr = node, attr
+            self.isNull = node is None
+
+        def asDouble(self):
+            return scene[self.node_name]["attrs"].get(self.attr, 0.0)
+
+        def asInt(self):
+            return int(scene[self.node_name]["attrs"].get(self.attr, 0))
+
+        def source(self):
+            return MPlug(connections.get(f"{self.node_name}.{self.attr}"), "output")
+
+        def node(self):
+            return MObject(self.node_name)
+
+    class MFnDependencyNode(object):
+        def __init__(self, obj):
+            self.obj = obj
+
+        def name(self):
+            return self.obj.name
+
+        def hasAttribute(self, attr):
+            return attr == "jointOrient"
+
+        def findPlug(self, attr, want_networked):
+            return MPlug(self.obj.name, attr)
+
+    class MTime(object):
+        def __init__(self, value, unit=None):
+            self.value = value
+
+        @staticmethod
+        def uiUnit():
+            return "ntsc"
+
+    class MQuaternion(object):
+        def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+            self.x, self.y, self.z, self.w = x, y, z, w
+
+        def inverse(self):
+            return MQuaternion(-self.x, -self.y, -self.z, self.w)
+
+        def __mul__(self, b):
+            # Maya order: a * b applies a, then b
+            a = self
+            return MQuaternion(b.w * a.x + b.x * a.w + b.y * a.z - b.z * a.y,
+                               b.w * a.y - b.x * a.z + b.y * a.w + b.z * a.x,
+                               b.w * a.z + b.x * a.y - b.y * a.x + b.z * a.w,
+                               b.w * a.w - b.x * a.x - b.y * a.y - b.z * a.z)
+
+        def asEulerRotation(self):
+            x, y, z, w = self.x, self.y, self.z, self.w
+            return MEulerRotation(math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y)),
+                                  math.asin(max(-1.0, min(1.0, 2 * (w * y - z * x)))),
+                                  math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z)))
+
+    class MEulerRotation(object):
+        def __init__(self, x=0.0, y=0.0, z=0.0):
+            self.x, self.y, self.z = x, y, z
+
+        def asQuaternion(self):
+            cx, sx = math.cos(self.x / 2), math.sin(self.x / 2)
+            cy, sy = math.cos(self.y / 2), math.sin(self.y / 2)
+            cz, sz = math.cos(self.z / 2), math.sin(self.z / 2)
+            return MQuaternion(sx * cy * cz - cx * sy * sz, cx * sy * cz + sx * cy * sz,
+                               cx * cy * sz - sx * sy * cz, cx * cy * cz + sx * sy * sz)
+
+        def reorderIt(self, order):
+            reorders.append(order)
+
+        def setToClosestSolution(self, previous):
+            return self
+
+    class MDGModifier(object):
+        def __init__(self):
+            self.nodes = []
+
+        def deleteNode(self, obj):
+            self.nodes.append(obj.name)
+
+        def doIt(self):
+            for name in self.nodes:
+                del scene[name]
+                for plug in [p for p, curve in connections.items() if curve == name]:
+                    del connections[plug]
+
+    class MFnAnimCurve(object):
+        kTangentLinear = "linear"
+
+        def setObject(self, obj):
+            self.obj = obj
+
+        def object(self):
+            return self.obj
+
+        def create(self, plug):
+            name = f"{plug.node_name}_{plug.attr}"
+            scene[name] = {"keys": {}}
+            connections[f"{plug.node_name}.{plug.attr}"] = name
+            self.obj = MObject(name)
+
+        def addKeys(self, times, values, tangent_in, tangent_out, keep_existing_keys):
+            keys = scene[self.obj.name]["keys"]
+            if not keep_existing_keys:
+                keys.clear()
+            keys.update((t.value, v) for t, v in zip(times, values))
+
+        @property
+        def numKeys(self):
+            return len(scene[self.obj.name]["keys"])
+
+        def remove(self, index):
+            keys = scene[self.obj.name]["keys"]
+            del keys[sorted(keys)[index]]
+
+    om = types.SimpleNamespace(MObjectHandle=MObjectHandle, MSelectionList=MSelectionList,
+                               MFnDependencyNode=MFnDependencyNode, MFn=types.SimpleNamespace(kAnimCurve=1),
+                               MTime=MTime, MQuaternion=MQuaternion, MEulerRotation=MEulerRotation,
+                               MDGModifier=MDGModifier)
+    oma = types.SimpleNamespace(MFnAnimCurve=MFnAnimCurve)
+    return om, oma, scene, connections, reorders
+
+
+def clip(curves):
+    return {"curves": curves, "modes": {bone: "absolute" for bone in curves}, "notes": []}
+
+
+class BulkCurveImporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.om, self.oma, self.scene, self.connections, self.reorders = make_fake_api()
+        self.scene["j_gun"] = {"attrs": {"jointOrientZ": math.pi / 2, "rotateOrder": 3}}
+        self.scene["j_hand"] = {"attrs": {}}
+        self.importer = ManyAnims.BulkCurveImporter(self.om, self.oma)
+
+    def keys(self, joint, attr):
+        return self.scene[f"{joint}_{attr}"]["keys"]
+
+    def test_keys_times_and_values(self):
+        self.importer.import_clip(clip({"j_hand": {"tx": ([0, 5, 9], [1.0, 2.0, 3.0])}}), [""])
+        self.assertEqual(self.keys("j_hand", "translateX"), {0: 1.0, 5: 2.0, 9: 3.0})
+
+    def test_rotation_removes_joint_orient(self):
+        half = math.sqrt(0.5)
+        # The clip's local rotation is the joint orient (90 degrees about Z) plus 90 degrees about X
+        orient = self.om.MEulerRotation(0, 0, math.pi / 2).asQuaternion()
+        local = self.om.MQuaternion(half, 0, 0, half) * orient
+        self.importer.import_clip(clip({"j_gun": {"rq": ([0], [(local.x, local.y, local.z, local.w)])}}), [""])
+        self.assertAlmostEqual(self.keys("j_gun", "rotateX")[0], math.pi / 2)
+        self.assertAlmostEqual(self.keys("j_gun", "rotateY")[0], 0.0)
+        self.assertAlmostEqual(self.keys("j_gun", "rotateZ")[0], 0.0)
+        self.assertEqual(self.reorders, [3])
+
+    def test_rekeys_and_removes_stale_curves(self):
+        self.importer.import_clip(clip({"j_hand": {"tx": ([0, 1, 2], [1.0, 2.0, 3.0])},
+                                        "j_gun": {"ty": ([0], [4.0])}}), [""])
+        curve = self.importer._curves["j_hand.translateX"]
+        self.importer.import_clip(clip({"j_hand": {"tx": ([0], [7.0])}}), [""])
+        self.assertIs(self.importer._curves["j_hand.translateX"], curve)
+        self.assertEqual(self.keys("j_hand", "translateX"), {0: 7.0})
+        self.assertNotIn("j_gun_translateY", self.scene)
+        self.assertEqual(list(self.importer._curves), ["j_hand.translateX"])
+
+    def test_scene_curves_lose_keys_but_are_not_deleted(self):
+        self.scene["userCurve"] = {"keys": {0: 9.0, 3: 8.0}}
+        self.connections["j_hand.translateY"] = "userCurve"
+        self.importer.import_clip(clip({"j_hand": {"tx": ([0], [1.0]), "ty": ([0, 1], [2.0, 3.0])}}), [""])
+        self.assertEqual(self.scene["userCurve"]["keys"], {0: 2.0, 1: 3.0})
+        self.importer.import_clip(clip({"j_hand": {"tx": ([0], [1.0])}}), [""])
+        self.assertIn("userCurve", self.scene)
+        self.assertEqual(self.scene["userCurve"]["keys"], {})
+        self.assertEqual(list(self.importer._curves), ["j_hand.translateX"])
+
+    def test_missing_joints_are_looked_up_again_after_reset(self):
+        with self.assertRaises(ManyAnims.BulkImportUnsupported):
+            self.importer.import_clip(clip({"j_new": {"tx": ([0], [1.0])}}), [""])
+        self.scene["j_new"] = {"attrs": {}}
+        self.importer.forget_joints()
+        self.assertEqual(self.importer.import_clip(clip({"j_new": {"tx": ([0], [1.0])}}), [""]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class OutputBundleTest(unittest.TestCase):
+    """Exports packed into a bundle read back under the name the writer stored."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        for patch in (mock.patch.dict(ManyAnims.settings, {"output_bundle": "exports"}),
+                      mock.patch.object(ManyAnims, "_active_bundle", None)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write_bundle(self, outputs):
+        bundle = ManyAnims.OutputBundle(self.folder, "exports")
+        for final_path, data in outputs.items():
+            staged = os.path.join(self.folder, "staged.tmp")
+            with open(staged, "wb") as f:
+                f.write(data)
+            bundle.add(staged, final_path)
+            os.remove(staged)
+        return bundle
+
+    def outputs(self):
+        return {
+            os.path.join(self.folder, "walk.xanim_export"): b"walk",
+            os.path.join(self.folder, "mp", "walk.xanim_export"): b"mp walk",
+        }
+
+    def test_reads_back_both_entries(self):
+        outputs = self.outputs()
+        self.write_bundle(outputs).close()
+        self.assertEqual(sorted(ManyAnims.read_bundle_index(ManyAnims.bundle_paths(self.folder, "exports")[1])),
+                         ["mp/walk.xanim_export", "walk.xanim_export"])
+        for path, data in outputs.items():
+            self.assertEqual(ManyAnims.read_bundled_output(path), data)
+
+    def test_reads_from_the_open_bundle(self):
+        outputs = self.outputs()
+        bundle = self.write_bundle(outputs)
+        self.addCleanup(bundle.close)
+        with mock.patch.object(ManyAnims, "_active_bundle", bundle):
+            for path, data in outputs.items():
+                self.assertEqual(ManyAnims.read_bundled_output(path), data)
+
+    def test_missing_entry(self):
+        self.write_bundle(self.outputs()).close()
+        self.assertIsNone(ManyAnims.read_bundled_output(os.path.join(self.folder, "mp", "run.xanim_export")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+def clip(frame_count, notes):
+    frames = [0, frame_count // 2, frame_count - 1]
+    return {
+        "framerate": 30.0,
+        "frame_count": frame_count,
+        "looping": False,
+        "curves": {"tag_torso": {"tx": (frames, [0.0, 1.0, 2.0]),
+                                 "rq": (frames, [(0.0, 0.0, 0.0, 1.0)] * 3)}},
+        "modes": {"tag_torso": "absolute"},
+        "notes": notes,
+    }
+
+
+class CastFrameWidthTest(unittest.TestCase):
+    """Cast key buffers are unsigned; frames past 127 / 32767 must not wrap negative."""
+
+    def roundtrip(self, frame_count, notes):
+        data = ManyAnims.build_cast(clip(frame_count, notes), [])
+        return ManyAnims.read_anim_header("clip.cast", data), ManyAnims.read_anim_curves("clip.cast", data)
+
+    def check(self, frame_count, notes):
+        header, curves = self.roundtrip(frame_count, notes)
+        self.assertIsNone(header["error"])
+        self.assertEqual(header["frame_count"], frame_count)
+        self.assertEqual(sorted(header["notes"], key=lambda n: n[1]), notes)
+        self.assertEqual(curves["frame_count"], frame_count)
+        self.assertEqual(curves["curves"]["tag_torso"]["tx"][0], [0, frame_count // 2, frame_count - 1])
+        self.assertEqual(sorted(curves["notes"], key=lambda n: n[1]), notes)
+
+    def test_byte_frames_above_127(self):
+        self.check(200, [("reload_start", 5), ("reload_end", 150)])
+
+    def test_short_frames_above_32767(self):
+        self.check(40000, [("start", 130), ("end", 39000)])
+
+    def test_notes_kept_by_filter(self):
+        header, _curves = self.roundtrip(200, [("reload_end", 150)])
+        self.assertEqual(ManyAnims.filter_notetracks(header["notes"], header["frame_count"]), [("reload_end", 150)])
+
+
+if __name__ == "__main__":
+    unittest.main()
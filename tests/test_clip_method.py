@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+TREYARCH_RIG = {"tag_view", "tag_torso", "tag_cambone"}
+IW_RIG = {"tag_view", "tag_ads", "tag_cambone"}
+
+
+def clip(bones):
+    return {
+        "framerate": 30.0,
+        "frame_count": 10,
+        "looping": False,
+        "curves": {bone: {"tx": ([0, 9], [0.0, 1.0])} for bone in bones},
+        "modes": {bone: "absolute" for bone in bones},
+        "notes": [],
+    }
+
+
+class DetectClipMethodTest(unittest.TestCase):
+    """Overrides win, then the clip's bones, then the rig's joints, then the fallback."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        for patch in (mock.patch.object(ManyAnims, "anim_header_cache", {}),
+                      mock.patch.dict(ManyAnims.settings, {"method_overrides": {}, "auto_method_fallback": "iw/sh"})):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fixture(self, name, bones):
+        path = os.path.join(self.folder, name)
+        build = ManyAnims.build_cast if name.endswith(".cast") else ManyAnims.build_seanim
+        with open(path, "wb") as f:
+            f.write(build(clip(bones), []))
+        return path
+
+    def detect(self, path, rig_joints=TREYARCH_RIG | IW_RIG, **settings):
+        with mock.patch.dict(ManyAnims.settings, settings):
+            return ManyAnims.detect_clip_method(path, rig_joints)
+
+    def test_clip_with_tag_ads_is_iw(self):
+        path = self.fixture("vm_walk.cast", ["tag_torso", "tag_ads", "j_gun"])
+        self.assertEqual(self.detect(path), ("iw/sh", "clip has tag_ads"))
+
+    def test_clip_with_tag_torso_is_treyarch(self):
+        path = self.fixture("vm_walk.seanim", ["tag_torso", "j_gun"])
+        self.assertEqual(self.detect(path), ("treyarch", "clip has tag_torso"))
+
+    def test_namespaced_bones(self):
+        path = self.fixture("vm_walk.seanim", ["vm:tag_ads", "vm:j_gun"])
+        self.assertEqual(self.detect(path), ("iw/sh", "clip has tag_ads"))
+
+    def test_override_beats_bones(self):
+        path = self.fixture("vm_walk.cast", ["tag_ads"])
+        overrides = {"*_run.cast": "iw/sh", "VM_*.cast": "treyarch"}
+        self.assertEqual(self.detect(path, method_overrides=overrides), ("treyarch", "override VM_*.cast"))
+
+    def test_first_matching_override_wins(self):
+        path = self.fixture("vm_walk.cast", ["tag_torso"])
+        overrides = {"vm_*": "iw/sh", "*.cast": "treyarch"}
+        self.assertEqual(self.detect(path, method_overrides=overrides), ("iw/sh", "override vm_*"))
+
+    def test_unknown_override_method_is_ignored(self):
+        path = self.fixture("vm_walk.cast", ["tag_torso"])
+        self.assertEqual(self.detect(path, method_overrides={"*": "manual"}), ("treyarch", "clip has tag_torso"))
+
+    def test_rig_joints_decide_without_profile_bones(self):
+        path = self.fixture("vm_ads_up.seanim", ["j_gun"])
+        self.assertEqual(self.detect(path, rig_joints=IW_RIG), ("iw/sh", "rig joints"))
+        self.assertEqual(self.detect(path, rig_joints={"tag_view", "tag_torso"}), ("treyarch", "rig joints"))
+
+    def test_fallback_when_rig_fits_both(self):
+        path = self.fixture("vm_walk.cast", ["j_gun"])
+        self.assertEqual(self.detect(path, auto_method_fallback="treyarch"), ("treyarch", "fallback"))
+
+
+if __name__ == "__main__":
+    unittest.main()
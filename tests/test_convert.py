@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+def clip(frame_count, looping=False, notes=()):
+    frames = [0, frame_count // 2, frame_count - 1]
+    return {
+        "framerate": 30.0,
+        "frame_count": frame_count,
+        "looping": looping,
+        "curves": {
+            "tag_torso": {"tx": (frames, [0.0, 1.5, -2.25]), "ty": (frames, [0.5, 0.5, 0.5]),
+                          "tz": (frames, [1.0, 2.0, 3.0]),
+                          "rq": (frames, [(0.0, 0.0, 0.0, 1.0), (0.5, 0.5, 0.5, 0.5), (0.0, 0.0, 1.0, 0.0)])},
+            "j_gun": {"tx": ([frame_count - 1], [4.0]), "ty": ([frame_count - 1], [0.0]),
+                      "tz": ([frame_count - 1], [-4.0])},
+        },
+        "modes": {"tag_torso": "absolute", "j_gun": "absolute"},
+        "notes": list(notes),
+    }
+
+
+def parse(data, extension):
+    return ManyAnims.read_anim_curves("clip" + extension, data)
+
+
+class ConvertRoundTripTest(unittest.TestCase):
+    """Cast -> SEAnim -> Cast keeps frames, values, notes and looping, around the frame-width boundaries."""
+
+    def check(self, original):
+        warnings = []
+        cast = parse(ManyAnims.build_cast(original, warnings), ".cast")
+        seanim = parse(ManyAnims.build_seanim(cast, warnings), ".seanim")
+        back = parse(ManyAnims.build_cast(seanim, warnings), ".cast")
+        self.assertEqual(warnings, [])
+        for converted in (cast, seanim, back):
+            self.assertEqual(converted["frame_count"], original["frame_count"])
+            self.assertEqual(converted["looping"], original["looping"])
+            self.assertEqual(converted["framerate"], original["framerate"])
+            self.assertEqual(sorted(converted["notes"], key=lambda n: (n[1], n[0])),
+                             sorted(original["notes"], key=lambda n: (n[1], n[0])))
+            self.assertEqual(converted["modes"], original["modes"])
+            for bone, props in original["curves"].items():
+                for prop, (frames, values) in props.items():
+                    got_frames, got_values = converted["curves"][bone][prop]
+                    self.assertEqual(list(got_frames), frames, (bone, prop))
+                    self.assertEqual([tuple(v) if isinstance(v, (tuple, list)) else v for v in got_values],
+                                     values, (bone, prop))
+
+    def test_byte_boundary(self):
+        for frame_count in (255, 256, 257):
+            with self.subTest(frame_count=frame_count):
+                self.check(clip(frame_count, notes=[("start", 0), ("end", frame_count - 1)]))
+
+    def test_short_boundary(self):
+        for frame_count in (0xFFFF, 0x10000, 0x10001):
+            with self.subTest(frame_count=frame_count):
+                self.check(clip(frame_count, notes=[("fire", 300), ("end", frame_count - 1)]))
+
+    def test_notes_sharing_a_name(self):
+        self.check(clip(120, notes=[("sound", 10), ("sound", 90), ("reload_end", 90)]))
+
+    def test_looping(self):
+        self.check(clip(60, looping=True))
+        self.check(clip(300, looping=True, notes=[("loop_start", 0)]))
+
+    def test_convert_file(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        source = os.path.join(folder, "vm_ak_reload.cast")
+        with open(source, "wb") as f:
+            f.write(ManyAnims.build_cast(clip(300, looping=True, notes=[("end", 299)]), []))
+        output = os.path.join(folder, "out", "vm_ak_reload.seanim")
+        result = ManyAnims.convert_anim_file(source, output)
+        self.assertEqual(result["warnings"], [])
+        converted = ManyAnims.read_anim_curves(output)
+        self.assertEqual((converted["frame_count"], converted["looping"], converted["notes"]), (300, True, [("end", 299)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class HousekeepingTest(unittest.TestCase):
+    """Housekeeping deletes only orphaned curves the batch created, and leftover notetracks."""
+
+    def setUp(self):
+        self.cmds = mock.MagicMock()
+        self.cmds.ls.return_value = ["userCurve", "clipCurve", "liveCurve"]
+        self.cmds.listConnections.side_effect = lambda curve, **kw: ["joint1"] if curve == "liveCurve" else []
+        self.cmds.lsUI.return_value = []
+        self.cmds.objExists.return_value = False
+        patch = mock.patch.object(ManyAnims, "cmds", self.cmds)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_keeps_curves_from_before_the_batch(self):
+        ManyAnims.run_housekeeping({"userCurve"})
+        self.cmds.delete.assert_called_once_with(["clipCurve"])
+
+    def test_without_snapshot_deletes_no_curves(self):
+        ManyAnims.run_housekeeping()
+        self.cmds.delete.assert_not_called()
+
+    def test_deletes_notetrack_nodes_in_default_mode(self):
+        self.assertFalse(ManyAnims.settings.get("native_notetracks", False))
+        self.cmds.objExists.return_value = True
+        ManyAnims.run_housekeeping()
+        self.cmds.delete.assert_called_once_with(["SENotes", "CastNotetracks"])
+
+    def test_converted_rig_keeps_cast_notetracks(self):
+        self.cmds.objExists.return_value = True
+        self.cmds.ls.return_value = ["tx:Joints"]
+        ManyAnims.run_housekeeping()
+        self.cmds.delete.assert_called_once_with(["SENotes"])
+
+    def test_monitor_snapshots_scene_curves(self):
+        monitor = ManyAnims.MemoryMonitor(every=1)
+        self.assertEqual(monitor.scene_curves, {"userCurve", "clipCurve", "liveCurve"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.manyanims import load
+from tests.test_verify_output import FRAME, HEADER, NOTES
+
+ManyAnims = load()
+
+
+class JournalResumeTest(unittest.TestCase):
+    """journal_remaining keeps done files with good outputs and re-queues everything else."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def output(self, name, text=None):
+        path = os.path.join(self.folder, name)
+        if text is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return path
+
+    def test_resume_skips_only_verified_done_files(self):
+        files = ["done.cast", "missing.cast", "truncated.cast", "running.cast", "failed.cast", "pending.cast"]
+        good = self.output("done.xanim_export", HEADER + FRAME.format(0) + FRAME.format(1) + NOTES)
+        truncated = self.output("truncated.xanim_export", HEADER + FRAME.format(0))
+        leftover = self.output("pending.xanim_export" + ManyAnims.OUTPUT_TEMP_SUFFIX, "partial")
+
+        journal = ManyAnims.BatchJournal(self.folder, {"files": files})
+        journal.finish_file("done.cast", "done", [good])
+        journal.finish_file("missing.cast", "done", [self.output("missing.xanim_export")])
+        journal.finish_file("truncated.cast", "done", [truncated])
+        journal.start_file("running.cast")
+        journal.finish_file("failed.cast", "failed", [])
+        journal.close()
+
+        _header, journal_files, states = ManyAnims.read_journal(self.folder)
+        self.assertEqual(journal_files, files)
+        remaining = ManyAnims.journal_remaining(self.folder, journal_files, states)
+        self.assertEqual(remaining, files[1:])
+        self.assertFalse(os.path.exists(leftover))
+        self.assertTrue(os.path.exists(good))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+CLIPS = [
+    # path, name, frame_count, category, error, bones, notes
+    ("a/vm_reload.cast", "vm_reload.cast", 120, "reload", None, ["tag_torso", "j_gun"], ["reload_end"]),
+    ("a/vm_walk.seanim", "vm_walk.seanim", 30, "movement", None, ["tag_ads"], []),
+    ("a/vm_it's.cast", "vm_it's.cast", 60, "other", None, ["tag_torso"], []),
+    ("a/broken.cast", "broken.cast", 0, "other", "truncated", [], []),
+]
+
+
+class LibraryQueryTest(unittest.TestCase):
+    """Query terms become bound parameters; unknown fields and bad operators are rejected."""
+
+    def setUp(self):
+        self.db = ManyAnims.open_library(":memory:")
+        self.addCleanup(self.db.close)
+        for path, name, frames, category, error, bones, notes in CLIPS:
+            self.db.execute("INSERT INTO clips (path, root, name, frame_count, category, error) VALUES (?, ?, ?, ?, ?, ?)",
+                            (path, "a", name, frames, category, error))
+            self.db.executemany("INSERT INTO bones VALUES (?, ?)", [(path, bone) for bone in bones])
+            self.db.executemany("INSERT INTO notes VALUES (?, ?)", [(path, note) for note in notes])
+
+    def query(self, text):
+        return ManyAnims.query_library(text, db=self.db)
+
+    def test_values_are_bound_not_inlined(self):
+        where, params = ManyAnims.library_query_sql("frames>=60 name='vm_*' note=reload_*")
+        self.assertEqual(params, [60.0, "vm_*", "reload_*"])
+        for value in params:
+            self.assertNotIn(str(value), where)
+        self.assertEqual(where.count("?"), len(params))
+
+    def test_quotes_in_values_are_data(self):
+        self.assertEqual(self.query("name=\"vm_it's.cast\""), ["a/vm_it's.cast"])
+        self.assertEqual(self.query("name=\"x' OR '1'='1\""), [])
+
+    def test_terms_combine(self):
+        self.assertEqual(self.query("frames>=60"), ["a/vm_it's.cast", "a/vm_reload.cast"])
+        self.assertEqual(self.query("frames>=60 bone=tag_torso note!=reload_end"), ["a/vm_it's.cast"])
+        self.assertEqual(self.query("bone=TAG_*"), ["a/vm_it's.cast", "a/vm_reload.cast", "a/vm_walk.seanim"])
+
+    def test_unreadable_clips_are_left_out(self):
+        self.assertEqual(self.query("name=broken.cast"), [])
+
+    def test_rejects_bad_terms(self):
+        for query in ("length>3", "frames; DROP TABLE clips", "frames>sixty", "bone>tag", "name<b", "clips.path=x"):
+            with self.subTest(query=query), self.assertRaises(ValueError):
+                ManyAnims.library_query_sql(query)
+
+    def test_unknown_field_lists_the_known_ones(self):
+        with self.assertRaises(ValueError) as caught:
+            ManyAnims.library_query_sql("length>3")
+        self.assertIn("unknown query field 'length'", str(caught.exception))
+        self.assertIn("frames", str(caught.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
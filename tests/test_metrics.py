@@ -0,0 +1,88 @@
+import re
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+METRIC_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+LABEL = r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"'
+SAMPLE = re.compile(rf"^({METRIC_NAME})(?:\{{((?:{LABEL},?)*)\}})? (\S+)$")
+FAMILY_SUFFIXES = {"histogram": ("_bucket", "_sum", "_count"), "counter": ("",), "gauge": ("",)}
+
+
+def parse_exposition(text):
+    """{family: {"help", "type", "samples": [(name, {label: value}, value)]}}; fails on anything malformed."""
+    assert text.endswith("\n"), "exposition must end with a newline"
+    families = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name, help_text = line[7:].split(" ", 1)
+            assert name not in families, f"{name} described twice"
+            current = families[name] = {"help": help_text, "type": None, "samples": []}
+        elif line.startswith("# TYPE "):
+            name, kind = line[7:].split(" ")
+            assert current is families.get(name) and current["type"] is None, f"TYPE {name} without HELP"
+            current["type"] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, f"malformed sample: {line!r}"
+            name, labels, value = match.group(1), match.group(2) or "", match.group(5)
+            family = next((f for f, info in families.items() if info is current
+                           and any(name == f + suffix for suffix in FAMILY_SUFFIXES[info["type"]])), None)
+            assert family, f"{name} outside its HELP/TYPE block"
+            float(value)
+            unescape = {"\\\\": "\\", '\\"': '"', "\\n": "\n"}
+            current["samples"].append((name, {k: re.sub(r'\\[\\"n]', lambda m: unescape[m.group(0)], v)
+                                              for k, v in re.findall(LABEL, labels)}, float(value)))
+    return families
+
+
+class BatchMetricsTest(unittest.TestCase):
+    """render() is valid Prometheus text exposition format."""
+
+    def setUp(self):
+        patch = mock.patch.object(ManyAnims, "process_rss_mb", return_value=512.0)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.metrics = ManyAnims.BatchMetrics()
+        self.metrics.start_batch(3)
+        self.metrics.count_file("exported", 2)
+        self.metrics.count_file("failed")
+        self.metrics.observe_phase("write", 0.3)
+        self.metrics.observe_phase("write", 12.0)
+        self.metrics.observe_phase('odd "phase"\\\n', 0.05)
+
+    def test_every_family_has_help_and_type(self):
+        families = parse_exposition(self.metrics.render())
+        for name, family in families.items():
+            self.assertTrue(family["help"], name)
+            self.assertIn(family["type"], FAMILY_SUFFIXES, name)
+            self.assertTrue(family["samples"], name)
+        files = {labels["state"]: value for _name, labels, value in families["manyanims_files_total"]["samples"]}
+        self.assertEqual(files, {"exported": 2, "failed": 1, "skipped": 0})
+        self.assertEqual(families["manyanims_memory_rss_bytes"]["samples"][0][2], 512 * 1048576)
+
+    def test_label_values_are_escaped(self):
+        families = parse_exposition(self.metrics.render())
+        phases = {labels["phase"] for _name, labels, _value in families["manyanims_phase_duration_seconds"]["samples"]}
+        self.assertEqual(phases, {"write", 'odd "phase"\\\n'})
+
+    def test_histogram_buckets_are_cumulative(self):
+        samples = parse_exposition(self.metrics.render())["manyanims_phase_duration_seconds"]["samples"]
+        buckets = [(labels["le"], value) for name, labels, value in samples
+                   if name.endswith("_bucket") and labels["phase"] == "write"]
+        self.assertEqual(buckets[-1], ("+Inf", 2))
+        counts = [value for _le, value in buckets]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(dict(buckets)["0.5"], 1)
+        totals = {name: value for name, labels, value in samples if labels.get("phase") == "write"
+                  and not name.endswith("_bucket")}
+        self.assertEqual(totals["manyanims_phase_duration_seconds_count"], 2)
+        self.assertAlmostEqual(totals["manyanims_phase_duration_seconds_sum"], 12.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
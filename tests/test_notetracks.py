@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class ExporterNotetrackTest(unittest.TestCase):
+    """apply_notetracks_to_exporter only writes the storage format it knows."""
+
+    def setUp(self):
+        self.cmds = mock.MagicMock()
+        self.cmds.objExists.return_value = True
+        self.cmds.attributeQuery.return_value = True
+        self.cmds.optionMenu.side_effect = lambda name, **kw: 2 if kw.get("query") else True
+        self.cmds.textScrollList.return_value = True
+        self.cmds.getAttr.return_value = "reload_start:0,"
+        codmaya = mock.MagicMock(OBJECT_NAMES={"xanim": ["XAnimWindow", "XAnim", "XAnimSettings"]})
+        for patch in (mock.patch.object(ManyAnims, "cmds", self.cmds),
+                      mock.patch.object(ManyAnims, "CoDMayaTools", codmaya, create=True)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_writes_slot_and_list(self):
+        self.assertTrue(ManyAnims.apply_notetracks_to_exporter([("reload_start", 0), ("end", 42)]))
+        self.cmds.setAttr.assert_called_once_with("XAnimSettings.notetracks[2]", "reload_start:0,end:42,", type="string")
+        self.cmds.textScrollList.assert_any_call("XAnimWindow_NoteList", edit=True, append=["reload_start", "end"])
+
+    def test_missing_note_list_falls_back(self):
+        self.cmds.textScrollList.return_value = False
+        self.assertFalse(ManyAnims.apply_notetracks_to_exporter([("end", 42)]))
+        self.cmds.setAttr.assert_not_called()
+
+    def test_unknown_storage_falls_back(self):
+        self.cmds.getAttr.return_value = "end=42;"
+        self.assertFalse(ManyAnims.apply_notetracks_to_exporter([("end", 42)]))
+        self.cmds.setAttr.assert_not_called()
+
+    def test_native_notes_are_opt_in(self):
+        self.assertFalse(ManyAnims.settings.get("native_notetracks", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
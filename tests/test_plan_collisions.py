@@ -0,0 +1,67 @@
+import os
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+EXPORTS = "exports"
+
+
+class PlanCollisionTest(unittest.TestCase):
+    """Clips whose outputs land on an already planned file are reported as collisions."""
+
+    def setUp(self):
+        patch = mock.patch.object(ManyAnims, "export_path", EXPORTS)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def plan(self, sources, targets=None, namespaces=(None,), **settings):
+        targets = targets or [{"format": "xanim_export", "prefix": "", "remap": False}]
+        with mock.patch.dict(ManyAnims.settings, dict(settings, export_targets=targets)):
+            targets = ManyAnims.get_export_targets()
+            clips = [ManyAnims.plan_clip(source, "treyarch", targets, list(namespaces)) for source in sources]
+        return ManyAnims.find_plan_collisions(clips)
+
+    def summary(self, collisions):
+        return [(os.path.basename(c["source"]), os.path.basename(c["output"]), os.path.basename(c["first"]))
+                for c in collisions]
+
+    def test_distinct_outputs(self):
+        self.assertEqual(self.plan(["vm_walk.seanim", "vm_run.seanim"]), [])
+
+    def test_names_differing_in_case_collide(self):
+        collisions = self.plan(["vm_Walk.seanim", "vm_walk.cast"])
+        self.assertEqual(self.summary(collisions), [("vm_walk.cast", "vm_walk.xanim_export", "vm_Walk.seanim")])
+
+    def test_remap_rules_collide(self):
+        targets = [{"format": "xanim_export", "prefix": "", "remap": True}]
+        collisions = self.plan(["va_walk.seanim", "viewmodel_walk.seanim"], targets)
+        self.assertEqual(self.summary(collisions),
+                         [("viewmodel_walk.seanim", "vm_walk.xanim_export", "va_walk.seanim")])
+
+    def test_prefix_collides_with_prefixed_source(self):
+        targets = [{"format": "xanim_export", "prefix": "t7"}, {"format": "xanim_export", "prefix": ""}]
+        collisions = self.plan(["vm_walk.seanim", "vm_t7_walk.seanim"], targets)
+        self.assertEqual(self.summary(collisions),
+                         [("vm_t7_walk.seanim", "vm_t7_walk.xanim_export", "vm_walk.seanim")])
+
+    def test_fan_out_targets_only_collide_across_clips(self):
+        targets = [{"format": "xanim_export"}, {"format": "xanim_bin"}, {"format": "xanim_export", "suffix": "_60", "fps": 60}]
+        self.assertEqual(self.plan(["vm_walk.seanim"], targets), [])
+        collisions = self.plan(["vm_walk.seanim", "VM_WALK.cast"], targets)
+        self.assertEqual(sorted(self.summary(collisions)), [
+            ("VM_WALK.cast", "VM_WALK.xanim_bin", "vm_walk.seanim"),
+            ("VM_WALK.cast", "VM_WALK.xanim_export", "vm_walk.seanim"),
+            ("VM_WALK.cast", "VM_WALK_60.xanim_export", "vm_walk.seanim"),
+        ])
+
+    def test_rigs_sharing_a_suffix_collide_within_one_clip(self):
+        collisions = self.plan(["vm_walk.seanim"], namespaces=("vm", "wm"), namespace_suffixes={"vm": "", "wm": ""})
+        self.assertEqual(self.summary(collisions), [("vm_walk.seanim", "vm_walk.xanim_export", "vm_walk.seanim")])
+        self.assertEqual(self.plan(["vm_walk.seanim"], namespaces=("vm", "wm")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
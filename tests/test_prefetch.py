@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class PrefetchSkipTest(unittest.TestCase):
+    """A batch that skips a clip must not leave take() waiting on a full prefetcher."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        self.files = []
+        for name in ("a", "b", "c", "d"):
+            path = os.path.join(self.folder, name + ".seanim")
+            with open(path, "wb") as f:
+                f.write(name.encode() * 64)
+            self.files.append(path)
+
+    def take_all(self, prefetcher, paths):
+        results = []
+        thread = threading.Thread(target=lambda: results.extend(prefetcher.take(p) for p in paths), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "take() deadlocked")
+        return results
+
+    def check(self, local_path, source_path):
+        with open(local_path, "rb") as f, open(source_path, "rb") as source:
+            self.assertEqual(f.read(), source.read())
+
+    def test_skip_with_depth_one(self):
+        prefetcher = ManyAnims.AnimPrefetcher(self.files, depth=1, parse_headers=False).start()
+        self.addCleanup(prefetcher.stop)
+        local_b, local_d = self.take_all(prefetcher, [self.files[1], self.files[3]])
+        self.check(local_b, self.files[1])
+        self.check(local_d, self.files[3])
+        self.assertEqual(prefetcher._buffered_bytes, 0)
+
+    def test_skip_while_reader_waits(self):
+        prefetcher = ManyAnims.AnimPrefetcher(self.files, depth=1, parse_headers=False).start()
+        self.addCleanup(prefetcher.stop)
+        with prefetcher._cond:
+            prefetcher._cond.wait_for(lambda: self.files[0] in prefetcher._buffers, timeout=5)
+        (local_c,) = self.take_all(prefetcher, [self.files[2]])
+        self.check(local_c, self.files[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
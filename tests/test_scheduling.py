@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+def sample(frames, bones, notes, model=(2.5, 0.001, 0.1)):
+    seconds = model[0] + model[1] * frames * bones + model[2] * notes
+    return {"frames": frames, "bones": bones, "notes": notes, "seconds": seconds}
+
+
+def header(frames, bones, notes=0):
+    return {"frame_count": frames, "bones": ["bone%d" % i for i in range(bones)], "note_count": notes, "error": None}
+
+
+class CostModelTest(unittest.TestCase):
+    """The cost model is fitted from past runs and falls back to the defaults."""
+
+    def test_recovers_coefficients(self):
+        samples = [sample(frames, bones, notes)
+                   for frames, bones, notes in [(30, 40, 0), (120, 40, 2), (60, 80, 5), (300, 20, 1), (10, 100, 8), (200, 60, 3)]]
+        for fitted, expected in zip(ManyAnims.fit_cost_model(samples), (2.5, 0.001, 0.1)):
+            self.assertAlmostEqual(fitted, expected, places=6)
+
+    def test_too_few_samples_use_defaults(self):
+        samples = [sample(30 * n, 40, n) for n in range(1, 5)]
+        self.assertEqual(ManyAnims.fit_cost_model(samples), ManyAnims.DEFAULT_COST_MODEL)
+
+    def test_identical_samples_scale_defaults(self):
+        samples = [sample(100, 50, 2)] * 6
+        model = ManyAnims.fit_cost_model(samples)
+        features = (1.0, 100 * 50, 2)
+        scale = ManyAnims.estimate_export_cost_from(features, model) / ManyAnims.estimate_export_cost_from(
+            features, ManyAnims.DEFAULT_COST_MODEL)
+        for fitted, default in zip(model, ManyAnims.DEFAULT_COST_MODEL):
+            self.assertAlmostEqual(fitted, default * scale)
+        self.assertAlmostEqual(ManyAnims.estimate_export_cost_from(features, model), samples[0]["seconds"])
+
+
+class BatchTimerTest(unittest.TestCase):
+    """Files run longest-first and the ETA corrects itself by the batch's actual times."""
+
+    def setUp(self):
+        headers = {"short.seanim": header(10, 10), "long.seanim": header(1000, 80, 4), "mid.seanim": header(200, 40)}
+        patch = mock.patch.object(ManyAnims, "anim_header_cache", headers)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_orders_longest_first(self):
+        ordered, estimates = ManyAnims.order_longest_first(["short.seanim", "long.seanim", "mid.seanim"],
+                                                           ManyAnims.DEFAULT_COST_MODEL)
+        self.assertEqual(ordered, ["long.seanim", "mid.seanim", "short.seanim"])
+        self.assertGreater(estimates["long.seanim"], estimates["mid.seanim"])
+
+    def test_eta_scales_by_actual_time(self):
+        estimates = {"long.seanim": 40.0, "mid.seanim": 6.0, "short.seanim": 2.0}
+        timer = ManyAnims.BatchTimer(list(estimates), estimates, ManyAnims.DEFAULT_COST_MODEL)
+        self.assertEqual(timer.eta_seconds(), 48.0)
+        timer.finish_file("long.seanim", seconds=20.0)
+        self.assertEqual(timer.eta_seconds(), 4.0)
+        self.assertEqual(timer.samples, [{"frames": 1000, "bones": 80, "notes": 4, "seconds": 20.0}])
+
+    def test_failed_file_is_not_a_sample(self):
+        estimates = {"long.seanim": 40.0, "mid.seanim": 6.0}
+        timer = ManyAnims.BatchTimer(list(estimates), estimates, ManyAnims.DEFAULT_COST_MODEL)
+        timer.finish_file("long.seanim", exported=False, seconds=1.0)
+        self.assertEqual(timer.eta_seconds(), 6.0)
+        self.assertEqual(timer.samples, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+HEADER = """ANIMATION
+VERSION 3
+
+NUMPARTS 2
+PART 0 "tag_torso"
+PART 1 "j_gun"
+
+FRAMERATE 30
+NUMFRAMES 2
+"""
+FRAME = """FRAME {0}
+PART 0
+OFFSET 0 0 0
+PART 1
+OFFSET 0 0 0
+
+"""
+NOTES = """NOTETRACKS
+
+PART 0
+NUMTRACKS 1
+
+NOTETRACK 0
+NUMKEYS 1
+FRAME 1 "end"
+
+PART 1
+NUMTRACKS 0
+"""
+
+
+class ParseXAnimExportTest(unittest.TestCase):
+    """Truncation is judged on the frame and part counts."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def parse(self, text):
+        path = os.path.join(self.folder, "clip.xanim_export")
+        with open(path, "w") as f:
+            f.write(text)
+        return ManyAnims.parse_xanim_export(path)
+
+    def test_complete_export(self):
+        result = self.parse(HEADER + FRAME.format(0) + FRAME.format(1) + NOTES)
+        self.assertIsNone(result["error"])
+        self.assertEqual((result["parts"], result["frames"], result["note_keys"]), (2, 2, 1))
+
+    def test_missing_notetracks_section_is_not_truncation(self):
+        result = self.parse(HEADER + FRAME.format(0) + FRAME.format(1))
+        self.assertIsNone(result["error"])
+        self.assertFalse(result["notetracks"])
+
+    def test_missing_frame(self):
+        self.assertEqual(self.parse(HEADER + FRAME.format(0))["error"], "truncated")
+
+    def test_missing_part(self):
+        cut = HEADER + FRAME.format(0) + FRAME.format(1).split("PART 1")[0]
+        self.assertEqual(self.parse(cut)["error"], "truncated frame data")
+
+
+if __name__ == "__main__":
+    unittest.main()
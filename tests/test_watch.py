@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.manyanims import load
+
+ManyAnims = load()
+
+
+class FolderWatcherTest(unittest.TestCase):
+    """Files are exported once they stop changing, and again after they change."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        self.state_path = os.path.join(self.folder, ManyAnims.WATCH_STATE_FILE_NAME)
+        self.now = 1000.0
+        clock = mock.patch.object(ManyAnims, "time", mock.Mock(time=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.watcher = self.new_watcher()
+
+    def new_watcher(self):
+        return ManyAnims.FolderWatcher(self.folder, ".seanim", 3.0, self.state_path)
+
+    def write(self, name, data=b"SEAnim", mtime=500.0):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def poll_after(self, seconds, watcher=None):
+        self.now += seconds
+        return (watcher or self.watcher).poll()
+
+    def test_waits_until_settled(self):
+        path = self.write("walk.seanim")
+        self.write("notes.txt")
+        self.assertEqual(self.poll_after(0), [])
+        self.assertEqual(self.poll_after(2), [])
+        self.assertEqual(self.poll_after(1), [path])
+
+    def test_still_growing_file_restarts_settle(self):
+        path = self.write("walk.seanim", b"SE")
+        self.poll_after(0)
+        self.write("walk.seanim", b"SEAnim")
+        self.assertEqual(self.poll_after(3), [])
+        self.assertEqual(self.poll_after(2), [])
+        self.assertEqual(self.poll_after(1), [path])
+
+    def test_exported_once_until_changed(self):
+        path = self.write("walk.seanim")
+        self.poll_after(0)
+        self.watcher.mark_done(self.poll_after(3))
+        self.assertEqual(self.poll_after(10), [])
+
+        self.write("walk.seanim", mtime=600.0)
+        self.assertEqual(self.poll_after(0), [])
+        self.assertEqual(self.poll_after(3), [path])
+        self.watcher.mark_done([path])
+
+        self.write("walk.seanim", b"SEAnim v2", mtime=600.0)
+        self.poll_after(0)
+        self.assertEqual(self.poll_after(3), [path])
+
+    def test_restart_remembers_exported_files(self):
+        path = self.write("walk.seanim")
+        self.poll_after(0)
+        self.watcher.mark_done(self.poll_after(3))
+        restarted = self.new_watcher()
+        restarted.poll()
+        self.assertEqual(self.poll_after(3, restarted), [])
+        self.write("walk.seanim", mtime=700.0)
+        restarted.poll()
+        self.assertEqual(self.poll_after(3, restarted), [path])
+
+    def test_deleted_file_is_forgotten(self):
+        path = self.write("walk.seanim")
+        self.poll_after(0)
+        os.remove(path)
+        self.assertEqual(self.poll_after(3), [])
+        self.assertEqual(self.watcher.pending, {})
+
+
+if __name__ == "__main__":
+    unittest.main()